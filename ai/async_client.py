@@ -0,0 +1,52 @@
+import asyncio
+from ai.deepseek_client import DeepSeekClient
+
+class AsyncDeepSeekClient:
+    """asyncio front end for DeepSeekClient
+
+    Requests run on the client's RequestPool, which holds the pooled HTTP
+    session, the concurrency limit and single-flight coalescing, so async
+    and sync callers share connections and in-flight answers.
+    """
+
+    def __init__(self, client=None):
+        self.client = client or DeepSeekClient()
+
+    async def chat(self, message, context="", personality="helpful assistant", temperature=0.7, call_type='chat',
+                   priority=None):
+        """Async chat(); awaiting callers of an identical prompt share one request"""
+        future = self.client.submit(message, context, personality, temperature, call_type, priority)
+        # Shielded so one caller giving up doesn't cancel the shared request
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    async def send(self, request, priority=None):
+        """Run a request dict from one of DeepSeekClient's *_request builders"""
+        return await self.chat(**request, priority=priority)
+
+    async def programming_help(self, problem, language="python", context=""):
+        """Async programming_help()"""
+        return await self.send(self.client.programming_request(problem, language, context))
+
+    async def debug_code(self, code, error_message, language="python"):
+        """Async debug_code()"""
+        return await self.send(self.client.debug_request(code, error_message, language))
+
+    async def friend_chat(self, message, context=""):
+        """Async friend_chat()"""
+        return await self.send(self.client.friend_request(message, context))
+
+    async def gather(self, *calls):
+        """Await several client calls at once, returning results in order"""
+        return await asyncio.gather(*calls)
+
+    async def chat_many(self, requests, priority='batch'):
+        """Issue a list of request dicts concurrently, behind interactive traffic by default"""
+        return await asyncio.gather(*(self.send(request, priority) for request in requests))
+
+    def run(self, *calls):
+        """Run client calls concurrently from synchronous code"""
+        return asyncio.run(self.gather(*calls))
+
+    def close(self):
+        """Close the underlying client"""
+        self.client.close()
@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import deque
+from config.api_keys import Config
+from utils.logger import setup_logger
+
+logger = setup_logger('circuit_breaker')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+class CircuitBreaker:
+    """Rolling error-rate and latency breaker for the DeepSeek API
+
+    Calls that fail or take longer than slow_call_seconds count as bad.
+    Once at least min_calls were made in the window and the bad fraction
+    reaches failure_rate, the circuit opens and callers should use their
+    offline path. After open_seconds it half-opens and lets one probe
+    through every probe_interval seconds; probe_successes good probes
+    close it again, a bad one reopens it.
+    """
+
+    def __init__(self, window_seconds=None, min_calls=None, failure_rate=None, slow_call_seconds=None,
+                 open_seconds=None, probe_interval=None, probe_successes=None):
+        self.window_seconds = window_seconds or Config.CIRCUIT_WINDOW_SECONDS
+        self.min_calls = min_calls or Config.CIRCUIT_MIN_CALLS
+        self.failure_rate = failure_rate or Config.CIRCUIT_FAILURE_RATE
+        self.slow_call_seconds = slow_call_seconds or Config.CIRCUIT_SLOW_CALL_SECONDS
+        self.open_seconds = open_seconds or Config.CIRCUIT_OPEN_SECONDS
+        self.probe_interval = probe_interval or Config.CIRCUIT_PROBE_INTERVAL
+        self.probe_successes = probe_successes or Config.CIRCUIT_PROBE_SUCCESSES
+        self.state = CLOSED
+        self.calls = deque()
+        self.opened_at = 0.0
+        self.last_probe = 0.0
+        self.good_probes = 0
+        self.lock = threading.Lock()
+
+    def allow_request(self):
+        """Whether a request should go to the API now (may start a probe)"""
+        now = time.monotonic()
+        with self.lock:
+            if self.state == OPEN and now - self.opened_at >= self.open_seconds:
+                self._transition(HALF_OPEN)
+                self.good_probes = 0
+                self.last_probe = 0.0
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and now - self.last_probe >= self.probe_interval:
+                self.last_probe = now
+                return True
+            return False
+
+    def release_probe(self):
+        """Give back a probe slot that ended without reaching the API (e.g. a cache hit)"""
+        with self.lock:
+            if self.state == HALF_OPEN:
+                self.last_probe = 0.0
+
+    def record(self, ok, latency):
+        """Record the outcome of an API call"""
+        now = time.monotonic()
+        bad = not ok or latency >= self.slow_call_seconds
+        with self.lock:
+            if self.state == HALF_OPEN:
+                if bad:
+                    self._open(now)
+                else:
+                    self.good_probes += 1
+                    if self.good_probes >= self.probe_successes:
+                        self.calls.clear()
+                        self._transition(CLOSED)
+                return
+
+            self.calls.append((now, bad, latency))
+            while self.calls and now - self.calls[0][0] > self.window_seconds:
+                self.calls.popleft()
+            if self.state == CLOSED and len(self.calls) >= self.min_calls:
+                bad_calls = sum(1 for _, was_bad, _ in self.calls if was_bad)
+                if bad_calls / len(self.calls) >= self.failure_rate:
+                    self._open(now)
+
+    def _open(self, now):
+        self.opened_at = now
+        self.calls.clear()
+        self._transition(OPEN)
+
+    def _transition(self, state):
+        if state != self.state:
+            logger.warning(f"DeepSeek circuit {self.state} -> {state}")
+            self.state = state
+
+    def format_status(self):
+        """One-line summary for the status command"""
+        with self.lock:
+            if self.state == OPEN:
+                remaining = max(0.0, self.open_seconds - (time.monotonic() - self.opened_at))
+                return f"open (offline answers, retrying in {remaining:.0f}s)"
+            if self.state == HALF_OPEN:
+                return f"half-open ({self.good_probes}/{self.probe_successes} probes ok)"
+            bad_calls = sum(1 for _, was_bad, _ in self.calls if was_bad)
+            return f"closed ({bad_calls}/{len(self.calls)} bad calls in the last {self.window_seconds:.0f}s)"
@@ -1,64 +1,361 @@
 import requests
 import json
+import random
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
 from config.api_keys import Config
+from ai.prompt_builder import PromptBuilder, text_section
+from ai.response_cache import cache_key, context_items, create_response_cache
+from ai.request_pool import RequestPool, request_key, request_priority
+from ai.circuit_breaker import CircuitBreaker
+from core.memory import shard_path
+from core.memory_shards import current_user, shard_dir
+from utils.logger import setup_logger
+
+logger = setup_logger('deepseek_client')
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+TIMEOUT_RESPONSE = "❌ Request timeout. Please try again."
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """A call ran out of its overall DEEPSEEK_CALL_DEADLINE"""
+
+def retry_after_seconds(response):
+    """Seconds requested by a Retry-After header (delta or HTTP date), if any"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def parse_sse_stream(lines):
+    """Yield content deltas from the server-sent event lines of a streamed completion"""
+    for line in lines:
+        if not line or not line.startswith('data:'):
+            # Blank separators, comments (": keep-alive") and other fields
+            continue
+        data = line[5:].strip()
+        if data == '[DONE]':
+            return
+        try:
+            chunk = json.loads(data)
+        except ValueError:
+            logger.warning(f"Skipping malformed stream chunk: {data[:80]}")
+            continue
+        for choice in chunk.get('choices', []):
+            content = (choice.get('delta') or {}).get('content')
+            if content:
+                yield content
 
 class DeepSeekClient:
     def __init__(self):
         self.api_key = Config.DEEPSEEK_API_KEY
         self.api_url = Config.DEEPSEEK_API_URL
+        self.model = "deepseek-chat"
         self.headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.api_key}"
         }
+        self.timeout = (Config.DEEPSEEK_CONNECT_TIMEOUT, Config.DEEPSEEK_READ_TIMEOUT)
+        self.max_retries = Config.DEEPSEEK_MAX_RETRIES
+        self.session = self.create_session()
+        self.prompt_builder = PromptBuilder()
+        # Response caches by user shard (one shared cache without sharding)
+        self.caches = OrderedDict()
+        self.caches_lock = threading.Lock()
+        self.pool = RequestPool()
+        self.breaker = CircuitBreaker()
     
-    def chat(self, message, context="", personality="helpful assistant", temperature=0.7):
-        """Main chat method with context and personality"""
-        if not self.api_key:
-            return "⚠️ Please set your DeepSeek API key in the .env file"
+    def create_session(self):
+        """Pooled keep-alive session so follow-up turns skip the TCP/TLS handshake"""
+        session = requests.Session()
+        # Retries are handled in post() so backoff can be jittered and logged
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=Config.DEEPSEEK_POOL_SIZE,
+            max_retries=0
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update(self.headers)
+        session.headers['Connection'] = 'keep-alive'
+        return session
+    
+    def backoff_delay(self, attempt, response=None):
+        """Full-jitter exponential backoff, or the server's Retry-After"""
+        if response is not None:
+            retry_after = retry_after_seconds(response)
+            if retry_after is not None:
+                return min(retry_after, Config.DEEPSEEK_BACKOFF_MAX)
+        ceiling = min(Config.DEEPSEEK_BACKOFF_MAX, Config.DEEPSEEK_BACKOFF_BASE * (2 ** attempt))
+        return random.uniform(0, ceiling)
+    
+    def timeout_until(self, deadline):
+        """(connect, read) timeouts capped by the time left before deadline"""
+        if deadline is None:
+            return self.timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded("call deadline passed")
+        return (min(self.timeout[0], remaining), min(self.timeout[1], remaining))
+    
+    def post(self, payload, stream=False, deadline=None):
+        """POST to the API, retrying 429/5xx responses and dropped connections
+        
+        deadline (a time.monotonic() value) caps the timeouts and the retry
+        loop; DeadlineExceeded is raised once it can't be met.
+        """
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(
+                    self.api_url, json=payload, timeout=self.timeout_until(deadline), stream=stream
+                )
+            except requests.exceptions.ConnectionError:
+                # Covers connect timeouts and pooled connections the server
+                # closed; read timeouts are not retried
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.backoff_delay(attempt)
+                logger.warning(f"Connection failed, retrying in {delay:.2f}s ({attempt + 1}/{self.max_retries})")
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                delay = self.backoff_delay(attempt, response)
+                logger.warning(f"API returned {response.status_code}, retrying in {delay:.2f}s ({attempt + 1}/{self.max_retries})")
+                response.close()
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                raise DeadlineExceeded("no time left to retry before the call deadline")
+            time.sleep(delay)
+            attempt += 1
+    
+    def available(self):
+        """Whether callers should use the API now, per the circuit breaker
         
-        system_message = f"""You are JARVIS, a friendly AI assistant. {personality}
+        While the circuit is open this returns False so callers answer
+        offline instead of waiting on a failing or slow API.
+        """
+        return self.breaker.allow_request()
+    
+    def close(self):
+        """Close pooled connections and the response cache"""
+        self.pool.shutdown()
+        self.session.close()
+        with self.caches_lock:
+            caches = list(self.caches.values())
+            self.caches.clear()
+        for cache in caches:
+            if cache is not None:
+                cache.close()
+    
+    def cache_for(self, user=None):
+        """The response cache for a user's shard, opened on first use
         
-        Context from previous conversation:
-        {context}
+        Without MEMORY_SHARDING every user shares RESPONSE_CACHE_FILE. At
+        most MEMORY_MAX_OPEN_SHARDS shard caches stay open.
+        """
+        if not Config.MEMORY_SHARDING:
+            user = None
+        elif user is None:
+            user = Config.DEFAULT_USER_ID
+        evicted = None
+        with self.caches_lock:
+            if user in self.caches:
+                self.caches.move_to_end(user)
+                return self.caches[user]
+            db_file = shard_path(Config.RESPONSE_CACHE_FILE, shard_dir(user)) if user is not None else None
+            cache = self.caches[user] = create_response_cache(db_file)
+            if len(self.caches) > Config.MEMORY_MAX_OPEN_SHARDS:
+                _, evicted = self.caches.popitem(last=False)
+        if evicted is not None:
+            evicted.close()
+        return cache
+    
+    def cache_lookup(self, message, sections, personality, temperature, call_type, user=None):
+        """Return (cache, key, ttl, cached response) for a request
         
-        Be conversational, helpful, and concise in your responses."""
+        key is None when the request must not be cached.
+        """
+        cache = self.cache_for(user)
+        if cache is None:
+            return None, None, 0, None
+        ttl = Config.RESPONSE_CACHE_TTLS.get(call_type, 0)
+        if not ttl or temperature > Config.RESPONSE_CACHE_MAX_TEMPERATURE:
+            cache.bypass()
+            return cache, None, 0, None
+        key = cache_key(self.model, call_type, personality, temperature, message, context_items(sections))
+        return cache, key, ttl, cache.get(key)
+    
+    def build_payload(self, message, sections, personality, temperature, call_type, stream=False):
+        """Build the request body, fitting context into the call type's token budget"""
+        system_message = self.prompt_builder.build_system_message(call_type, personality, message, sections)
+        logger.info(f"Prompt budget {self.prompt_builder.format_report()}")
         
         messages = [
             {"role": "system", "content": system_message},
             {"role": "user", "content": message}
         ]
         
-        payload = {
-            "model": "deepseek-chat",
+        return {
+            "model": self.model,
             "messages": messages,
             "temperature": temperature,
             "max_tokens": 2000,
-            "stream": False
+            "stream": stream
         }
+    
+    def chat(self, message, context="", personality="helpful assistant", temperature=0.7, call_type='chat',
+             priority=None):
+        """Main chat method with context and personality
+        
+        context may be a plain string or a list of PromptSection objects,
+        which are filled by priority within the call type's token budget.
+        Runs on the shared request pool, so identical concurrent calls make
+        one upstream request. priority names a class from
+        Config.REQUEST_PRIORITIES (default: by call type).
+        """
+        return self.submit(message, context, personality, temperature, call_type, priority).result()
+    
+    def submit(self, message, context="", personality="helpful assistant", temperature=0.7, call_type='chat',
+               priority=None):
+        """Queue a chat() call on the request pool and return its Future"""
+        # Pool workers don't see the caller's context, so the user goes along
+        user = current_user.get()
+        key = request_key(message, context, personality, temperature, call_type, user)
+        return self.pool.submit(
+            key, self.complete, message, context, personality, temperature, call_type, user,
+            priority=request_priority(call_type, priority),
+            tokens=self.estimate_tokens(message, context, personality, call_type)
+        )
+    
+    def abandon(self, future):
+        """Give up on a Future from submit() without affecting other callers sharing it"""
+        return self.pool.abandon(future)
+    
+    def estimate_tokens(self, message, context, personality, call_type):
+        """Estimated prompt plus completion tokens, for the tokens-per-minute limit"""
+        sections = [text_section(context)] if isinstance(context, str) else context
+        prompt_tokens = self.prompt_builder.estimate_prompt_tokens(call_type, personality, message, sections)
+        return prompt_tokens + Config.DEEPSEEK_COMPLETION_TOKEN_ESTIMATE
+    
+    def complete(self, message, context="", personality="helpful assistant", temperature=0.7, call_type='chat',
+                 user=None):
+        """Blocking request for one completion (user's cache, then API)"""
+        if not self.api_key:
+            return "⚠️ Please set your DeepSeek API key in the .env file"
+        
+        sections = [text_section(context)] if isinstance(context, str) else context
+        cache, key, ttl, cached = self.cache_lookup(message, sections, personality, temperature, call_type, user)
+        if cached is not None:
+            self.breaker.release_probe()
+            return cached
+        
+        payload = self.build_payload(message, sections, personality, temperature, call_type)
         
+        started = time.monotonic()
         try:
-            response = requests.post(
-                self.api_url, 
-                headers=self.headers, 
-                json=payload,
-                timeout=30
-            )
+            response = self.post(payload, deadline=started + Config.DEEPSEEK_CALL_DEADLINE)
             
             if response.status_code == 200:
                 result = response.json()
-                return result['choices'][0]['message']['content']
+                content = result['choices'][0]['message']['content']
+                self.pool.record_usage((result.get('usage') or {}).get('total_tokens'))
+                latency = time.monotonic() - started
+                self.breaker.record(True, latency)
+                if key is not None:
+                    cache.put(key, call_type, content, latency, ttl)
+                return content
             else:
+                self.breaker.record(False, time.monotonic() - started)
                 return f"❌ API Error {response.status_code}: {response.text}"
                 
         except requests.exceptions.Timeout:
-            return "❌ Request timeout. Please try again."
+            self.breaker.record(False, time.monotonic() - started)
+            return TIMEOUT_RESPONSE
         except requests.exceptions.ConnectionError:
+            self.breaker.record(False, time.monotonic() - started)
             return "❌ Connection error. Please check your internet connection."
         except Exception as e:
+            self.breaker.record(False, time.monotonic() - started)
             return f"❌ Unexpected error: {str(e)}"
     
-    def programming_help(self, problem, language="python", context=""):
-        """Specialized programming help"""
+    def chat_stream(self, message, context="", personality="helpful assistant", temperature=0.7, call_type='chat',
+                    priority=None):
+        """Streaming variant of chat() that yields text as it is generated
+        
+        Errors are yielded as text, like chat() returns them. The stream
+        runs in the caller's thread once the rate limits admit it.
+        """
+        if not self.api_key:
+            yield "⚠️ Please set your DeepSeek API key in the .env file"
+            return
+        
+        sections = [text_section(context)] if isinstance(context, str) else context
+        cache, key, ttl, cached = self.cache_lookup(
+            message, sections, personality, temperature, call_type, current_user.get()
+        )
+        if cached is not None:
+            self.breaker.release_probe()
+            yield cached
+            return
+        
+        self.pool.reserve(
+            request_priority(call_type, priority), self.estimate_tokens(message, sections, personality, call_type)
+        )
+        payload = self.build_payload(message, sections, personality, temperature, call_type, stream=True)
+        
+        started = time.monotonic()
+        try:
+            # The deadline covers the time to the first byte
+            response = self.post(payload, stream=True, deadline=started + Config.DEEPSEEK_CALL_DEADLINE)
+            if response.status_code != 200:
+                self.breaker.record(False, time.monotonic() - started)
+                yield f"❌ API Error {response.status_code}: {response.text}"
+                return
+            # Latency here is time to first byte; generation time is not a fault
+            self.breaker.record(True, time.monotonic() - started)
+            
+            # SSE is always UTF-8, whatever requests guesses for text/*
+            response.encoding = 'utf-8'
+            with response:
+                lines = response.iter_lines(decode_unicode=True)
+                parts = []
+                for content in parse_sse_stream(lines):
+                    parts.append(content)
+                    yield content
+                # Read past [DONE] so the connection goes back to the pool
+                for _ in lines:
+                    pass
+            
+            if key is not None and parts:
+                cache.put(key, call_type, "".join(parts), time.monotonic() - started, ttl)
+                
+        except requests.exceptions.Timeout:
+            self.breaker.record(False, time.monotonic() - started)
+            yield TIMEOUT_RESPONSE
+        except requests.exceptions.ConnectionError:
+            self.breaker.record(False, time.monotonic() - started)
+            yield "❌ Connection error. Please check your internet connection."
+        except Exception as e:
+            self.breaker.record(False, time.monotonic() - started)
+            yield f"❌ Unexpected error: {str(e)}"
+    
+    def send(self, request, stream=False):
+        """Run a request dict from one of the *_request builders"""
+        return self.chat_stream(**request) if stream else self.chat(**request)
+    
+    def programming_request(self, problem, language="python", context=""):
+        """Chat arguments for a programming help request"""
         personality = "expert programming tutor who explains concepts clearly with practical examples and code snippets"
         
         prompt = f"""
@@ -76,10 +373,14 @@ class DeepSeekClient:
         Keep it practical and actionable. Format code properly.
         """
         
-        return self.chat(prompt, context, personality, temperature=0.3)
+        return dict(message=prompt, context=context, personality=personality, temperature=0.3, call_type='programming_help')
     
-    def debug_code(self, code, error_message, language="python"):
-        """Debug specific code with error message"""
+    def programming_help(self, problem, language="python", context="", stream=False):
+        """Specialized programming help"""
+        return self.send(self.programming_request(problem, language, context), stream)
+    
+    def debug_request(self, code, error_message, language="python"):
+        """Chat arguments for debugging code with an error message"""
         prompt = f"""
         Debug this {language} code:
         
@@ -96,9 +397,17 @@ class DeepSeekClient:
         4. Explain the fix
         """
         
-        return self.chat(prompt, personality="expert debugger and programming mentor")
+        return dict(message=prompt, personality="expert debugger and programming mentor", call_type='debug_code')
     
-    def friend_chat(self, message, context=""):
-        """Friendly conversation mode"""
+    def debug_code(self, code, error_message, language="python"):
+        """Debug specific code with error message"""
+        return self.send(self.debug_request(code, error_message, language))
+    
+    def friend_request(self, message, context=""):
+        """Chat arguments for friendly conversation"""
         personality = "caring friend who listens well, shows empathy, remembers details, and engages in meaningful conversation. Be warm and supportive."
-        return self.chat(message, context, personality, temperature=0.8)
\ No newline at end of file
+        return dict(message=message, context=context, personality=personality, temperature=0.8, call_type='friend_chat')
+    
+    def friend_chat(self, message, context="", stream=False):
+        """Friendly conversation mode"""
+        return self.send(self.friend_request(message, context), stream)
\ No newline at end of file
@@ -0,0 +1,120 @@
+import re
+from config.api_keys import Config
+
+PREAMBLE_HEAD = "You are JARVIS, a friendly AI assistant. {personality}\n\nContext from previous conversation:\n"
+PREAMBLE_TAIL = "\n\nBe conversational, helpful, and concise in your responses."
+
+def estimate_tokens(text):
+    """Cheap token estimate (~4 characters per token for English and code)"""
+    if not text:
+        return 0
+    return (len(text) + 3) // 4
+
+def normalize_item(text):
+    """Normalize text so repeated turns compare equal"""
+    return re.sub(r'\s+', ' ', text).strip().lower()
+
+class PromptSection:
+    """A named block of context items, newest (most important) first"""
+
+    def __init__(self, name, items, contiguous=True, dedupe=True):
+        self.name = name
+        self.items = items
+        # Contiguous sections stop at the first item that doesn't fit so the
+        # kept turns have no gaps; other sections skip it and keep going
+        self.contiguous = contiguous
+        self.dedupe = dedupe
+
+def turns_section(turns, name="recent"):
+    """Build a section from (user, assistant) turns stored oldest first"""
+    items = [f"User: {user}\nAssistant: {assistant}" for user, assistant in reversed(turns)]
+    return PromptSection(name, items)
+
+def text_section(text, name="context"):
+    """Build a section from a pre-rendered context string, keeping its latest lines"""
+    lines = [line for line in text.splitlines() if line.strip()]
+    return PromptSection(name, lines[::-1], dedupe=False)
+
+def knowledge_section(knowledge, name="knowledge", max_solution_chars=400):
+    """Build a section from a language's programming knowledge"""
+    items = []
+    for item in reversed(knowledge.get("errors_fixed", [])):
+        solution = item.get("solution") or ""
+        if len(solution) > max_solution_chars:
+            solution = solution[:max_solution_chars] + "..."
+        items.append(f"Previously solved: {item['concept']}\nSolution: {solution}")
+    for item in reversed(knowledge.get("concepts_learned", [])):
+        items.append(f"Asked about: {item['concept']}")
+    return PromptSection(name, items, contiguous=False)
+
+class PromptBuilder:
+    """Fit prompt context into a per-call-type token budget"""
+
+    def __init__(self, budgets=None):
+        self.budgets = budgets or Config.PROMPT_TOKEN_BUDGETS
+        self._preambles = {}
+        self.last_report = {}
+
+    def preamble(self, personality):
+        """Get the rendered system preamble and its token cost (cached)"""
+        cached = self._preambles.get(personality)
+        if cached is None:
+            head = PREAMBLE_HEAD.format(personality=personality)
+            cached = (head, estimate_tokens(head) + estimate_tokens(PREAMBLE_TAIL))
+            self._preambles[personality] = cached
+        return cached
+
+    def estimate_prompt_tokens(self, call_type, personality, message, sections):
+        """Upper estimate of a request's prompt tokens without rendering it"""
+        budget = self.budgets.get(call_type, self.budgets['chat'])
+        _, preamble_tokens = self.preamble(personality)
+        context_tokens = sum(estimate_tokens(item) + 1 for section in sections for item in section.items)
+        return min(budget, preamble_tokens + context_tokens) + estimate_tokens(message)
+
+    def build_system_message(self, call_type, personality, message, sections):
+        """Render the system message, filling sections by priority within budget"""
+        budget = self.budgets.get(call_type, self.budgets['chat'])
+        head, preamble_tokens = self.preamble(personality)
+        message_tokens = estimate_tokens(message)
+        remaining = budget - preamble_tokens - message_tokens
+
+        usage = {"preamble": preamble_tokens, "message": message_tokens}
+        seen = set()
+        blocks = []
+        for section in sections:
+            kept = []
+            used = 0
+            for item in section.items:
+                key = normalize_item(item)
+                if not key or (section.dedupe and key in seen):
+                    continue
+                cost = estimate_tokens(item) + 1
+                if cost > remaining:
+                    if section.contiguous:
+                        break
+                    continue
+                seen.add(key)
+                kept.append(item)
+                used += cost
+                remaining -= cost
+            usage[section.name] = used
+            if kept:
+                # Items arrive newest first but read best oldest first
+                kept.reverse()
+                blocks.append("\n".join(kept))
+
+        self.last_report = {
+            "call_type": call_type,
+            "budget": budget,
+            "used": budget - remaining,
+            "sections": usage
+        }
+        return head + "\n\n".join(blocks) + PREAMBLE_TAIL
+
+    def format_report(self, report=None):
+        """Format a token usage report for logs and status output"""
+        report = report or self.last_report
+        if not report:
+            return "No prompts built yet"
+        sections = ", ".join(f"{name}={tokens}" for name, tokens in report["sections"].items())
+        return f"{report['call_type']}: {report['used']}/{report['budget']} tokens ({sections})"
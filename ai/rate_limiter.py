@@ -0,0 +1,72 @@
+import threading
+import time
+from config.api_keys import Config
+
+class TokenBucket:
+    """Continuously refilled bucket of rate_per_minute units
+
+    Holds at most capacity units; a rate of 0 means unlimited.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, self.rate * Config.DEEPSEEK_RATE_BURST_SECONDS)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until amount units are available (0 if they are now)"""
+        if not self.rate:
+            return 0.0
+        self._refill(now)
+        # A request bigger than the whole bucket waits for a full one
+        needed = min(amount, self.capacity)
+        if self.level >= needed:
+            return 0.0
+        return (needed - self.level) / self.rate
+
+    def take(self, amount):
+        """Remove units; the level may go negative to settle a late correction"""
+        if self.rate:
+            self.level -= amount
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits checked together
+
+    Not thread-safe on its own; RequestPool calls it under its lock.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None):
+        if requests_per_minute is None:
+            requests_per_minute = Config.DEEPSEEK_REQUESTS_PER_MINUTE
+        if tokens_per_minute is None:
+            tokens_per_minute = Config.DEEPSEEK_TOKENS_PER_MINUTE
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    def reserve(self, tokens):
+        """Admit a request costing tokens: 0 if admitted, else seconds to wait"""
+        now = time.monotonic()
+        wait = max(self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+        if wait > 0:
+            return wait
+        self.requests.take(1)
+        self.tokens.take(min(tokens, self.tokens.capacity))
+        return 0.0
+
+    def correct(self, extra_tokens):
+        """Charge (or refund) the difference between actual and estimated tokens"""
+        self.tokens.take(extra_tokens)
+
+    def format_limits(self):
+        """Describe the configured limits"""
+        parts = []
+        if self.requests.rate:
+            parts.append(f"{self.requests.rate * 60:.0f} req/min")
+        if self.tokens.rate:
+            parts.append(f"{self.tokens.rate * 60:.0f} tokens/min")
+        return ", ".join(parts) or "unlimited"
@@ -0,0 +1,204 @@
+import hashlib
+import heapq
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from config.api_keys import Config
+from ai.rate_limiter import RateLimiter
+
+def request_key(message, context, personality, temperature, call_type, user=None):
+    """Identify a chat request exactly, for coalescing identical in-flight calls"""
+    if isinstance(context, str):
+        context_parts = context
+    else:
+        context_parts = [[section.name, list(section.items)] for section in context]
+    parts = [call_type, personality, temperature, message, context_parts, user]
+    return hashlib.sha256(json.dumps(parts, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+def request_priority(call_type, priority=None):
+    """Rank of a priority class (0 is served first) for a call type"""
+    name = priority or Config.CALL_TYPE_PRIORITIES.get(call_type, Config.REQUEST_PRIORITIES[0])
+    return Config.REQUEST_PRIORITIES.index(name)
+
+class _Job:
+    __slots__ = ('future', 'function', 'args', 'priority', 'tokens', 'queued_at', 'throttled', 'waiters')
+
+    def __init__(self, future, function, args, priority, tokens):
+        self.future = future
+        self.function = function
+        self.args = args
+        self.priority = priority
+        self.tokens = tokens
+        self.queued_at = time.monotonic()
+        self.throttled = False
+        # Callers sharing the Future through single-flight
+        self.waiters = 1
+
+class RequestPool:
+    """Priority scheduler for blocking API calls with rate limits and single-flight
+
+    Queued calls start in priority order (then FIFO) once the rate limiter
+    has room for their estimated tokens, with at most max_concurrency
+    running at once. A call submitted while an identical one (same key)
+    is still in flight gets the same Future instead of a second upstream
+    call, and raises the queued call's priority if it is more urgent.
+    """
+
+    def __init__(self, max_concurrency=None, limiter=None):
+        self.max_concurrency = max_concurrency or Config.DEEPSEEK_MAX_CONCURRENCY
+        self.limiter = limiter or RateLimiter()
+        self.queue = []
+        self.sequence = itertools.count()
+        self.in_flight = {}
+        self.lock = threading.Lock()
+        self.ready = threading.Condition(self.lock)
+        self.closed = False
+        self._local = threading.local()
+        self.stats = {"submitted": 0, "coalesced": 0, "throttled": 0, "estimated_tokens": 0, "actual_tokens": 0}
+        # Recent queue waits per priority class, in seconds
+        self.waits = {name: deque(maxlen=1000) for name in Config.REQUEST_PRIORITIES}
+        self.workers = [
+            threading.Thread(target=self._work, name=f'deepseek-{index}', daemon=True)
+            for index in range(self.max_concurrency)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, key, function, *args, priority=0, tokens=0):
+        """Queue function(*args) and return its Future, sharing the Future of an identical call
+
+        priority is a rank from request_priority(); tokens is the estimated
+        token cost charged against the tokens-per-minute limit.
+        """
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("cannot submit requests after shutdown")
+            self.stats["submitted"] += 1
+            job = self.in_flight.get(key) if key is not None else None
+            if job is not None:
+                self.stats["coalesced"] += 1
+                job.waiters += 1
+                if priority < job.priority:
+                    # Still queued (started jobs have priority -1): requeue
+                    # at the higher priority; the old entry is skipped
+                    job.priority = priority
+                    heapq.heappush(self.queue, (priority, next(self.sequence), job))
+                    self.ready.notify()
+                return job.future
+            job = _Job(Future(), function, args, priority, tokens)
+            self.stats["estimated_tokens"] += tokens
+            heapq.heappush(self.queue, (priority, next(self.sequence), job))
+            if key is not None:
+                self.in_flight[key] = job
+            self.ready.notify()
+        if key is not None:
+            job.future.add_done_callback(lambda _: self._finished(key, job))
+        return job.future
+
+    def abandon(self, future):
+        """Drop one caller's interest in a Future from submit()
+
+        The call is cancelled (if it hasn't started) only once every caller
+        sharing the Future has abandoned it; returns whether it was.
+        """
+        with self.lock:
+            job = next((job for job in self.in_flight.values() if job.future is future), None)
+            if job is not None:
+                job.waiters -= 1
+                if job.waiters > 0:
+                    return False
+        return future.cancel()
+
+    def reserve(self, priority=0, tokens=0):
+        """Block until a request that runs outside the pool (a stream) may start"""
+        self.submit(None, lambda: None, priority=priority, tokens=tokens).result()
+
+    def record_usage(self, total_tokens):
+        """Correct the running call's token estimate with the usage the API reported"""
+        job = getattr(self._local, 'job', None)
+        if job is None or not total_tokens:
+            return
+        with self.lock:
+            self.limiter.correct(total_tokens - job.tokens)
+            self.stats["actual_tokens"] += total_tokens
+
+    def _next_job(self):
+        """Wait for the most urgent queued job the rate limits admit"""
+        with self.ready:
+            while True:
+                while self.queue:
+                    priority, _, job = self.queue[0]
+                    if job.priority == priority and not job.future.done():
+                        break
+                    # Superseded by a requeue at higher priority, or cancelled
+                    heapq.heappop(self.queue)
+                if not self.queue:
+                    if self.closed:
+                        return None
+                    self.ready.wait()
+                    continue
+                wait = self.limiter.reserve(job.tokens)
+                if wait <= 0:
+                    heapq.heappop(self.queue)
+                    job.priority = -1
+                    self.waits[Config.REQUEST_PRIORITIES[priority]].append(time.monotonic() - job.queued_at)
+                    return job
+                if not job.throttled:
+                    job.throttled = True
+                    self.stats["throttled"] += 1
+                self.ready.wait(wait)
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            self._local.job = job
+            try:
+                result = job.function(*job.args)
+            except BaseException as e:
+                job.future.set_exception(e)
+            else:
+                job.future.set_result(result)
+            finally:
+                self._local.job = None
+
+    def _finished(self, key, job):
+        with self.lock:
+            if self.in_flight.get(key) is job:
+                del self.in_flight[key]
+
+    def wait_stats(self):
+        """{priority class: (count, mean seconds, p95 seconds)} of queue waits"""
+        with self.lock:
+            samples = {name: sorted(waits) for name, waits in self.waits.items() if waits}
+        return {
+            name: (len(waits), sum(waits) / len(waits), waits[min(len(waits) - 1, int(0.95 * len(waits)))])
+            for name, waits in samples.items()
+        }
+
+    def format_stats(self):
+        """One-line summary for the status command"""
+        waits = ", ".join(
+            f"{name} wait {mean * 1000:.0f}ms avg/{p95 * 1000:.0f}ms p95"
+            for name, (_, mean, p95) in self.wait_stats().items()
+        )
+        summary = (
+            f"{self.stats['submitted']} requests ({self.stats['coalesced']} coalesced, "
+            f"{self.stats['throttled']} throttled), up to {self.max_concurrency} at once, "
+            f"{self.limiter.format_limits()}, ~{self.stats['estimated_tokens']} tokens estimated"
+        )
+        if self.stats['actual_tokens']:
+            summary += f" ({self.stats['actual_tokens']} reported)"
+        return f"{summary}; {waits}" if waits else summary
+
+    def shutdown(self):
+        """Stop accepting work and let queued requests finish"""
+        with self.ready:
+            self.closed = True
+            self.ready.notify_all()
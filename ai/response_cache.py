@@ -0,0 +1,177 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from config.api_keys import Config
+from utils.logger import setup_logger
+
+logger = setup_logger('response_cache')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    call_type TEXT NOT NULL,
+    response TEXT NOT NULL,
+    latency REAL NOT NULL,
+    expires REAL NOT NULL,
+    last_access REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_access ON responses (last_access);
+"""
+
+def normalize_prompt(text):
+    """Normalize case, whitespace and sentence punctuation of a prompt
+
+    Only punctuation followed by whitespace (or the end) is dropped, so
+    code such as "obj.attr" keeps its meaning.
+    """
+    text = re.sub(r'[?!.,;:]+(?=\s|$)', '', text.lower())
+    return re.sub(r'\s+', ' ', text).strip()
+
+def cache_key(model, call_type, personality, temperature, message, context_items):
+    """Hash everything that shapes the answer into a cache key"""
+    parts = [model, call_type, personality, round(temperature, 2), normalize_prompt(message), context_items]
+    return hashlib.sha256(json.dumps(parts, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+def context_items(sections):
+    """Normalized items of every prompt section, for the cache key
+
+    Recent turns, summaries and recalled context all shape the answer, so
+    a follow-up only hits the cache in the same conversation state.
+    """
+    return [
+        [section.name, [normalize_prompt(item) for item in section.items]]
+        for section in sections
+        if section.items
+    ]
+
+class ResponseCache:
+    """Two-tier response cache: an in-memory LRU in front of a SQLite file
+
+    Entries expire after their call type's TTL. The SQLite tier evicts the
+    least recently used entries once it grows past max_bytes.
+    """
+
+    def __init__(self, db_file=None, max_memory_entries=None, max_bytes=None):
+        self.db_file = db_file or Config.RESPONSE_CACHE_FILE
+        self.max_memory_entries = max_memory_entries or Config.RESPONSE_CACHE_MEMORY_ENTRIES
+        self.max_bytes = max_bytes or Config.RESPONSE_CACHE_MAX_BYTES
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.closed = False
+        self.stats = {"hits": 0, "memory_hits": 0, "misses": 0, "bypassed": 0, "saved_seconds": 0.0}
+
+        os.makedirs(os.path.dirname(self.db_file) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.execute("DELETE FROM responses WHERE expires < ?", (time.time(),))
+        self.conn.commit()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key):
+        """Cached response for key, or None (counted as a miss)"""
+        now = time.time()
+        with self.lock:
+            if self.closed:
+                # Evicted along with its shard while a request was in flight
+                return None
+            entry = self.memory.get(key)
+            if entry is not None and entry[2] >= now:
+                self.memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return self._hit(entry)
+
+            row = self.conn.execute(
+                "SELECT response, latency, expires FROM responses WHERE key = ? AND expires >= ?",
+                (key, now)
+            ).fetchone()
+            if row is None:
+                self.memory.pop(key, None)
+                self.stats["misses"] += 1
+                return None
+
+            self.conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self._remember(key, row)
+            return self._hit(row)
+
+    def _hit(self, entry):
+        response, latency, _ = entry
+        self.stats["hits"] += 1
+        self.stats["saved_seconds"] += latency
+        return response
+
+    def _remember(self, key, entry):
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
+
+    def put(self, key, call_type, response, latency, ttl):
+        """Store a response with the upstream latency it took"""
+        now = time.time()
+        size = len(response.encode('utf-8'))
+        with self.lock:
+            if self.closed:
+                return
+            previous = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, call_type, response, latency, expires, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, call_type, response, latency, now + ttl, now, size)
+            )
+            self.total_bytes += size - (previous[0] if previous else 0)
+            self._evict()
+            self.conn.commit()
+            self._remember(key, (response, latency, now + ttl))
+
+    def _evict(self):
+        """Drop least recently used rows until the file tier fits max_bytes"""
+        while self.total_bytes > self.max_bytes:
+            rows = self.conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access LIMIT 50"
+            ).fetchall()
+            if not rows:
+                self.total_bytes = 0
+                return
+            for key, size in rows:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.memory.pop(key, None)
+                self.total_bytes -= size
+                if self.total_bytes <= self.max_bytes:
+                    return
+
+    def bypass(self):
+        """Count a request that skipped the cache"""
+        with self.lock:
+            self.stats["bypassed"] += 1
+
+    def format_stats(self):
+        """One-line summary for the status command"""
+        stats = self.stats
+        return (
+            f"{stats['hits']} hits ({stats['memory_hits']} in memory), {stats['misses']} misses, "
+            f"{stats['bypassed']} bypassed, {stats['saved_seconds']:.1f}s saved"
+        )
+
+    def close(self):
+        """Close the database"""
+        with self.lock:
+            self.closed = True
+            self.conn.close()
+
+def create_response_cache(db_file=None):
+    """Create the response cache if enabled"""
+    if not Config.RESPONSE_CACHE:
+        return None
+    try:
+        return ResponseCache(db_file)
+    except Exception as e:
+        logger.error(f"Could not open response cache: {e}")
+        return None
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Compare the statistical intent classifier with the keyword rules.
+
+Accuracy is measured with k-fold cross validation over the labeled
+utterance file (each fold is held out from training), and latency per
+utterance for the rules, single classify() calls and classify_batch().
+
+    python benchmarks/bench_intent_classifier.py --folds 5 --batch 10000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.api_keys import Config
+from core.intent_classifier import IntentClassifier, load_training_data
+
+def keyword_rules():
+    """The JARVIS keyword rules without starting speech, memory or AI clients"""
+    from main import JARVIS
+    rules = JARVIS.__new__(JARVIS)
+    rules.setup_command_keywords()
+    return rules.classify_intent_by_keywords
+
+def per_utterance_us(function, items, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(items)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(items) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data', default=Config.INTENT_TRAINING_FILE)
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--batch', type=int, default=10000)
+    args = parser.parse_args()
+
+    texts, labels = load_training_data(args.data)
+    rules = keyword_rules()
+
+    correct = {'rules': 0, 'classifier': 0, 'classifier+fallback': 0}
+    fallbacks = 0
+    for fold in range(args.folds):
+        train = [i for i in range(len(texts)) if i % args.folds != fold]
+        test = [i for i in range(len(texts)) if i % args.folds == fold]
+        model = IntentClassifier().fit([texts[i] for i in train], [labels[i] for i in train])
+        held_out = [texts[i] for i in test]
+        predictions = model.classify_batch(held_out)
+        combined = model.classify_batch(held_out, fallback=rules)
+        for i, (intent, confidence), (combined_intent, _) in zip(test, predictions, combined):
+            correct['rules'] += rules(texts[i]) == labels[i]
+            correct['classifier'] += intent == labels[i]
+            correct['classifier+fallback'] += combined_intent == labels[i]
+            fallbacks += confidence < model.min_confidence
+
+    print(f"Utterances: {len(texts)} ({args.folds}-fold cross validation)")
+    for name, count in correct.items():
+        print(f"{name:<20} accuracy {100 * count / len(texts):6.1f} %")
+    print(f"Low-confidence predictions sent to rules: {fallbacks}")
+
+    model = IntentClassifier()
+    start = time.perf_counter()
+    model.fit(texts, labels)
+    print(f"\nTraining time: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    batch = (texts * (args.batch // len(texts) + 1))[:args.batch]
+    print(f"Latency per utterance over {len(batch)} utterances:")
+    print(f"  keyword rules          {per_utterance_us(lambda items: [rules(t) for t in items], batch):8.2f} us")
+    print(f"  classify() one by one  {per_utterance_us(lambda items: [model.classify(t) for t in items], batch):8.2f} us")
+    print(f"  classify_batch()       {per_utterance_us(model.classify_batch, batch):8.2f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Compare memory use of dict vs compact conversation records.
+
+Each variant runs in a fresh subprocess that decodes a JSON history of N
+turns (as MemorySystem.load_memory does) and reports its RSS growth.
+
+    python benchmarks/bench_memory_records.py --turns 100000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def current_rss_kb():
+    """Resident set size of this process in KB (Linux /proc, else peak RSS)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def build_history_json(turns):
+    start = datetime(2025, 1, 1)
+    history = [
+        {
+            "timestamp": (start + timedelta(seconds=i * 37)).isoformat(),
+            "user": f"how do I fix error number {i} in my python script",
+            "assistant": f"Check line {i % 200} and make sure the variable is defined before use.",
+            "type": "conversation"
+        }
+        for i in range(turns)
+    ]
+    return json.dumps(history)
+
+def run_variant(variant, turns):
+    payload = build_history_json(turns)
+    import gc
+    gc.collect()
+    before = current_rss_kb()
+
+    if variant == 'compact':
+        from core.records import record_object_hook
+        history = json.loads(payload, object_hook=record_object_hook)
+    else:
+        history = json.loads(payload)
+    gc.collect()
+
+    after = current_rss_kb()
+    print(json.dumps({"variant": variant, "turns": len(history), "rss_kb": after - before}))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--turns', type=int, default=100000)
+    parser.add_argument('--variant', choices=['dict', 'compact'])
+    args = parser.parse_args()
+
+    if args.variant:
+        run_variant(args.variant, args.turns)
+        return
+
+    results = {}
+    for variant in ('dict', 'compact'):
+        output = subprocess.check_output(
+            [sys.executable, os.path.abspath(__file__), '--turns', str(args.turns), '--variant', variant],
+            text=True
+        )
+        results[variant] = json.loads(output.strip().splitlines()[-1])
+
+    dict_kb = results['dict']['rss_kb']
+    compact_kb = results['compact']['rss_kb']
+    print(f"Turns: {args.turns}")
+    print(f"dict records:    {dict_kb / 1024:8.1f} MB")
+    print(f"compact records: {compact_kb / 1024:8.1f} MB")
+    if dict_kb > 0:
+        print(f"Reduction:       {100 * (1 - compact_kb / dict_kb):8.1f} %")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""Compare the NumPy VAD with speech_recognition-style energy endpointing.
+
+Runs both over WAV fixtures with known speech boundaries and reports
+detection rate, onset and endpoint latency (detected minus true time) on
+speech fixtures, and false-trigger rate on noise-only fixtures.
+
+    python benchmarks/bench_vad.py                      # synthetic fixtures
+    python benchmarks/bench_vad.py --save-fixtures data/vad_fixtures
+    python benchmarks/bench_vad.py --fixtures data/vad_fixtures
+
+A fixture directory holds 16-bit mono WAV files and labels.json mapping
+each file name to its [[start, end], ...] speech seconds ([] for noise
+only), so recorded clips can be labelled and dropped in.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+import wave
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from core.vad import VoiceActivityDetector
+
+SAMPLE_RATE = 16000
+CHUNK = 1024
+
+def noise(rng, kind, seconds, level_db):
+    """Background noise at level_db dBFS"""
+    n = int(seconds * SAMPLE_RATE)
+    if kind == 'white':
+        signal = rng.standard_normal(n)
+    elif kind == 'brown':
+        signal = np.cumsum(rng.standard_normal(n))
+        signal -= np.convolve(signal, np.ones(400) / 400, mode='same')
+    elif kind == 'hum':
+        t = np.arange(n) / SAMPLE_RATE
+        signal = sum(np.sin(2 * np.pi * 50 * k * t) / k for k in range(1, 6)) + 0.1 * rng.standard_normal(n)
+    elif kind == 'fan':
+        signal = np.convolve(rng.standard_normal(n), np.ones(8) / 8, mode='same')
+    else:
+        raise ValueError(kind)
+    rms = np.sqrt(np.mean(signal ** 2)) or 1.0
+    return signal / rms * 10 ** (level_db / 20)
+
+def transients(rng, seconds, level_db, rate=3.0):
+    """Keyboard-like clicks: a few ms of decaying noise at random times"""
+    n = int(seconds * SAMPLE_RATE)
+    signal = np.zeros(n)
+    for _ in range(rng.poisson(rate * seconds)):
+        start = rng.integers(0, max(1, n - 200))
+        length = min(int(rng.uniform(0.004, 0.015) * SAMPLE_RATE), n - start)
+        signal[start:start + length] += rng.standard_normal(length) * np.exp(-np.arange(length) / (length / 4))
+    return signal * 10 ** (level_db / 20) * 3
+
+def utterance(rng, level_db):
+    """Speech-like signal: voiced syllables with formants and some fricatives"""
+    f0 = rng.uniform(95, 230)
+    parts = []
+    for _ in range(rng.integers(2, 9)):
+        if rng.random() < 0.25:
+            # Fricative: high-passed noise
+            length = int(rng.uniform(0.06, 0.12) * SAMPLE_RATE)
+            hiss = np.diff(rng.standard_normal(length + 1)) * 0.3
+            parts.append(hiss * np.hanning(length))
+        length = int(rng.uniform(0.12, 0.28) * SAMPLE_RATE)
+        t = np.arange(length) / SAMPLE_RATE
+        pitch = f0 * (1 + 0.08 * np.sin(2 * np.pi * rng.uniform(2, 5) * t))
+        phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+        formants = (rng.uniform(300, 900), rng.uniform(900, 2500))
+        voiced = np.zeros(length)
+        for harmonic in range(1, 25):
+            frequency = f0 * harmonic
+            if frequency > SAMPLE_RATE / 2 - 500:
+                break
+            weight = sum(1.0 / (1 + ((frequency - formant) / 150) ** 2) for formant in formants) + 0.05
+            voiced += weight * np.sin(harmonic * phase) / harmonic ** 0.5
+        parts.append(voiced * np.hanning(length) ** 0.5)
+        if rng.random() < 0.5:
+            parts.append(np.zeros(int(rng.uniform(0.03, 0.12) * SAMPLE_RATE)))
+    speech = np.concatenate(parts)
+    # Trim the trailing gap so the label ends on sound
+    speech = np.trim_zeros(speech, 'b')
+    rms = np.sqrt(np.mean(speech ** 2))
+    return speech / rms * 10 ** (level_db / 20)
+
+def synthetic_fixtures(seed=7, count=40):
+    """[(name, samples int16, [(start, end)])] of speech in noise and noise only"""
+    rng = np.random.default_rng(seed)
+    kinds = ['white', 'brown', 'hum', 'fan']
+    fixtures = []
+    for index in range(count):
+        kind = kinds[index % len(kinds)]
+        noise_db = rng.uniform(-60, -38)
+        lead, tail = rng.uniform(1.0, 1.6), 1.5
+        if index % 2 == 0:
+            speech = utterance(rng, noise_db + rng.uniform(8, 30))
+            duration = lead + len(speech) / SAMPLE_RATE + tail
+            signal = noise(rng, kind, duration, noise_db)
+            start = int(lead * SAMPLE_RATE)
+            signal[start:start + len(speech)] += speech
+            labels = [(lead, lead + len(speech) / SAMPLE_RATE)]
+            name = f"speech_{index:02d}_{kind}.wav"
+        else:
+            duration = rng.uniform(3, 6)
+            signal = noise(rng, kind, duration, noise_db)
+            if index % 4 == 1:
+                signal += transients(rng, duration, noise_db + 20)
+            else:
+                # A level change, like a fan speeding up
+                step = int(rng.uniform(1.2, duration - 1) * SAMPLE_RATE)
+                signal[step:] *= 10 ** (rng.uniform(3, 6) / 20)
+            labels = []
+            name = f"noise_{index:02d}_{kind}.wav"
+        fixtures.append((name, np.clip(signal * 32768, -32768, 32767).astype(np.int16), labels))
+    return fixtures
+
+def load_fixtures(directory):
+    with open(os.path.join(directory, 'labels.json'), 'r', encoding='utf-8') as f:
+        labels = json.load(f)
+    fixtures = []
+    for name, segments in sorted(labels.items()):
+        with wave.open(os.path.join(directory, name), 'rb') as wav:
+            if wav.getnchannels() != 1 or wav.getsampwidth() != 2 or wav.getframerate() != SAMPLE_RATE:
+                raise ValueError(f"{name}: fixtures must be 16-bit mono {SAMPLE_RATE} Hz")
+            samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        fixtures.append((name, samples, [tuple(segment) for segment in segments]))
+    return fixtures
+
+def save_fixtures(fixtures, directory):
+    os.makedirs(directory, exist_ok=True)
+    for name, samples, _ in fixtures:
+        with wave.open(os.path.join(directory, name), 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(SAMPLE_RATE)
+            wav.writeframes(samples.tobytes())
+    with open(os.path.join(directory, 'labels.json'), 'w', encoding='utf-8') as f:
+        json.dump({name: segments for name, _, segments in fixtures}, f, indent=2)
+
+def energy_segments(samples, calibration=1.0, pause_threshold=0.8, phrase_threshold=0.3,
+                    dynamic_ratio=1.5, damping=0.15, non_speaking=0.5):
+    """speech_recognition's adjust_for_ambient_noise + listen, chunk by chunk"""
+    seconds_per_buffer = CHUNK / SAMPLE_RATE
+    threshold = 300.0
+    chunks = [samples[i:i + CHUNK] for i in range(0, len(samples) - CHUNK + 1, CHUNK)]
+    energies = [math.sqrt(np.mean(chunk.astype(np.float64) ** 2)) for chunk in chunks]
+    calibration_chunks = int(calibration / seconds_per_buffer)
+    factor = damping ** seconds_per_buffer
+    for energy in energies[:calibration_chunks]:
+        threshold = threshold * factor + energy * dynamic_ratio * (1 - factor)
+
+    segments = []
+    index = calibration_chunks
+    while index < len(energies):
+        # Wait for a phrase to start, adapting the threshold
+        while index < len(energies) and energies[index] <= threshold:
+            threshold = threshold * factor + energies[index] * dynamic_ratio * (1 - factor)
+            index += 1
+        if index >= len(energies):
+            break
+        start = index
+        pause = phrase = 0
+        while index < len(energies):
+            if energies[index] > threshold:
+                pause = 0
+                phrase += 1
+            else:
+                pause += 1
+            index += 1
+            if pause * seconds_per_buffer > pause_threshold:
+                break
+        if phrase * seconds_per_buffer >= phrase_threshold:
+            preroll = min(non_speaking, start * seconds_per_buffer)
+            segments.append((start * seconds_per_buffer - preroll, index * seconds_per_buffer))
+    return segments
+
+def vad_segments(samples, aggressiveness):
+    """Stream the fixture through the VAD in microphone-sized chunks"""
+    vad = VoiceActivityDetector(SAMPLE_RATE, aggressiveness=aggressiveness)
+    segments = []
+    start = None
+    data = samples.tobytes()
+    for offset in range(0, len(data), CHUNK * 2):
+        for kind, at in vad.update(data[offset:offset + CHUNK * 2]):
+            if kind == 'start':
+                start = at
+            else:
+                segments.append((start, at))
+    if vad.in_speech:
+        segments.append((start, len(samples) / SAMPLE_RATE))
+    return segments
+
+def evaluate(name, detect, fixtures):
+    onsets, endpoints, detected, speech_count, false_triggers, noise_count = [], [], 0, 0, 0, 0
+    started = time.perf_counter()
+    for _, samples, labels in fixtures:
+        segments = detect(samples)
+        if not labels:
+            noise_count += 1
+            false_triggers += bool(segments)
+            continue
+        speech_count += 1
+        true_start, true_end = labels[0][0], labels[-1][1]
+        overlapping = [segment for segment in segments if segment[1] > true_start and segment[0] < true_end]
+        if overlapping:
+            detected += 1
+            onsets.append(overlapping[0][0] - true_start)
+            endpoints.append(overlapping[-1][1] - true_end)
+    elapsed = time.perf_counter() - started
+    audio_seconds = sum(len(samples) for _, samples, _ in fixtures) / SAMPLE_RATE
+
+    def stat(values, fraction):
+        return sorted(values)[min(len(values) - 1, int(fraction * len(values)))] * 1000 if values else float('nan')
+
+    print(
+        f"{name:<14} {100 * detected / max(1, speech_count):>7.1f}% {100 * false_triggers / max(1, noise_count):>8.1f}% "
+        f"{stat(onsets, 0.5):>9.0f} {stat(endpoints, 0.5):>9.0f} {stat(endpoints, 0.95):>9.0f} "
+        f"{audio_seconds / elapsed:>8.0f}x"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fixtures', help='directory of WAV fixtures with labels.json')
+    parser.add_argument('--save-fixtures', help='write the synthetic fixtures to this directory')
+    parser.add_argument('--count', type=int, default=40, help='number of synthetic fixtures')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    if args.fixtures:
+        fixtures = load_fixtures(args.fixtures)
+    else:
+        fixtures = synthetic_fixtures(args.seed, args.count)
+        if args.save_fixtures:
+            save_fixtures(fixtures, args.save_fixtures)
+    speech = sum(1 for _, _, labels in fixtures if labels)
+    print(f"{len(fixtures)} fixtures ({speech} with speech, {len(fixtures) - speech} noise only)\n")
+
+    print(f"{'detector':<14} {'detected':>8} {'false trig':>9} {'onset p50':>9} {'end p50':>9} {'end p95':>9} {'speed':>9}")
+    print(f"{'':<14} {'':>8} {'':>9} {'ms':>9} {'ms':>9} {'ms':>9} {'realtime':>9}")
+    evaluate("energy (sr)", energy_segments, fixtures)
+    for level in range(4):
+        evaluate(f"vad aggr={level}", lambda samples, level=level: vad_segments(samples, level), fixtures)
+
+if __name__ == "__main__":
+    main()
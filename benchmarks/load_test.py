@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""Drive JARVIS.process_command with concurrent synthetic users.
+
+Starts the mock DeepSeek server in-process (or targets --url), builds a
+JARVIS with silent speech and memory in a scratch directory, and reports
+p50/p95/p99 latency, throughput and error rate per routed intent.
+
+    python benchmarks/load_test.py --users 16 --commands 25 --latency 300 --latency-dist lognormal --rate-429 0.05
+
+Web commands open browsers and hit real sites, so they are left out
+unless listed in --intents.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config.api_keys import Config
+from core.intent_classifier import load_training_data
+from mock_deepseek import MockDeepSeekServer, add_arguments, settings_from_args
+
+ERROR_PREFIXES = ('❌', '⚠️', 'Sorry, I encountered an error')
+
+class SilentSpeech:
+    """Speech engine stand-in that discards output"""
+
+    interruptions = 0
+    tts_cache = None
+
+    def speak(self, text, wait=True):
+        pass
+
+    def listen(self, timeout=5, phrase_time_limit=10):
+        return ""
+
+    def interrupt(self):
+        pass
+
+    def wait_until_done(self, timeout=None):
+        return True
+
+    def shutdown(self):
+        pass
+
+class RecordingMemory:
+    """Memory wrapper that remembers the last stored response per thread"""
+
+    def __init__(self, memory):
+        self._memory = memory
+        self._local = threading.local()
+
+    def add_conversation(self, user_input, assistant_response):
+        self._local.response = assistant_response
+        return self._memory.add_conversation(user_input, assistant_response)
+
+    def take_response(self):
+        response = getattr(self._local, 'response', None)
+        self._local.response = None
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._memory, name)
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def build_jarvis(args):
+    """JARVIS with silent speech and its memory in the current (scratch) directory"""
+    from main import JARVIS
+    from core.memory import create_memory_system
+    from core.memory_shards import MemoryShardManager, ShardedMemory
+
+    memory = ShardedMemory(MemoryShardManager()) if args.sharded else create_memory_system()
+    jarvis = JARVIS(
+        speech=SilentSpeech(),
+        memory=RecordingMemory(memory),
+        voice_test=False,
+        handle_signals=False
+    )
+    jarvis.online_mode = not args.offline
+    return jarvis
+
+def run_user(jarvis, user_id, commands, args):
+    """One synthetic user issuing commands back to back"""
+    results = []
+    rng = random.Random(f"{args.seed}-{user_id}")
+    for _ in range(args.commands):
+        command = rng.choice(commands)
+        intent = jarvis.classify_intent(command)
+        started = time.perf_counter()
+        try:
+            jarvis.process_command(command, user_id=user_id if args.sharded else None)
+            response = jarvis.memory.take_response() or ""
+            failed = response == "Error occurred" or response.startswith(ERROR_PREFIXES)
+        except Exception:
+            failed = True
+        results.append((intent, time.perf_counter() - started, failed))
+        if args.think_time:
+            time.sleep(rng.uniform(0, args.think_time / 1000.0))
+    return results
+
+def report(results, elapsed):
+    by_intent = {}
+    for intent, latency, failed in results:
+        by_intent.setdefault(intent, []).append((latency, failed))
+    by_intent['all'] = [(latency, failed) for _, latency, failed in results]
+
+    print(f"\n{'intent':<12} {'count':>6} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for intent, samples in sorted(by_intent.items(), key=lambda item: (item[0] == 'all', item[0])):
+        latencies = sorted(latency for latency, _ in samples)
+        errors = sum(1 for _, failed in samples if failed)
+        print(
+            f"{intent:<12} {len(samples):>6} {100 * errors / len(samples):>6.1f}% "
+            f"{percentile(latencies, 0.50) * 1000:>9.1f} {percentile(latencies, 0.95) * 1000:>9.1f} "
+            f"{percentile(latencies, 0.99) * 1000:>9.1f}"
+        )
+    print(f"\nThroughput: {len(results) / elapsed:.1f} commands/s over {elapsed:.1f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--commands', type=int, default=20, help='commands per user')
+    parser.add_argument('--think-time', type=float, default=0, help='max random pause between commands in ms')
+    parser.add_argument('--intents', default='programming,friend,system,general',
+                        help='labels from the utterance file to draw commands from')
+    parser.add_argument('--url', help='use a running server instead of the in-process mock')
+    parser.add_argument('--offline', action='store_true', help='route without calling the API')
+    parser.add_argument('--sharded', action='store_true', help='give each user a memory shard')
+    parser.add_argument('--cache', action='store_true', help='keep the response cache enabled')
+    parser.add_argument('--stream', action='store_true', help='stream answers like the voice loop')
+    parser.add_argument('--rpm', type=float, default=0, help='client requests/min limit (0: unlimited)')
+    parser.add_argument('--tpm', type=float, default=0, help='client tokens/min limit (0: unlimited)')
+    parser.add_argument('--race-deadline', type=float,
+                        help='ms to wait for the AI before speaking an offline programming answer (0 disables the race)')
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    wanted = set(args.intents.split(','))
+    texts, labels = load_training_data(os.path.join(ROOT, Config.INTENT_TRAINING_FILE))
+    # "reset"/"clear memory" would wipe the history other commands rely on
+    commands = [text for text, label in zip(texts, labels)
+                if label in wanted and 'reset' not in text and 'clear' not in text and 'forget' not in text]
+
+    server = None
+    if args.url:
+        Config.DEEPSEEK_API_URL = args.url
+    else:
+        server = MockDeepSeekServer(settings_from_args(args)).start()
+        Config.DEEPSEEK_API_URL = server.url
+    Config.DEEPSEEK_API_KEY = Config.DEEPSEEK_API_KEY or 'mock-key'
+    Config.RESPONSE_CACHE = args.cache
+    Config.STREAM_RESPONSES = args.stream
+    Config.DEEPSEEK_REQUESTS_PER_MINUTE = args.rpm
+    Config.DEEPSEEK_TOKENS_PER_MINUTE = args.tpm
+    if args.race_deadline is not None:
+        Config.PROGRAMMING_RACE = args.race_deadline > 0
+        Config.PROGRAMMING_RACE_DEADLINE = args.race_deadline / 1000.0
+    Config.INTENT_TRAINING_FILE = os.path.join(ROOT, Config.INTENT_TRAINING_FILE)
+
+    with tempfile.TemporaryDirectory(prefix='jarvis-load-') as scratch:
+        os.chdir(scratch)
+        os.makedirs('data/logs', exist_ok=True)
+        jarvis = build_jarvis(args)
+
+        print(f"Users: {args.users}, commands per user: {args.commands}, API: {Config.DEEPSEEK_API_URL}")
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.users) as executor:
+            futures = [executor.submit(run_user, jarvis, f"user{i}", commands, args) for i in range(args.users)]
+            results = [result for future in futures for result in future.result()]
+        elapsed = time.perf_counter() - started
+
+        report(results, elapsed)
+        print(f"AI requests: {jarvis.ai.pool.format_stats()}")
+        if server is not None:
+            print(f"Mock server: {server.settings.stats}")
+            server.stop()
+        jarvis.memory.close()
+        jarvis.ai.close()
+        os.chdir(ROOT)
+
+if __name__ == "__main__":
+    main()
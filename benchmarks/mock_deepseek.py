@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""Local stand-in for the DeepSeek /v1/chat/completions endpoint.
+
+Serves canned answers, streamed (SSE) or not, with configurable latency,
+token rate and injected 429/500/timeout failures, so the client and the
+JARVIS routing can be measured without paying for the real API.
+
+    python benchmarks/mock_deepseek.py --port 8089 --latency 300 --tokens-per-second 60 --rate-429 0.05
+
+then run JARVIS with DEEPSEEK_API_URL=http://127.0.0.1:8089/v1/chat/completions
+(and any non-empty DEEPSEEK_API_KEY).
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_CORPUS = [
+    "Sure! Here is a short answer. A decorator wraps a function to extend its behavior without changing its code. "
+    "You apply it with the @ syntax above the function definition.",
+    "That's a great question. Lists are mutable while tuples are not. Use a tuple when the data should not change, "
+    "and a list when you need to add or remove items.",
+    "I'm doing well, thanks for asking! How has your day been so far? I'm always happy to chat.",
+    "The error means the variable was used before it was assigned. Check the spelling and make sure it is "
+    "defined in the same scope before the line that fails.",
+    "Here is an example:\n```python\ndef greet(name):\n    return f\"Hello, {name}!\"\n```\nCall it with any name you like.",
+]
+
+class MockSettings:
+    """Behavior knobs for the mock server (all times in seconds)"""
+
+    def __init__(self, latency=0.2, latency_dist='fixed', latency_spread=0.5, tokens_per_second=0.0,
+                 rate_429=0.0, rate_500=0.0, rate_timeout=0.0, timeout_seconds=60.0, retry_after=1.0,
+                 corpus=None, seed=None):
+        self.latency = latency
+        self.latency_dist = latency_dist
+        self.latency_spread = latency_spread
+        self.tokens_per_second = tokens_per_second
+        self.rate_429 = rate_429
+        self.rate_500 = rate_500
+        self.rate_timeout = rate_timeout
+        self.timeout_seconds = timeout_seconds
+        self.retry_after = retry_after
+        self.corpus = corpus or DEFAULT_CORPUS
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "streamed": 0, "429": 0, "500": 0, "timeouts": 0}
+
+    def sample_latency(self):
+        """Time to first byte, drawn from the configured distribution"""
+        with self.lock:
+            if self.latency_dist == 'uniform':
+                return self.random.uniform(self.latency * (1 - self.latency_spread), self.latency * (1 + self.latency_spread))
+            if self.latency_dist == 'lognormal':
+                # latency is the median, latency_spread the sigma of the log
+                return self.random.lognormvariate(0, self.latency_spread) * self.latency
+            return self.latency
+
+    def pick_fault(self):
+        """None, '429', '500' or 'timeout' according to the injection rates"""
+        with self.lock:
+            roll = self.random.random()
+        for fault, rate in (('429', self.rate_429), ('500', self.rate_500), ('timeout', self.rate_timeout)):
+            if roll < rate:
+                return fault
+            roll -= rate
+        return None
+
+    def pick_response(self, messages):
+        """A canned answer, stable for a given prompt"""
+        prompt = messages[-1].get("content", "") if messages else ""
+        return self.corpus[sum(map(ord, prompt)) % len(self.corpus)]
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+def tokenize(text):
+    """Split an answer into word-sized stream tokens that join back exactly"""
+    tokens = []
+    for index, word in enumerate(text.split(' ')):
+        tokens.append(word if index == 0 else ' ' + word)
+    return tokens
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    settings = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        settings = self.settings
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            return self.send_json(400, {"error": {"message": "invalid JSON"}})
+        settings.count("requests")
+
+        fault = settings.pick_fault()
+        if fault == 'timeout':
+            settings.count("timeouts")
+            time.sleep(settings.timeout_seconds)
+            self.close_connection = True
+            return
+        time.sleep(settings.sample_latency())
+        if fault == '429':
+            settings.count("429")
+            return self.send_json(429, {"error": {"message": "rate limited"}}, {"Retry-After": str(settings.retry_after)})
+        if fault == '500':
+            settings.count("500")
+            return self.send_json(500, {"error": {"message": "internal error"}})
+
+        answer = settings.pick_response(payload.get("messages", []))
+        tokens = tokenize(answer)
+        if payload.get("stream"):
+            settings.count("streamed")
+            return self.send_stream(payload, tokens)
+
+        if settings.tokens_per_second:
+            time.sleep(len(tokens) / settings.tokens_per_second)
+        prompt_tokens = sum(len(message.get("content", "")) for message in payload.get("messages", [])) // 4
+        self.send_json(200, {
+            "id": "mock-completion",
+            "object": "chat.completion",
+            "model": payload.get("model", "deepseek-chat"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": answer}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens),
+                      "total_tokens": prompt_tokens + len(tokens)}
+        })
+
+    def send_json(self, status, data, headers=None):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_stream(self, payload, tokens):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        delay = 1.0 / self.settings.tokens_per_second if self.settings.tokens_per_second else 0
+        for token in tokens:
+            chunk = {"choices": [{"index": 0, "delta": {"content": token}}], "model": payload.get("model")}
+            self.write_chunk(f"data: {json.dumps(chunk)}\n\n")
+            if delay:
+                time.sleep(delay)
+        self.write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def write_chunk(self, text):
+        data = text.encode('utf-8')
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+class MockDeepSeekServer:
+    """Threaded mock server, usable in-process (start/stop) or from the CLI"""
+
+    def __init__(self, settings=None, host='127.0.0.1', port=0):
+        self.settings = settings or MockSettings()
+        handler = type('BoundMockHandler', (MockHandler,), {'settings': self.settings})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1/chat/completions"
+
+    def start(self):
+        """Serve on a background thread"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Shut the server down"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def load_corpus(path):
+    """Canned answers separated by blank lines"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [block.strip() for block in f.read().split('\n\n') if block.strip()]
+
+def add_arguments(parser):
+    """Mock server options, shared with the load test"""
+    parser.add_argument('--latency', type=float, default=200, help='time to first byte in ms (median for lognormal)')
+    parser.add_argument('--latency-dist', choices=['fixed', 'uniform', 'lognormal'], default='fixed')
+    parser.add_argument('--latency-spread', type=float, default=0.5, help='uniform +/- fraction, or lognormal sigma')
+    parser.add_argument('--tokens-per-second', type=float, default=0, help='0 sends the whole answer at once')
+    parser.add_argument('--rate-429', type=float, default=0.0)
+    parser.add_argument('--rate-500', type=float, default=0.0)
+    parser.add_argument('--rate-timeout', type=float, default=0.0)
+    parser.add_argument('--timeout-seconds', type=float, default=60.0, help='how long a timed-out request hangs')
+    parser.add_argument('--retry-after', type=float, default=1.0)
+    parser.add_argument('--corpus', help='file of canned answers separated by blank lines')
+    parser.add_argument('--seed', type=int)
+
+def settings_from_args(args):
+    """Build MockSettings from parsed add_arguments() options"""
+    return MockSettings(
+        latency=args.latency / 1000.0,
+        latency_dist=args.latency_dist,
+        latency_spread=args.latency_spread,
+        tokens_per_second=args.tokens_per_second,
+        rate_429=args.rate_429,
+        rate_500=args.rate_500,
+        rate_timeout=args.rate_timeout,
+        timeout_seconds=args.timeout_seconds,
+        retry_after=args.retry_after,
+        corpus=load_corpus(args.corpus) if args.corpus else None,
+        seed=args.seed
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockDeepSeekServer(settings_from_args(args), args.host, args.port)
+    print(f"Mock DeepSeek API listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"Stats: {server.settings.stats}")
+
+if __name__ == "__main__":
+    main()
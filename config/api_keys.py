@@ -6,17 +6,204 @@ load_dotenv()
 class Config:
     # DeepSeek API Configuration
     DEEPSEEK_API_KEY = os.getenv('DEEPSEEK_API_KEY', '')
-    DEEPSEEK_API_URL = "https://api.deepseek.com/v1/chat/completions"
+    DEEPSEEK_API_URL = os.getenv('DEEPSEEK_API_URL', "https://api.deepseek.com/v1/chat/completions")
+    
+    # DeepSeek HTTP Settings
+    # Connections are pooled and kept alive; 429/5xx responses and dropped
+    # connections are retried with jittered exponential backoff, honoring
+    # Retry-After up to DEEPSEEK_BACKOFF_MAX seconds. At most
+    # DEEPSEEK_MAX_CONCURRENCY requests run at once and identical in-flight
+    # prompts share one request
+    DEEPSEEK_CONNECT_TIMEOUT = float(os.getenv('DEEPSEEK_CONNECT_TIMEOUT', '5'))
+    DEEPSEEK_READ_TIMEOUT = float(os.getenv('DEEPSEEK_READ_TIMEOUT', '30'))
+    DEEPSEEK_POOL_SIZE = int(os.getenv('DEEPSEEK_POOL_SIZE', '10'))
+    DEEPSEEK_MAX_CONCURRENCY = int(os.getenv('DEEPSEEK_MAX_CONCURRENCY', '4'))
+    DEEPSEEK_MAX_RETRIES = int(os.getenv('DEEPSEEK_MAX_RETRIES', '3'))
+    DEEPSEEK_BACKOFF_BASE = 0.5
+    DEEPSEEK_BACKOFF_MAX = 20.0
+    
+    # Circuit breaker: when at least CIRCUIT_MIN_CALLS calls in the last
+    # CIRCUIT_WINDOW_SECONDS saw CIRCUIT_FAILURE_RATE failures or slow calls,
+    # answer offline for CIRCUIT_OPEN_SECONDS, then probe (one request per
+    # CIRCUIT_PROBE_INTERVAL) until CIRCUIT_PROBE_SUCCESSES probes succeed
+    CIRCUIT_WINDOW_SECONDS = 60.0
+    CIRCUIT_MIN_CALLS = 4
+    CIRCUIT_FAILURE_RATE = 0.5
+    CIRCUIT_SLOW_CALL_SECONDS = float(os.getenv('CIRCUIT_SLOW_CALL_SECONDS', '10'))
+    CIRCUIT_OPEN_SECONDS = float(os.getenv('CIRCUIT_OPEN_SECONDS', '30'))
+    CIRCUIT_PROBE_INTERVAL = 5.0
+    CIRCUIT_PROBE_SUCCESSES = 2
+    # Overall limit on one call, retries and backoff included, so the
+    # worst case is bounded even before the circuit opens; past it callers
+    # answer offline
+    DEEPSEEK_CALL_DEADLINE = float(os.getenv('DEEPSEEK_CALL_DEADLINE', str(CIRCUIT_SLOW_CALL_SECONDS * 1.5)))
+    
+    # Client-side rate limits (0 disables a limit). Requests are admitted from
+    # token buckets refilled at these per-minute rates, holding up to
+    # DEEPSEEK_RATE_BURST_SECONDS worth of capacity. A request's token cost
+    # is its estimated prompt plus DEEPSEEK_COMPLETION_TOKEN_ESTIMATE, and is
+    # corrected from the reported usage once it completes. Queued requests
+    # are admitted by priority class, so interactive turns go before
+    # background summaries and batch jobs
+    DEEPSEEK_REQUESTS_PER_MINUTE = float(os.getenv('DEEPSEEK_REQUESTS_PER_MINUTE', '60'))
+    DEEPSEEK_TOKENS_PER_MINUTE = float(os.getenv('DEEPSEEK_TOKENS_PER_MINUTE', '100000'))
+    DEEPSEEK_RATE_BURST_SECONDS = 10.0
+    DEEPSEEK_COMPLETION_TOKEN_ESTIMATE = 400
+    REQUEST_PRIORITIES = ('interactive', 'background', 'batch')
+    CALL_TYPE_PRIORITIES = {
+        'summary': 'background'
+    }
+    
+    # Prompt token budgets per call type (system preamble + context + message)
+    PROMPT_TOKEN_BUDGETS = {
+        'chat': 1500,
+        'programming_help': 3000,
+        'friend_chat': 1500,
+        'debug_code': 3000,
+        'summary': 3000
+    }
+    
+    # Response cache: an in-memory LRU in front of RESPONSE_CACHE_FILE (one
+    # per user shard with MEMORY_SHARDING), keyed by model, personality,
+    # temperature, normalized message and every prompt section. A TTL of 0
+    # disables caching for a call type; requests hotter than
+    # RESPONSE_CACHE_MAX_TEMPERATURE (friend_chat) always go upstream
+    RESPONSE_CACHE = os.getenv('RESPONSE_CACHE', 'True').lower() == 'true'
+    RESPONSE_CACHE_FILE = "data/response_cache.db"
+    RESPONSE_CACHE_MEMORY_ENTRIES = 256
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', str(20 * 1024 * 1024)))
+    RESPONSE_CACHE_MAX_TEMPERATURE = 0.7
+    RESPONSE_CACHE_TTLS = {
+        'chat': 6 * 3600,
+        'programming_help': 7 * 24 * 3600,
+        'debug_code': 24 * 3600,
+        'friend_chat': 0,
+        'summary': 0
+    }
+    
+    # Speak online answers sentence by sentence while they stream in
+    STREAM_RESPONSES = os.getenv('STREAM_RESPONSES', 'True').lower() == 'true'
+    
+    # Fast start: the TTS engine and microphone come up in the background,
+    # reusing the voice and energy threshold saved in AUDIO_PROFILE_FILE.
+    # With a saved threshold the first listen starts on it right away and
+    # the microphone is only calibrated when none has been saved yet. The
+    # spoken voice self-test only runs with VOICE_SELF_TEST or --voice-test
+    FAST_START = os.getenv('FAST_START', 'True').lower() == 'true'
+    VOICE_SELF_TEST = os.getenv('VOICE_SELF_TEST', 'False').lower() == 'true'
+    AUDIO_PROFILE_FILE = "data/audio_profile.json"
+    
+    # Speech is queued on one TTS worker holding at most TTS_QUEUE_SIZE
+    # utterances. With LISTEN_WHILE_SPEAKING the main loop listens again as
+    # soon as an answer is queued and a new command cuts the old answer off;
+    # leave it off when speakers can feed JARVIS's voice back to the mic
+    TTS_QUEUE_SIZE = 32
+    LISTEN_WHILE_SPEAKING = os.getenv('LISTEN_WHILE_SPEAKING', 'False').lower() == 'true'
+    
+    # Rendered speech cache: static phrases (config/phrases.py) and short
+    # phrases spoken twice are rendered to WAV files in TTS_CACHE_DIR, keyed
+    # by text, voice, rate and volume, and played from there; the least
+    # recently played are deleted past TTS_CACHE_MAX_BYTES. Pre-render the
+    # static ones with: python -m core.tts_cache --warm-up
+    TTS_CACHE = os.getenv('TTS_CACHE', 'True').lower() == 'true'
+    TTS_CACHE_DIR = "data/tts_cache"
+    TTS_CACHE_MAX_BYTES = int(os.getenv('TTS_CACHE_MAX_BYTES', str(50 * 1024 * 1024)))
+    TTS_CACHE_MAX_CHARS = 300
+    
+    # Full-duplex audio: a capture thread listens all the time, even while
+    # JARVIS talks. During playback speech must be BARGE_IN_THRESHOLD_RATIO
+    # times over the energy threshold for BARGE_IN_MIN_SECONDS to count, and
+    # then interrupts the answer (barge-in). Without the VAD a phrase starts
+    # after ENERGY_MIN_SPEECH_SECONDS over the threshold (the VAD has its own
+    # onset per VAD_AGGRESSIVENESS)
+    FULL_DUPLEX_AUDIO = os.getenv('FULL_DUPLEX_AUDIO', 'False').lower() == 'true'
+    BARGE_IN_THRESHOLD_RATIO = float(os.getenv('BARGE_IN_THRESHOLD_RATIO', '2.5'))
+    BARGE_IN_MIN_SECONDS = 0.3
+    ENERGY_MIN_SPEECH_SECONDS = 0.1
+    PHRASE_TIME_LIMIT = 10
+    AUDIO_PHRASE_QUEUE_SIZE = 4
+    
+    # Voice activity detection (NumPy) segments phrases instead of the
+    # recognizer's energy threshold, so audio without speech never reaches
+    # recognize_google and phrases end after a shorter hangover.
+    # VAD_AGGRESSIVENESS 0-3 trades missed quiet speech for fewer false
+    # triggers and faster endpointing; see benchmarks/bench_vad.py
+    VAD = os.getenv('VAD', 'True').lower() == 'true'
+    VAD_AGGRESSIVENESS = int(os.getenv('VAD_AGGRESSIVENESS', '2'))
+    VAD_FRAME_MS = 30
+    VAD_NOISE_FLOOR_DB = -70.0
+    
+    # Programming questions with an offline answer race it against DeepSeek:
+    # if the AI misses the deadline (seconds) the offline answer is spoken
+    # and the AI one follows unless a new command supersedes it
+    PROGRAMMING_RACE = os.getenv('PROGRAMMING_RACE', 'True').lower() == 'true'
+    PROGRAMMING_RACE_DEADLINE = float(os.getenv('PROGRAMMING_RACE_DEADLINE', '1.5'))
     
     # Application Settings
     MEMORY_FILE = "data/memory.json"
     LOG_FILE = "data/logs/jarvis.log"
     MAX_CONVERSATION_HISTORY = 20
     
+    # Memory Storage Settings
+    # "json" rewrites MEMORY_FILE on every change, "journal" appends each
+    # change to MEMORY_JOURNAL_FILE and folds it into MEMORY_FILE periodically,
+    # "sqlite" keeps everything in MEMORY_DB_FILE and queries it on demand,
+    # "binary" saves MEMORY_SNAPSHOT_FILE and loads history lazily
+    MEMORY_STORAGE = os.getenv('MEMORY_STORAGE', 'json').lower()
+    MEMORY_JOURNAL_FILE = "data/memory.journal"
+    MEMORY_JOURNAL_COMPACT_EVERY = int(os.getenv('MEMORY_JOURNAL_COMPACT_EVERY', '500'))
+    MEMORY_DB_FILE = "data/memory.db"
+    MEMORY_SNAPSHOT_FILE = "data/memory.snap"
+    PROGRAMMING_CONTEXT_LIMIT = 10
+    
+    # Turns older than MAX_CONVERSATION_HISTORY are folded into summaries
+    # SUMMARY_SEGMENT_TURNS at a time, keeping at most SUMMARY_MAX_SEGMENTS
+    SUMMARY_SEGMENT_TURNS = 10
+    SUMMARY_MAX_SEGMENTS = 8
+    SUMMARY_SENTENCES = 3
+    
+    # Programming knowledge caps per language (0 = unlimited); duplicates are
+    # merged and the least recently ("lru") or least often ("lfu") used
+    # entries are evicted past the cap
+    KNOWLEDGE_MAX_ERRORS = int(os.getenv('KNOWLEDGE_MAX_ERRORS', '200'))
+    KNOWLEDGE_MAX_CONCEPTS = int(os.getenv('KNOWLEDGE_MAX_CONCEPTS', '200'))
+    KNOWLEDGE_EVICTION_POLICY = os.getenv('KNOWLEDGE_EVICTION_POLICY', 'lru').lower()
+    
+    # Semantic recall over past conversations and fixed errors (needs NumPy);
+    # "hashing" works offline, "sentence-transformers" loads SEMANTIC_MODEL
+    SEMANTIC_RECALL = os.getenv('SEMANTIC_RECALL', 'True').lower() == 'true'
+    SEMANTIC_INDEX_PATH = "data/semantic/index"
+    SEMANTIC_EMBEDDER = os.getenv('SEMANTIC_EMBEDDER', 'hashing').lower()
+    SEMANTIC_MODEL = os.getenv('SEMANTIC_MODEL', 'all-MiniLM-L6-v2')
+    SEMANTIC_DIM = 256
+    SEMANTIC_TOP_K = 3
+    SEMANTIC_MAX_TEXT = 1000
+    
+    # Write-behind batches JSON saves on a background thread, writing at
+    # most once per MEMORY_FLUSH_INTERVAL seconds
+    MEMORY_WRITE_BEHIND = os.getenv('MEMORY_WRITE_BEHIND', 'False').lower() == 'true'
+    MEMORY_FLUSH_INTERVAL = float(os.getenv('MEMORY_FLUSH_INTERVAL', '2.0'))
+    
+    # Per-user memory shards under MEMORY_SHARD_DIR/<user id>/ for serving
+    # several users from one process; idle shards are closed and at most
+    # MEMORY_MAX_OPEN_SHARDS stay loaded
+    MEMORY_SHARDING = os.getenv('MEMORY_SHARDING', 'False').lower() == 'true'
+    MEMORY_SHARD_DIR = "data/users"
+    MEMORY_MAX_OPEN_SHARDS = int(os.getenv('MEMORY_MAX_OPEN_SHARDS', '32'))
+    MEMORY_SHARD_IDLE_SECONDS = int(os.getenv('MEMORY_SHARD_IDLE_SECONDS', '600'))
+    DEFAULT_USER_ID = "default"
+    
+    # Statistical intent classifier trained from INTENT_TRAINING_FILE (needs
+    # NumPy); predictions below INTENT_MIN_CONFIDENCE use the keyword rules
+    INTENT_CLASSIFIER = os.getenv('INTENT_CLASSIFIER', 'True').lower() == 'true'
+    INTENT_TRAINING_FILE = "config/intents.tsv"
+    INTENT_FEATURE_DIM = 4096
+    INTENT_MIN_CONFIDENCE = float(os.getenv('INTENT_MIN_CONFIDENCE', '0.5'))
+    
     # Offline Mode Settings
     OFFLINE_MODE = os.getenv('OFFLINE_MODE', 'False').lower() == 'true'
     LOCAL_MODEL_PATH = "models/local_model"
     
     # Speech Settings
     SPEECH_RATE = 150
-    SPEECH_VOLUME = 0.8
\ No newline at end of file
+    SPEECH_VOLUME = 0.8
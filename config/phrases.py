@@ -0,0 +1,72 @@
+# Fixed phrases JARVIS speaks word for word. Keeping them here lets the
+# TTS cache pre-render them (python -m core.tts_cache --warm-up).
+
+VOICE_TEST_PHRASES = [
+    "Hello! I am JARVIS, your AI assistant.",
+    "I am now speaking in clear English.",
+    "Ready to help with programming and more!"
+]
+
+WELCOME_GREETING = (
+    "Hello! I'm JARVIS, your AI assistant. You can tell me your name by saying 'my name is [your name]'. "
+    "I can help with programming, web searches, or just be a friend to chat with!"
+)
+
+PROGRAMMING_ACKNOWLEDGEMENT = "I'll help with your programming question!"
+
+THANKS_RESPONSES = [
+    "You're welcome!",
+    "Happy to help!",
+    "Anytime!",
+    "Glad I could assist!"
+]
+
+EXIT_GOODBYE = "Goodbye! It was great talking with you!"
+SIGNAL_GOODBYE = "Goodbye! Shutting down now."
+INTERRUPT_GOODBYE = "Shutting down. Goodbye!"
+
+NOT_UNDERSTOOD_PROMPT = "Sorry, I didn't catch that. Could you repeat?"
+RECOGNITION_ERROR_PROMPT = "There seems to be a problem with speech recognition."
+
+ANONYMOUS_GREETINGS = [
+    "Hello there! I'm JARVIS, your AI friend!",
+    "Hey! Nice to meet you! I'm here to help and chat.",
+    "Hi! I'm JARVIS. What should I call you?"
+]
+
+HOW_ARE_YOU_RESPONSES = [
+    "I'm doing great! Thanks for asking. How about you?",
+    "I'm wonderful! Always happy to chat with you.",
+    "Doing well! Ready to help with anything you need."
+]
+
+FUN_FACTS = [
+    "Did you know? Honey never spoils. Archaeologists have found pots of honey in ancient Egyptian tombs that are over 3,000 years old!",
+    "Fun fact: Octopuses have three hearts! Two pump blood through the gills, while the third pumps it through the body.",
+    "Interesting: The shortest war in history was between Britain and Zanzibar in 1896. It lasted only 38 minutes!",
+    "Cool fact: Bananas are berries, but strawberries aren't!",
+    "Did you know? A day on Venus is longer than a year on Venus."
+]
+
+MOTIVATIONAL_QUOTES = [
+    "The only way to do great work is to love what you do. - Steve Jobs",
+    "It's not whether you get knocked down, it's whether you get up. - Vince Lombardi",
+    "The future belongs to those who believe in the beauty of their dreams. - Eleanor Roosevelt",
+    "You are never too old to set another goal or to dream a new dream. - C.S. Lewis",
+    "Believe you can and you're halfway there. - Theodore Roosevelt"
+]
+
+OFFLINE_CHAT_RESPONSES = [
+    "That's interesting! Tell me more.",
+    "I'd love to hear more about that.",
+    "How does that make you feel?",
+    "That sounds important to you.",
+    "I'm here to listen and help however I can."
+]
+
+STATIC_PHRASES = (
+    VOICE_TEST_PHRASES + THANKS_RESPONSES + ANONYMOUS_GREETINGS + HOW_ARE_YOU_RESPONSES + FUN_FACTS
+    + MOTIVATIONAL_QUOTES + OFFLINE_CHAT_RESPONSES
+    + [WELCOME_GREETING, PROGRAMMING_ACKNOWLEDGEMENT, EXIT_GOODBYE, SIGNAL_GOODBYE, INTERRUPT_GOODBYE,
+       NOT_UNDERSTOOD_PROMPT, RECOGNITION_ERROR_PROMPT]
+)
@@ -0,0 +1,158 @@
+import re
+import zlib
+from config.api_keys import Config
+from utils.logger import setup_logger
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = setup_logger('intent_classifier')
+
+def load_training_data(path):
+    """Read (utterances, intents) from a tab-separated intent file"""
+    texts, labels = [], []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            intent, _, text = line.partition('\t')
+            if text:
+                texts.append(text.strip())
+                labels.append(intent.strip())
+    return texts, labels
+
+class IntentClassifier:
+    """TF-IDF weighted hashed n-grams with a softmax linear model
+
+    Features are word unigrams, word bigrams and character trigrams of each
+    word (so "debugging" shares features with "debug"), hashed into dim
+    buckets. Batches are scored with one sparse-dense product, so thousands
+    of commands cost a single vectorized call.
+    """
+
+    def __init__(self, dim=None, min_confidence=None):
+        self.dim = dim or Config.INTENT_FEATURE_DIM
+        self.min_confidence = Config.INTENT_MIN_CONFIDENCE if min_confidence is None else min_confidence
+        self.intents = []
+        self.idf = None
+        self.weights = None
+        self.bias = None
+
+    def _features(self, text):
+        words = re.findall(r"[\w+#']+", text.lower())
+        features = [f"w:{word}" for word in words]
+        features.extend(f"b:{a} {b}" for a, b in zip(words, words[1:]))
+        for word in words:
+            padded = f"<{word}>"
+            features.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        counts = {}
+        for feature in features:
+            bucket = zlib.crc32(feature.encode('utf-8')) % self.dim
+            counts[bucket] = counts.get(bucket, 0) + 1
+        return counts
+
+    def _sparse(self, texts):
+        """Row ids, bucket ids and L2-normalized TF-IDF values for a batch"""
+        rows, cols, counts = [], [], []
+        for row, text in enumerate(texts):
+            for bucket, count in self._features(text).items():
+                rows.append(row)
+                cols.append(bucket)
+                counts.append(count)
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        values = (1.0 + np.log(np.asarray(counts, dtype=np.float32))) * self.idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=len(texts)))
+        norms[norms == 0] = 1.0
+        return rows, cols, (values / norms[rows]).astype(np.float32)
+
+    def fit(self, texts, labels, iterations=500, learning_rate=5.0, l2=1e-4):
+        """Train the model on labeled utterances"""
+        self.intents = sorted(set(labels))
+        targets = np.zeros((len(texts), len(self.intents)), dtype=np.float32)
+        targets[np.arange(len(texts)), [self.intents.index(label) for label in labels]] = 1.0
+
+        document_frequency = np.zeros(self.dim, dtype=np.float32)
+        for text in texts:
+            document_frequency[list(self._features(text))] += 1.0
+        self.idf = (np.log((1.0 + len(texts)) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+
+        rows, cols, values = self._sparse(texts)
+        features = np.zeros((len(texts), self.dim), dtype=np.float32)
+        features[rows, cols] = values
+
+        self.weights = np.zeros((self.dim, len(self.intents)), dtype=np.float32)
+        self.bias = np.zeros(len(self.intents), dtype=np.float32)
+        for _ in range(iterations):
+            error = (self._softmax(features @ self.weights + self.bias) - targets) / len(texts)
+            self.weights -= learning_rate * (features.T @ error + l2 * self.weights)
+            self.bias -= learning_rate * error.sum(axis=0)
+        return self
+
+    def fit_file(self, path):
+        """Train from a tab-separated intent file"""
+        texts, labels = load_training_data(path)
+        if not texts:
+            raise ValueError(f"No labeled utterances in {path}")
+        self.fit(texts, labels)
+        logger.info(f"Trained intent classifier on {len(texts)} utterances from {path}")
+        return self
+
+    @staticmethod
+    def _softmax(scores):
+        scores = scores - scores.max(axis=1, keepdims=True)
+        exp = np.exp(scores)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict_proba(self, texts):
+        """Intent probabilities for a batch, one row per text"""
+        scores = np.tile(self.bias, (len(texts), 1))
+        if texts:
+            rows, cols, values = self._sparse(texts)
+            if len(rows):
+                # Rows are contiguous, so each text's weighted feature rows
+                # can be summed with a single reduceat
+                contributions = self.weights[cols] * values[:, None]
+                present, starts = np.unique(rows, return_index=True)
+                scores[present] += np.add.reduceat(contributions, starts, axis=0)
+        return self._softmax(scores)
+
+    def classify_batch(self, commands, fallback=None):
+        """Classify many commands at once into (intent, confidence) pairs
+
+        Predictions below min_confidence are replaced by fallback(command)
+        when a fallback is given.
+        """
+        commands = list(commands)
+        if not commands:
+            return []
+        probabilities = self.predict_proba(commands)
+        best = probabilities.argmax(axis=1)
+        results = []
+        for command, index, row in zip(commands, best, probabilities):
+            confidence = float(row[index])
+            if fallback is not None and confidence < self.min_confidence:
+                results.append((fallback(command), confidence))
+            else:
+                results.append((self.intents[index], confidence))
+        return results
+
+    def classify(self, command, fallback=None):
+        """Classify a single command into an (intent, confidence) pair"""
+        return self.classify_batch([command], fallback)[0]
+
+def create_intent_classifier(path=None):
+    """Train the intent classifier if enabled and NumPy is installed"""
+    if not Config.INTENT_CLASSIFIER:
+        return None
+    if np is None:
+        logger.warning("NumPy not installed, using keyword intent rules")
+        return None
+    try:
+        return IntentClassifier().fit_file(path or Config.INTENT_TRAINING_FILE)
+    except Exception as e:
+        logger.error(f"Could not train intent classifier: {e}")
+        return None
@@ -0,0 +1,54 @@
+import re
+
+class KeywordMatcher:
+    """Single-pass multi-category keyword matcher
+
+    All keywords are compiled into one alternation regex, so a command is
+    scanned once regardless of how many keywords or categories exist.
+    Keywords must start at a word boundary. Words of four or more letters
+    also match inflected forms ("debug" matches "debugging"); shorter ones
+    and those in whole_word categories must match the whole word, so "hi"
+    no longer fires on "this".
+    """
+
+    def __init__(self, categories, whole_word=(), min_prefix_length=4):
+        self.categories = {name: list(keywords) for name, keywords in categories.items()}
+        self.whole_word = set(whole_word)
+        self.min_prefix_length = min_prefix_length
+        self._keywords = []
+        self._keyword_categories = {}
+        self._pattern = self._compile()
+
+    def _compile(self):
+        for name, keywords in self.categories.items():
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if keyword not in self._keyword_categories:
+                    self._keyword_categories[keyword] = []
+                    self._keywords.append(keyword)
+                self._keyword_categories[keyword].append(name)
+
+        # Longest first so "javascript" wins over "java" at the same position
+        ordered = sorted(range(len(self._keywords)), key=lambda i: -len(self._keywords[i]))
+        alternatives = [f"(?P<k{i}>{self._keyword_pattern(self._keywords[i])})" for i in ordered]
+        return re.compile(r"(?<!\w)(?:" + "|".join(alternatives) + ")", re.IGNORECASE)
+
+    def _keyword_pattern(self, keyword):
+        pattern = re.escape(keyword)
+        if not keyword[-1].isalnum():
+            # "c++", "def " and friends carry their own boundary
+            return pattern
+        whole = (
+            len(keyword) < self.min_prefix_length
+            or any(name in self.whole_word for name in self._keyword_categories[keyword])
+        )
+        return pattern + (r"(?!\w)" if whole else r"\w*")
+
+    def match(self, text):
+        """Map each matched category to its keywords, in order of appearance"""
+        matches = {}
+        for found in self._pattern.finditer(text or ""):
+            keyword = self._keywords[int(found.lastgroup[1:])]
+            for name in self._keyword_categories[keyword]:
+                matches.setdefault(name, []).append(keyword)
+        return matches
@@ -0,0 +1,84 @@
+import hashlib
+import re
+from config.api_keys import Config
+from core.records import KnowledgeRecord
+
+def concept_hash(concept):
+    """Hash a concept after normalizing case, punctuation and whitespace"""
+    normalized = re.sub(r'[^\w\s]', ' ', concept.lower())
+    normalized = ' '.join(normalized.split())
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:16]
+
+class KnowledgeStore:
+    """Deduplicating, size-capped store for per-language programming knowledge"""
+
+    def __init__(self, max_errors=None, max_concepts=None, policy=None):
+        self.limits = {
+            "errors_fixed": Config.KNOWLEDGE_MAX_ERRORS if max_errors is None else max_errors,
+            "concepts_learned": Config.KNOWLEDGE_MAX_CONCEPTS if max_concepts is None else max_concepts
+        }
+        self.policy = (policy or Config.KNOWLEDGE_EVICTION_POLICY).lower()
+
+    def add(self, knowledge, concept, solution, timestamp):
+        """Add or refresh an entry in a language's knowledge dict"""
+        kind = "errors_fixed" if solution else "concepts_learned"
+        items = knowledge.setdefault(kind, [])
+        key = concept_hash(concept)
+
+        for item in items:
+            if self._hash(item) == key:
+                item["hits"] = item.get("hits", 1) + 1
+                item["last_access"] = timestamp
+                if solution:
+                    item["solution"] = solution
+                return item
+
+        item = KnowledgeRecord(
+            concept=concept,
+            solution=solution or None,
+            timestamp=timestamp,
+            hash=key,
+            hits=1,
+            last_access=timestamp
+        )
+        items.append(item)
+        self.evict(items, self.limits[kind])
+        return item
+
+    def compact(self, knowledge):
+        """Merge duplicate entries and enforce size caps (for older memory files)"""
+        for kind in ("errors_fixed", "concepts_learned"):
+            merged = {}
+            for item in knowledge.get(kind, []):
+                key = self._hash(item)
+                existing = merged.get(key)
+                if existing is None:
+                    item.setdefault("hits", 1)
+                    item.setdefault("last_access", item.get("timestamp", ""))
+                    merged[key] = item
+                    continue
+                existing["hits"] += item.get("hits", 1)
+                existing["last_access"] = max(existing["last_access"], item.get("last_access", item.get("timestamp", "")))
+                if item.get("solution"):
+                    existing["solution"] = item["solution"]
+            items = list(merged.values())
+            self.evict(items, self.limits[kind])
+            knowledge[kind] = items
+
+    def evict(self, items, limit):
+        """Drop entries beyond the limit using the configured policy"""
+        if not limit or len(items) <= limit:
+            return
+        if self.policy == 'lfu':
+            rank = lambda item: (item.get("hits", 1), item.get("last_access", ""))
+        else:
+            rank = lambda item: item.get("last_access", "")
+        keep = sorted(items, key=rank, reverse=True)[:limit]
+        kept_ids = set(id(item) for item in keep)
+        # Preserve insertion order for the survivors
+        items[:] = [item for item in items if id(item) in kept_ids]
+
+    def _hash(self, item):
+        if "hash" not in item:
+            item["hash"] = concept_hash(item["concept"])
+        return item["hash"]
@@ -1,25 +1,91 @@
 import json
 import os
+import threading
 from datetime import datetime
 from config.api_keys import Config
+from core.memory_flusher import WriteBehindFlusher
+from core.knowledge_store import KnowledgeStore
+from core.memory_journal import MemoryJournal
+from core.records import ConversationTurn, compact_memory, record_object_hook, record_to_json
+from core.summarizer import RollingSummary
+from core.snapshot import LazyMemory, encode_snapshot, read_snapshot
+from core.semantic_index import create_semantic_index, CONVERSATION_KEY_PREFIX, conversation_item, knowledge_item
+from utils.helpers import write_bytes_atomic, write_text_atomic
+
+def shard_path(path, base_dir=None):
+    """Relocate a configured data/ path under a shard directory"""
+    if base_dir is None:
+        return path
+    return os.path.join(base_dir, os.path.relpath(path, "data"))
 
 class MemorySystem:
-    def __init__(self):
-        self.memory_file = Config.MEMORY_FILE
+    def __init__(self, base_dir=None):
+        self.memory_file = shard_path(Config.MEMORY_FILE, base_dir)
+        self.snapshot_file = None
+        if Config.MEMORY_STORAGE == 'binary':
+            self.snapshot_file = shard_path(Config.MEMORY_SNAPSHOT_FILE, base_dir)
+        self.journal = None
+        if Config.MEMORY_STORAGE == 'journal':
+            self.journal = MemoryJournal(
+                self.memory_file,
+                shard_path(Config.MEMORY_JOURNAL_FILE, base_dir),
+                compact_every=Config.MEMORY_JOURNAL_COMPACT_EVERY
+            )
+        self.lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self.knowledge_store = KnowledgeStore()
         self.memory = self.load_memory()
+        self.semantic_index = create_semantic_index(shard_path(Config.SEMANTIC_INDEX_PATH, base_dir))
+        if self.semantic_index is not None and not len(self.semantic_index):
+            self.semantic_index.add(self._index_items(self.memory))
+        
+        # Write-behind only applies to full-file saves; journal appends are
+        # already proportional to the change
+        self.flusher = None
+        if Config.MEMORY_WRITE_BEHIND and self.journal is None:
+            self.flusher = WriteBehindFlusher(self.save_memory, Config.MEMORY_FLUSH_INTERVAL)
     
     def load_memory(self):
         """Load conversation memory from file"""
         os.makedirs(os.path.dirname(self.memory_file), exist_ok=True)
         
+        # Binary snapshots decode the large sections on first access
+        if self.snapshot_file is not None and os.path.exists(self.snapshot_file):
+            try:
+                return read_snapshot(self.snapshot_file, on_materialize=self._prepare_section)
+            except Exception as e:
+                print(f"Error loading memory snapshot: {e}")
+        
+        memory = None
         if os.path.exists(self.memory_file):
             try:
                 with open(self.memory_file, 'r') as f:
-                    return json.load(f)
+                    memory = json.load(f, object_hook=record_object_hook)
             except Exception as e:
                 print(f"Error loading memory: {e}")
         
-        # Initialize empty memory structure
+        if memory is None:
+            memory = self.default_memory()
+        compact_memory(memory)
+        self._prepare_section("programming_knowledge", memory["programming_knowledge"])
+        
+        if self.journal is not None:
+            snapshot_seq = memory["system_data"].get("journal_seq", 0)
+            for record in self.journal.read_records(after_seq=snapshot_seq):
+                self.apply_record(memory, record)
+        
+        return memory
+    
+    def _prepare_section(self, name, value):
+        """Normalize a memory section right after it is loaded"""
+        if name == "programming_knowledge":
+            # Fold duplicates and apply size caps to files written before
+            # the knowledge store existed
+            for knowledge in value.values():
+                self.knowledge_store.compact(knowledge)
+    
+    def default_memory(self):
+        """Initialize empty memory structure"""
         return {
             "user_info": {
                 "name": "",
@@ -27,6 +93,7 @@ class MemorySystem:
                 "programming_languages": []
             },
             "conversation_history": [],
+            "conversation_summaries": [],
             "learned_facts": {},
             "programming_knowledge": {
                 "python": {"errors_fixed": [], "concepts_learned": []},
@@ -48,69 +115,260 @@ class MemorySystem:
     def save_memory(self):
         """Save memory to file"""
         try:
-            with open(self.memory_file, 'w') as f:
-                json.dump(self.memory, f, indent=2)
+            with self._save_lock:
+                with self.lock:
+                    if self.journal is not None:
+                        self.journal.compact(self.memory)
+                        return True
+                    if self.snapshot_file is not None:
+                        data = encode_snapshot(self.memory)
+                    else:
+                        data = json.dumps(self.memory, indent=2, default=record_to_json)
+                # Only serialization holds the memory lock; the disk write
+                # doesn't block concurrent changes
+                if self.snapshot_file is not None:
+                    write_bytes_atomic(self.snapshot_file, data)
+                else:
+                    write_text_atomic(self.memory_file, data)
             return True
         except Exception as e:
             print(f"Error saving memory: {e}")
             return False
     
+    def persist(self, op, record):
+        """Persist a single change using the configured storage mode"""
+        if self.journal is None:
+            if self.flusher is not None:
+                self.flusher.mark_dirty()
+                return True
+            return self.save_memory()
+        
+        try:
+            self.journal.append(op, record)
+        except Exception as e:
+            print(f"Error writing memory journal: {e}")
+            return self.save_memory()
+        
+        if self.journal.needs_compaction():
+            return self.save_memory()
+        return True
+    
+    def apply_record(self, memory, record):
+        """Apply a journaled change to a memory dict"""
+        op = record.get("op")
+        if op == "conversation":
+            self._apply_conversation(memory, record)
+        elif op == "programming_knowledge":
+            self._apply_programming_knowledge(memory, record)
+        elif op == "user_info":
+            self._apply_user_info(memory, record)
+        elif op == "learned_fact":
+            self._apply_learned_fact(memory, record)
+        elif op == "clear_history":
+            memory["conversation_history"] = []
+            memory["conversation_summaries"] = []
+        elif op == "summary":
+            RollingSummary(memory.setdefault("conversation_summaries", [])).apply_summary(
+                record["source_hash"], record["summary"], record.get("method", "ai")
+            )
+        else:
+            print(f"Unknown memory journal op: {op}")
+    
+    def _apply_conversation(self, memory, record):
+        history = memory["conversation_history"]
+        history.append(ConversationTurn(record["timestamp"], record["user"], record["assistant"]))
+        memory["system_data"]["total_interactions"] += 1
+        memory["system_data"]["last_session"] = record["timestamp"]
+        
+        # Keep recent conversations verbatim; once a full segment has aged
+        # out of the window, fold it into a summary in one step
+        overflow = len(history) - Config.MAX_CONVERSATION_HISTORY
+        if overflow >= Config.SUMMARY_SEGMENT_TURNS:
+            turns = [(conv["timestamp"], conv["user"], conv["assistant"]) for conv in history[:overflow]]
+            del history[:overflow]
+            RollingSummary(memory.setdefault("conversation_summaries", [])).fold(turns)
+    
+    def _apply_programming_knowledge(self, memory, record):
+        language = record["language"]
+        if language not in memory["programming_knowledge"]:
+            memory["programming_knowledge"][language] = {"errors_fixed": [], "concepts_learned": []}
+        
+        self.knowledge_store.add(
+            memory["programming_knowledge"][language],
+            record["concept"],
+            record.get("solution"),
+            record["timestamp"]
+        )
+    
+    def _apply_user_info(self, memory, record):
+        memory["user_info"]["name"] = record["name"]
+        if record.get("preferences"):
+            memory["user_info"]["preferences"].update(record["preferences"])
+    
+    def _apply_learned_fact(self, memory, record):
+        memory["learned_facts"].setdefault(record["category"], []).append({
+            "fact": record["fact"],
+            "timestamp": record["timestamp"]
+        })
+    
+    def _index_items(self, memory):
+        """Collect semantic index items for everything currently in memory
+        
+        Sections of a snapshot still undecoded are read straight from its
+        records, so backfilling doesn't defeat lazy loading.
+        """
+        section = memory.peek if isinstance(memory, LazyMemory) else memory.__getitem__
+        items = [
+            conversation_item(conv["timestamp"], conv["user"], conv["assistant"])
+            for conv in section("conversation_history")
+        ]
+        for language, knowledge in section("programming_knowledge").items():
+            for item in knowledge["errors_fixed"]:
+                items.append(knowledge_item(language, item["concept"], item["solution"]))
+        return items
+    
     def add_conversation(self, user_input, assistant_response):
         """Add conversation to history with timestamp"""
-        conversation = {
+        record = {
             "timestamp": datetime.now().isoformat(),
             "user": user_input,
-            "assistant": assistant_response,
-            "type": "conversation"
+            "assistant": assistant_response
         }
-        
-        self.memory["conversation_history"].append(conversation)
-        self.memory["system_data"]["total_interactions"] += 1
-        self.memory["system_data"]["last_session"] = datetime.now().isoformat()
-        
-        # Keep only recent conversations
-        if len(self.memory["conversation_history"]) > Config.MAX_CONVERSATION_HISTORY:
-            self.memory["conversation_history"] = self.memory["conversation_history"][-Config.MAX_CONVERSATION_HISTORY:]
-        
-        self.save_memory()
+        with self.lock:
+            self._apply_conversation(self.memory, record)
+            self.persist("conversation", record)
+        if self.semantic_index is not None:
+            self.semantic_index.add([conversation_item(record["timestamp"], user_input, assistant_response)])
     
     def add_programming_knowledge(self, language, concept, solution=None):
         """Add programming knowledge"""
-        if language not in self.memory["programming_knowledge"]:
-            self.memory["programming_knowledge"][language] = {"errors_fixed": [], "concepts_learned": []}
-        
-        if solution:
-            self.memory["programming_knowledge"][language]["errors_fixed"].append({
-                "concept": concept,
-                "solution": solution,
-                "timestamp": datetime.now().isoformat()
-            })
-        else:
-            self.memory["programming_knowledge"][language]["concepts_learned"].append({
-                "concept": concept,
-                "timestamp": datetime.now().isoformat()
-            })
-        
-        self.save_memory()
+        record = {
+            "language": language,
+            "concept": concept,
+            "solution": solution,
+            "timestamp": datetime.now().isoformat()
+        }
+        with self.lock:
+            self._apply_programming_knowledge(self.memory, record)
+            self.persist("programming_knowledge", record)
+        if solution and self.semantic_index is not None:
+            # A newer fix for the same concept replaces the indexed one
+            self.semantic_index.add([knowledge_item(language, concept, solution)], replace=True)
+    
+    def get_recent_turns(self, num_conversations=5):
+        """Get recent (user, assistant) turns, oldest first"""
+        recent = self.memory["conversation_history"][-num_conversations:]
+        return [(conv['user'], conv['assistant']) for conv in recent]
     
     def get_recent_context(self, num_conversations=5):
         """Get recent conversation context"""
-        recent = self.memory["conversation_history"][-num_conversations:]
         context = []
-        for conv in recent:
-            context.append(f"User: {conv['user']}")
-            context.append(f"Assistant: {conv['assistant']}")
+        for user, assistant in self.get_recent_turns(num_conversations):
+            context.append(f"User: {user}")
+            context.append(f"Assistant: {assistant}")
         return "\n".join(context)
     
-    def get_programming_context(self, language):
+    def get_programming_context(self, language, limit=None):
         """Get programming knowledge for specific language"""
-        if language in self.memory["programming_knowledge"]:
-            return self.memory["programming_knowledge"][language]
-        return {"errors_fixed": [], "concepts_learned": []}
+        if language not in self.memory["programming_knowledge"]:
+            return {"errors_fixed": [], "concepts_learned": []}
+        
+        knowledge = self.memory["programming_knowledge"][language]
+        if limit is None:
+            return knowledge
+        recent = lambda items: sorted(items, key=lambda item: item.get("last_access", ""))[-limit:]
+        return {
+            "errors_fixed": recent(knowledge["errors_fixed"]),
+            "concepts_learned": recent(knowledge["concepts_learned"])
+        }
+    
+    def get_relevant_context(self, query, k=None):
+        """Get the stored turns and fixes most similar to the query"""
+        if self.semantic_index is None:
+            return []
+        matches = self.semantic_index.search(query, k or Config.SEMANTIC_TOP_K)
+        return [payload["text"] for score, payload in matches]
+    
+    def learn_fact(self, category, fact):
+        """Remember a fact under a category"""
+        record = {
+            "category": category,
+            "fact": fact,
+            "timestamp": datetime.now().isoformat()
+        }
+        with self.lock:
+            self._apply_learned_fact(self.memory, record)
+            self.persist("learned_fact", record)
+    
+    def get_user_name(self):
+        """Get the stored user name"""
+        return self.memory["user_info"]["name"]
+    
+    def get_total_interactions(self):
+        """Get the total number of recorded interactions"""
+        return self.memory["system_data"]["total_interactions"]
+    
+    def clear_conversation_history(self):
+        """Clear conversation history but keep user info"""
+        with self.lock:
+            self.memory["conversation_history"] = []
+            self.memory["conversation_summaries"] = []
+            self.persist("clear_history", {})
+        if self.semantic_index is not None:
+            self.semantic_index.remove(CONVERSATION_KEY_PREFIX)
+    
+    def get_conversation_summaries(self):
+        """Get summaries of older conversation segments, oldest first"""
+        with self.lock:
+            return RollingSummary(self.memory.get("conversation_summaries", [])).render()
+    
+    def refresh_summaries(self, summarize, limit=1):
+        """Replace offline summaries using summarize(source_text); returns count updated"""
+        with self.lock:
+            pending = RollingSummary(self.memory.get("conversation_summaries", [])).pending_refresh()
+            pending = [(s["source_hash"], s["source"]) for s in pending[-limit:]]
+        
+        updated = 0
+        for hash_value, source in pending:
+            summary = summarize(source)
+            if not summary:
+                continue
+            record = {"source_hash": hash_value, "summary": summary, "method": "ai"}
+            with self.lock:
+                # The segment may have been merged away while we waited
+                if RollingSummary(self.memory.get("conversation_summaries", [])).apply_summary(hash_value, summary):
+                    self.persist("summary", record)
+                    updated += 1
+        return updated
     
     def set_user_info(self, name, preferences=None):
         """Set user information"""
-        self.memory["user_info"]["name"] = name
-        if preferences:
-            self.memory["user_info"]["preferences"].update(preferences)
-        self.save_memory()
\ No newline at end of file
+        record = {"name": name, "preferences": preferences}
+        with self.lock:
+            self._apply_user_info(self.memory, record)
+            self.persist("user_info", record)
+    
+    def get_persistence_stats(self):
+        """Get counters describing how memory is being written"""
+        stats = {"mode": Config.MEMORY_STORAGE if Config.MEMORY_STORAGE in ('journal', 'binary') else "json"}
+        if self.flusher is not None:
+            stats["writes_requested"] = self.flusher.requested
+            stats["writes_performed"] = self.flusher.written
+            stats["writes_coalesced"] = self.flusher.coalesced
+        return stats
+    
+    def close(self):
+        """Flush pending changes and release file handles"""
+        if self.flusher is not None:
+            self.flusher.stop()
+        if self.journal is not None:
+            self.save_memory()
+            self.journal.close()
+
+
+def create_memory_system(base_dir=None):
+    """Create the memory system for the configured storage mode"""
+    if Config.MEMORY_STORAGE == 'sqlite':
+        from core.memory_sqlite import SQLiteMemorySystem
+        return SQLiteMemorySystem(base_dir=base_dir)
+    return MemorySystem(base_dir=base_dir)
@@ -0,0 +1,71 @@
+import threading
+import time
+
+class WriteBehindFlusher:
+    """Background thread that coalesces memory saves into one write per interval"""
+
+    def __init__(self, save_callback, interval=2.0):
+        self.save_callback = save_callback
+        self.interval = interval
+        self.requested = 0
+        self.written = 0
+        self._pending = 0
+        self._last_write = 0.0
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="memory-flusher", daemon=True)
+        self._thread.start()
+
+    @property
+    def coalesced(self):
+        """Number of requested saves that were absorbed into another write"""
+        return self.requested - self.written - self._pending
+
+    def mark_dirty(self):
+        """Record that memory changed and needs to be written"""
+        with self._condition:
+            self.requested += 1
+            self._pending += 1
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                delay = self._last_write + self.interval - time.monotonic()
+                if delay > 0:
+                    # Wait out the rest of the interval; further changes
+                    # arriving meanwhile ride along with this write
+                    self._condition.wait(delay)
+                    continue
+            self.flush()
+
+    def flush(self):
+        """Write pending changes now"""
+        with self._condition:
+            pending = self._pending
+            if not pending:
+                return True
+            self._pending = 0
+            self._last_write = time.monotonic()
+        if self.save_callback():
+            with self._condition:
+                self.written += 1
+            return True
+        with self._condition:
+            # Keep the changes marked dirty so the next cycle retries
+            self._pending += pending
+        return False
+
+    def stop(self):
+        """Stop the flusher thread after a final flush"""
+        with self._condition:
+            already_stopped = self._stopped
+            self._stopped = True
+            self._condition.notify()
+        if not already_stopped:
+            self._thread.join()
+        return self.flush()
@@ -0,0 +1,99 @@
+import json
+import os
+from core.records import record_to_json
+from utils.helpers import write_json_atomic
+
+class MemoryJournal:
+    """Append-only log of memory changes, folded into a snapshot on compaction"""
+
+    def __init__(self, snapshot_file, journal_file, compact_every=500):
+        self.snapshot_file = snapshot_file
+        self.journal_file = journal_file
+        self.compact_every = compact_every
+        self.seq = 0
+        self.pending = 0
+        self._handle = None
+
+    def read_records(self, after_seq=0):
+        """Read journal records newer than the snapshot sequence number
+
+        A torn or corrupt tail left by a crash mid-append is cut off the
+        file, so records appended afterwards are not hidden behind it on
+        the next replay.
+        """
+        records = []
+        self.seq = after_seq
+        self.pending = 0
+        if not os.path.exists(self.journal_file):
+            # Later appends must still number past the snapshot
+            return records
+
+        good_offset = 0
+        torn = False
+        with open(self.journal_file, 'rb') as f:
+            for raw in f:
+                line = raw.strip()
+                if not line:
+                    good_offset += len(raw)
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Everything before a torn line is intact
+                    torn = True
+                    break
+                if record.get("seq", 0) > after_seq:
+                    records.append(record)
+                good_offset += len(raw)
+                if not raw.endswith(b"\n"):
+                    # Complete record whose newline never made it to disk
+                    torn = True
+
+        if torn:
+            print(f"Truncating corrupt journal tail in {self.journal_file}")
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(good_offset)
+                if good_offset:
+                    f.seek(good_offset - 1)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+
+        if records:
+            self.seq = records[-1]["seq"]
+        self.pending = len(records)
+        return records
+
+    def append(self, op, data):
+        """Append one compact record for a memory change"""
+        if self._handle is None:
+            self._handle = open(self.journal_file, 'a')
+
+        self.seq += 1
+        record = {"seq": self.seq, "op": op}
+        record.update(data)
+        self._handle.write(json.dumps(record, separators=(',', ':')) + "\n")
+        self._handle.flush()
+        self.pending += 1
+        return self.seq
+
+    def needs_compaction(self):
+        """Check whether the journal has grown past the compaction threshold"""
+        return self.pending >= self.compact_every
+
+    def compact(self, memory):
+        """Write a full snapshot and truncate the journal"""
+        # The snapshot records the last sequence it contains, so replaying a
+        # journal that survived a crash before truncation is still safe
+        memory["system_data"]["journal_seq"] = self.seq
+        write_json_atomic(self.snapshot_file, memory, default=record_to_json)
+
+        self.close()
+        with open(self.journal_file, 'w'):
+            pass
+        self.pending = 0
+
+    def close(self):
+        """Close the journal file handle"""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
@@ -0,0 +1,192 @@
+import contextvars
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from config.api_keys import Config
+from core.memory import create_memory_system
+from utils.helpers import clean_filename
+from utils.logger import setup_logger
+
+logger = setup_logger('memory_shards')
+
+current_user = contextvars.ContextVar('current_user', default=None)
+
+def shard_dir(user_id, root=None):
+    """Directory holding one user's files"""
+    return os.path.join(root or Config.MEMORY_SHARD_DIR, clean_filename(str(user_id)))
+
+class _Shard:
+    def __init__(self):
+        self.memory = None
+        self.load_lock = threading.Lock()
+        self.leases = 0
+        self.last_used = time.monotonic()
+        # Set once an evicted copy has made its final flush
+        self.closed = threading.Event()
+
+class MemoryShardManager:
+    """LRU cache of per-user memory systems, each with its own files and lock
+
+    A sweeper thread closes shards idle for idle_seconds even when no new
+    requests come in.
+    """
+
+    def __init__(self, root=None, max_open=None, idle_seconds=None):
+        self.root = root or Config.MEMORY_SHARD_DIR
+        self.max_open = max_open or Config.MEMORY_MAX_OPEN_SHARDS
+        self.idle_seconds = Config.MEMORY_SHARD_IDLE_SECONDS if idle_seconds is None else idle_seconds
+        self._shards = OrderedDict()
+        self._closing = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._sweeper = threading.Thread(target=self._sweep, name='shard-sweeper', daemon=True)
+        self._sweeper.start()
+
+    def shard_dir(self, user_id):
+        """Directory holding one user's memory files"""
+        return shard_dir(user_id, self.root)
+
+    def acquire(self, user_id):
+        """Lease the memory for a user, loading it if needed"""
+        with self._lock:
+            shard = self._shards.get(user_id)
+            if shard is None:
+                shard = _Shard()
+                self._shards[user_id] = shard
+            self._shards.move_to_end(user_id)
+            shard.leases += 1
+            shard.last_used = time.monotonic()
+            closing = self._closing.get(user_id)
+
+        # Loading happens outside the manager lock so users don't wait on
+        # each other's disk reads
+        try:
+            if closing is not None:
+                # Let a just-evicted copy finish its final flush before reading
+                closing.closed.wait()
+            with shard.load_lock:
+                if shard.memory is None:
+                    shard.memory = create_memory_system(base_dir=self.shard_dir(user_id))
+                    logger.info(f"Loaded memory shard for {user_id}")
+        except Exception:
+            self.release(user_id)
+            raise
+
+        self._evict()
+        return shard.memory
+
+    def release(self, user_id):
+        """Return a lease taken with acquire()"""
+        with self._lock:
+            shard = self._shards.get(user_id)
+            if shard is not None:
+                shard.leases = max(0, shard.leases - 1)
+                shard.last_used = time.monotonic()
+
+    @contextmanager
+    def lease(self, user_id):
+        """Context manager around acquire()/release()"""
+        memory = self.acquire(user_id)
+        try:
+            yield memory
+        finally:
+            self.release(user_id)
+
+    def _evict(self):
+        """Close idle shards and the least recently used ones beyond max_open"""
+        now = time.monotonic()
+        to_close = []
+        with self._lock:
+            for user_id, shard in list(self._shards.items()):
+                idle = now - shard.last_used >= self.idle_seconds
+                over = len(self._shards) - len(to_close) > self.max_open
+                if shard.leases == 0 and (idle or over):
+                    to_close.append((user_id, self._shards.pop(user_id)))
+                    self._closing[user_id] = shard
+        for user_id, shard in to_close:
+            self._close_shard(user_id, shard)
+
+    def evict_idle(self):
+        """Close shards that have been idle longer than idle_seconds"""
+        self._evict()
+
+    def _sweep(self):
+        interval = max(1.0, min(60.0, self.idle_seconds / 4))
+        while not self._stopped.wait(interval):
+            try:
+                self.evict_idle()
+            except Exception as e:
+                logger.error(f"Shard eviction error: {e}")
+
+    def _close_shard(self, user_id, shard):
+        try:
+            with shard.load_lock:
+                if shard.memory is not None:
+                    shard.memory.close()
+                    shard.memory = None
+        finally:
+            shard.closed.set()
+        with self._lock:
+            if self._closing.get(user_id) is shard:
+                del self._closing[user_id]
+        logger.info(f"Closed memory shard for {user_id}")
+
+    def open_shards(self):
+        """User ids whose memory is currently loaded"""
+        with self._lock:
+            return list(self._shards)
+
+    def close_all(self):
+        """Flush and close every open shard"""
+        self._stopped.set()
+        with self._lock:
+            shards = list(self._shards.items())
+            self._shards.clear()
+            self._closing.update(shards)
+        for user_id, shard in shards:
+            self._close_shard(user_id, shard)
+
+class ShardedMemory:
+    """Memory facade that forwards to the shard of the current session
+
+    Modules keep a single memory reference; which user's shard it reaches
+    is decided per call by the session() context (thread/task local).
+    """
+
+    def __init__(self, manager=None, default_user=None):
+        self.manager = manager or MemoryShardManager()
+        self.default_user = default_user or Config.DEFAULT_USER_ID
+        self._default_memory = None
+
+    @contextmanager
+    def session(self, user_id):
+        """Route memory calls in this context to user_id's shard"""
+        with self.manager.lease(user_id):
+            token = current_user.set(user_id)
+            try:
+                yield self
+            finally:
+                current_user.reset(token)
+
+    def current(self):
+        """The memory system for the active session (or the default user)"""
+        user_id = current_user.get()
+        if user_id is None:
+            # Calls outside any session (the local voice loop) use a default
+            # shard that stays leased for the facade's lifetime
+            if self._default_memory is None:
+                self._default_memory = self.manager.acquire(self.default_user)
+            return self._default_memory
+        # session() holds a lease, so this shard can't be evicted under us
+        with self.manager.lease(user_id) as memory:
+            return memory
+
+    def __getattr__(self, name):
+        return getattr(self.current(), name)
+
+    def close(self):
+        """Flush and close every open shard"""
+        self._default_memory = None
+        self.manager.close_all()
@@ -0,0 +1,434 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from config.api_keys import Config
+from core.memory import shard_path
+from core.knowledge_store import concept_hash
+from core.summarizer import RollingSummary
+from core.semantic_index import create_semantic_index, CONVERSATION_KEY_PREFIX, conversation_item, knowledge_item
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    user TEXT NOT NULL,
+    assistant TEXT NOT NULL,
+    type TEXT NOT NULL DEFAULT 'conversation'
+);
+CREATE INDEX IF NOT EXISTS idx_conversations_timestamp ON conversations (timestamp);
+
+CREATE TABLE IF NOT EXISTS programming_knowledge (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    language TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    concept TEXT NOT NULL,
+    solution TEXT,
+    timestamp TEXT NOT NULL,
+    concept_hash TEXT,
+    hits INTEGER NOT NULL DEFAULT 1,
+    last_access TEXT
+);
+
+CREATE TABLE IF NOT EXISTS learned_facts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    category TEXT NOT NULL,
+    fact TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_facts_category ON learned_facts (category, timestamp);
+
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_knowledge_language_time ON programming_knowledge (language, kind, timestamp);
+CREATE INDEX IF NOT EXISTS idx_knowledge_concept ON programming_knowledge (language, concept);
+CREATE INDEX IF NOT EXISTS idx_knowledge_hash ON programming_knowledge (language, kind, concept_hash);
+CREATE INDEX IF NOT EXISTS idx_knowledge_access ON programming_knowledge (language, kind, last_access);
+"""
+
+KNOWLEDGE_COLUMNS = {
+    "concept_hash": "TEXT",
+    "hits": "INTEGER NOT NULL DEFAULT 1",
+    "last_access": "TEXT"
+}
+
+DEFAULT_LANGUAGES = ['python', 'javascript', 'java', 'cpp']
+
+class SQLiteMemorySystem:
+    """MemorySystem backed by SQLite so history is queried instead of held in RAM"""
+
+    def __init__(self, db_file=None, base_dir=None):
+        self.db_file = db_file or shard_path(Config.MEMORY_DB_FILE, base_dir)
+        self.memory_file = shard_path(Config.MEMORY_FILE, base_dir)
+        self.lock = threading.RLock()
+        self.knowledge_limits = {
+            "errors_fixed": Config.KNOWLEDGE_MAX_ERRORS,
+            "concepts_learned": Config.KNOWLEDGE_MAX_CONCEPTS
+        }
+        self.conn = self.load_memory()
+        self.semantic_index = create_semantic_index(shard_path(Config.SEMANTIC_INDEX_PATH, base_dir))
+        if self.semantic_index is not None and not len(self.semantic_index):
+            self._backfill_index()
+
+    def load_memory(self):
+        """Open the database, creating and importing from JSON if needed"""
+        os.makedirs(os.path.dirname(self.db_file) or '.', exist_ok=True)
+        is_new = not os.path.exists(self.db_file)
+
+        conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        self._migrate(conn)
+        conn.executescript(INDEXES)
+
+        if is_new:
+            self._init_state(conn)
+            if os.path.exists(self.memory_file):
+                self._import_json(conn, self.memory_file)
+        conn.commit()
+        return conn
+
+    def _migrate(self, conn):
+        """Add knowledge store columns to databases created before they existed"""
+        existing = set(row[1] for row in conn.execute("PRAGMA table_info(programming_knowledge)"))
+        for column, definition in KNOWLEDGE_COLUMNS.items():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE programming_knowledge ADD COLUMN {column} {definition}")
+        if "concept_hash" not in existing:
+            for row_id, concept in conn.execute("SELECT id, concept FROM programming_knowledge").fetchall():
+                conn.execute(
+                    "UPDATE programming_knowledge SET concept_hash = ?, last_access = timestamp WHERE id = ?",
+                    (concept_hash(concept), row_id)
+                )
+
+    def _init_state(self, conn):
+        defaults = {
+            "user_info": {"name": "", "preferences": {}, "programming_languages": []},
+            "friendship_data": {"user_mood": "", "favorite_topics": [], "personal_details": {}},
+            "system_data": {"last_session": "", "total_interactions": 0}
+        }
+        for key, value in defaults.items():
+            conn.execute(
+                "INSERT OR IGNORE INTO state (key, value) VALUES (?, ?)",
+                (key, json.dumps(value))
+            )
+
+    def _import_json(self, conn, path):
+        """Import an existing JSON memory file into the database"""
+        try:
+            with open(path, 'r') as f:
+                memory = json.load(f)
+        except Exception as e:
+            print(f"Error importing memory: {e}")
+            return
+
+        for key in ("user_info", "friendship_data", "system_data", "conversation_summaries"):
+            if key in memory:
+                conn.execute(
+                    "REPLACE INTO state (key, value) VALUES (?, ?)",
+                    (key, json.dumps(memory[key]))
+                )
+
+        conn.executemany(
+            "INSERT INTO conversations (timestamp, user, assistant, type) VALUES (?, ?, ?, ?)",
+            [(c["timestamp"], c["user"], c["assistant"], c.get("type", "conversation"))
+             for c in memory.get("conversation_history", [])]
+        )
+
+        for language, knowledge in memory.get("programming_knowledge", {}).items():
+            for kind in ("errors_fixed", "concepts_learned"):
+                for item in knowledge.get(kind, []):
+                    self._upsert_knowledge(
+                        conn, language, kind, item["concept"], item.get("solution"),
+                        item["timestamp"], hits=item.get("hits", 1),
+                        last_access=item.get("last_access", item["timestamp"])
+                    )
+
+        rows = []
+        for category, facts in memory.get("learned_facts", {}).items():
+            for item in facts if isinstance(facts, list) else [facts]:
+                if isinstance(item, dict):
+                    rows.append((category, item.get("fact", ""), item.get("timestamp", "")))
+                else:
+                    rows.append((category, str(item), ""))
+        conn.executemany(
+            "INSERT INTO learned_facts (category, fact, timestamp) VALUES (?, ?, ?)",
+            rows
+        )
+
+    def _upsert_knowledge(self, conn, language, kind, concept, solution, timestamp, hits=1, last_access=None):
+        """Insert a knowledge entry or bump the matching one, then enforce the cap"""
+        key = concept_hash(concept)
+        last_access = last_access or timestamp
+        row = conn.execute(
+            "SELECT id FROM programming_knowledge WHERE language = ? AND kind = ? AND concept_hash = ?",
+            (language, kind, key)
+        ).fetchone()
+        if row:
+            conn.execute(
+                "UPDATE programming_knowledge SET hits = hits + ?, last_access = MAX(COALESCE(last_access, ''), ?), "
+                "solution = COALESCE(?, solution) WHERE id = ?",
+                (hits, last_access, solution, row[0])
+            )
+            return
+
+        conn.execute(
+            "INSERT INTO programming_knowledge (language, kind, concept, solution, timestamp, concept_hash, hits, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (language, kind, concept, solution, timestamp, key, hits, last_access)
+        )
+
+        limit = self.knowledge_limits[kind]
+        if limit:
+            order = "hits ASC, last_access ASC" if Config.KNOWLEDGE_EVICTION_POLICY == 'lfu' else "last_access ASC"
+            conn.execute(
+                f"DELETE FROM programming_knowledge WHERE id IN ("
+                f"SELECT id FROM programming_knowledge WHERE language = ? AND kind = ? "
+                f"ORDER BY {order} LIMIT MAX(0, (SELECT COUNT(*) FROM programming_knowledge "
+                f"WHERE language = ? AND kind = ?) - ?))",
+                (language, kind, language, kind, limit)
+            )
+
+    def _backfill_index(self, batch_size=1000):
+        """Index existing rows in batches without loading them all at once"""
+        cursor = self.conn.execute("SELECT timestamp, user, assistant FROM conversations ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            self.semantic_index.add([conversation_item(t, u, a) for t, u, a in rows])
+        cursor = self.conn.execute(
+            "SELECT language, concept, solution FROM programming_knowledge WHERE kind = 'errors_fixed' ORDER BY id"
+        )
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            self.semantic_index.add([knowledge_item(l, c, s) for l, c, s in rows])
+
+    def _fold_old_turns(self, newest_id):
+        """Summarize the next segment of turns once it has aged out of the recent window"""
+        folded_id = self._get_state("summary_cursor") or 0
+        window_start = newest_id - Config.MAX_CONVERSATION_HISTORY
+        count = self.conn.execute(
+            "SELECT COUNT(*) FROM conversations WHERE id > ? AND id <= ?",
+            (folded_id, window_start)
+        ).fetchone()[0]
+        if count < Config.SUMMARY_SEGMENT_TURNS:
+            return
+
+        rows = self.conn.execute(
+            "SELECT id, timestamp, user, assistant FROM conversations WHERE id > ? AND id <= ? ORDER BY id",
+            (folded_id, window_start)
+        ).fetchall()
+        segments = self._get_state("conversation_summaries") or []
+        RollingSummary(segments).fold([(t, u, a) for _, t, u, a in rows])
+        self._set_state("conversation_summaries", segments)
+        self._set_state("summary_cursor", rows[-1][0])
+
+    def _get_state(self, key):
+        row = self.conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def _set_state(self, key, value):
+        self.conn.execute(
+            "REPLACE INTO state (key, value) VALUES (?, ?)",
+            (key, json.dumps(value))
+        )
+
+    @property
+    def memory(self):
+        """Materialize a JSON-shaped view of memory (reads every table)"""
+        with self.lock:
+            history = self.conn.execute(
+                "SELECT timestamp, user, assistant, type FROM conversations ORDER BY id DESC LIMIT ?",
+                (Config.MAX_CONVERSATION_HISTORY,)
+            ).fetchall()
+
+            knowledge = {lang: {"errors_fixed": [], "concepts_learned": []} for lang in DEFAULT_LANGUAGES}
+            for language, kind, concept, solution, timestamp in self.conn.execute(
+                "SELECT language, kind, concept, solution, timestamp FROM programming_knowledge ORDER BY id"
+            ):
+                item = {"concept": concept, "timestamp": timestamp}
+                if solution:
+                    item["solution"] = solution
+                knowledge.setdefault(language, {"errors_fixed": [], "concepts_learned": []})[kind].append(item)
+
+            facts = {}
+            for category, fact, timestamp in self.conn.execute(
+                "SELECT category, fact, timestamp FROM learned_facts ORDER BY id"
+            ):
+                facts.setdefault(category, []).append({"fact": fact, "timestamp": timestamp})
+
+            return {
+                "user_info": self._get_state("user_info"),
+                "conversation_history": [
+                    {"timestamp": t, "user": u, "assistant": a, "type": k}
+                    for t, u, a, k in reversed(history)
+                ],
+                "conversation_summaries": self._get_state("conversation_summaries") or [],
+                "learned_facts": facts,
+                "programming_knowledge": knowledge,
+                "friendship_data": self._get_state("friendship_data"),
+                "system_data": self._get_state("system_data")
+            }
+
+    def save_memory(self):
+        """Commit pending changes to the database"""
+        try:
+            with self.lock:
+                self.conn.commit()
+            return True
+        except Exception as e:
+            print(f"Error saving memory: {e}")
+            return False
+
+    def add_conversation(self, user_input, assistant_response):
+        """Add conversation to history with timestamp"""
+        timestamp = datetime.now().isoformat()
+        with self.lock:
+            cursor = self.conn.execute(
+                "INSERT INTO conversations (timestamp, user, assistant) VALUES (?, ?, ?)",
+                (timestamp, user_input, assistant_response)
+            )
+            self._fold_old_turns(cursor.lastrowid)
+            system_data = self._get_state("system_data")
+            system_data["total_interactions"] = system_data.get("total_interactions", 0) + 1
+            system_data["last_session"] = timestamp
+            self._set_state("system_data", system_data)
+            self.save_memory()
+        if self.semantic_index is not None:
+            self.semantic_index.add([conversation_item(timestamp, user_input, assistant_response)])
+
+    def add_programming_knowledge(self, language, concept, solution=None):
+        """Add programming knowledge"""
+        kind = "errors_fixed" if solution else "concepts_learned"
+        with self.lock:
+            self._upsert_knowledge(self.conn, language, kind, concept, solution, datetime.now().isoformat())
+            self.save_memory()
+        if solution and self.semantic_index is not None:
+            # A newer fix for the same concept replaces the indexed one
+            self.semantic_index.add([knowledge_item(language, concept, solution)], replace=True)
+
+    def get_recent_turns(self, num_conversations=5):
+        """Get recent (user, assistant) turns, oldest first"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT user, assistant FROM conversations ORDER BY id DESC LIMIT ?",
+                (num_conversations,)
+            ).fetchall()
+        return rows[::-1]
+
+    def get_recent_context(self, num_conversations=5):
+        """Get recent conversation context"""
+        context = []
+        for user, assistant in self.get_recent_turns(num_conversations):
+            context.append(f"User: {user}")
+            context.append(f"Assistant: {assistant}")
+        return "\n".join(context)
+
+    def get_programming_context(self, language, limit=None):
+        """Get programming knowledge for specific language"""
+        result = {"errors_fixed": [], "concepts_learned": []}
+        with self.lock:
+            for kind in result:
+                rows = self.conn.execute(
+                    "SELECT concept, solution, timestamp FROM programming_knowledge "
+                    "WHERE language = ? AND kind = ? ORDER BY last_access DESC LIMIT ?",
+                    (language, kind, -1 if limit is None else limit)
+                ).fetchall()
+                for concept, solution, timestamp in reversed(rows):
+                    item = {"concept": concept, "timestamp": timestamp}
+                    if solution:
+                        item["solution"] = solution
+                    result[kind].append(item)
+        return result
+
+    def get_relevant_context(self, query, k=None):
+        """Get the stored turns and fixes most similar to the query"""
+        if self.semantic_index is None:
+            return []
+        matches = self.semantic_index.search(query, k or Config.SEMANTIC_TOP_K)
+        return [payload["text"] for score, payload in matches]
+
+    def learn_fact(self, category, fact):
+        """Remember a fact under a category"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO learned_facts (category, fact, timestamp) VALUES (?, ?, ?)",
+                (category, fact, datetime.now().isoformat())
+            )
+            self.save_memory()
+
+    def set_user_info(self, name, preferences=None):
+        """Set user information"""
+        with self.lock:
+            user_info = self._get_state("user_info")
+            user_info["name"] = name
+            if preferences:
+                user_info.setdefault("preferences", {}).update(preferences)
+            self._set_state("user_info", user_info)
+            self.save_memory()
+
+    def get_user_name(self):
+        """Get the stored user name"""
+        with self.lock:
+            return self._get_state("user_info").get("name", "")
+
+    def get_total_interactions(self):
+        """Get the total number of recorded interactions"""
+        with self.lock:
+            return self._get_state("system_data").get("total_interactions", 0)
+
+    def clear_conversation_history(self):
+        """Clear conversation history but keep user info"""
+        with self.lock:
+            self.conn.execute("DELETE FROM conversations")
+            self.conn.execute("DELETE FROM state WHERE key IN ('conversation_summaries', 'summary_cursor')")
+            self.save_memory()
+        if self.semantic_index is not None:
+            self.semantic_index.remove(CONVERSATION_KEY_PREFIX)
+
+    def get_conversation_summaries(self):
+        """Get summaries of older conversation segments, oldest first"""
+        with self.lock:
+            return RollingSummary(self._get_state("conversation_summaries") or []).render()
+
+    def refresh_summaries(self, summarize, limit=1):
+        """Replace offline summaries using summarize(source_text); returns count updated"""
+        with self.lock:
+            segments = self._get_state("conversation_summaries") or []
+            pending = RollingSummary(segments).pending_refresh()
+            pending = [(s["source_hash"], s["source"]) for s in pending[-limit:]]
+
+        updated = 0
+        for hash_value, source in pending:
+            summary = summarize(source)
+            if not summary:
+                continue
+            with self.lock:
+                segments = self._get_state("conversation_summaries") or []
+                if RollingSummary(segments).apply_summary(hash_value, summary):
+                    self._set_state("conversation_summaries", segments)
+                    self.save_memory()
+                    updated += 1
+        return updated
+
+    def get_persistence_stats(self):
+        """Get counters describing how memory is being written"""
+        return {"mode": "sqlite"}
+
+    def close(self):
+        """Flush pending changes and close the database"""
+        with self.lock:
+            if self.conn is not None:
+                self.conn.commit()
+                self.conn.close()
+                self.conn = None
@@ -0,0 +1,141 @@
+import sys
+from datetime import datetime
+
+CONVERSATION = sys.intern("conversation")
+
+def to_epoch(timestamp):
+    """Convert an ISO timestamp (or epoch float) to epoch seconds"""
+    if timestamp is None or isinstance(timestamp, float):
+        return timestamp
+    if isinstance(timestamp, int):
+        return float(timestamp)
+    if not timestamp:
+        return 0.0
+    return datetime.fromisoformat(timestamp).timestamp()
+
+def to_iso(epoch):
+    """Convert epoch seconds back to the ISO strings used in memory.json"""
+    if not epoch:
+        return ""
+    return datetime.fromtimestamp(epoch).isoformat()
+
+class CompactRecord:
+    """Slotted record that reads and writes like the dict it replaces
+
+    Timestamps are held as epoch floats and exposed as ISO strings, and
+    repeated strings are interned, so large histories don't pay per-record
+    dict overhead. Unset optional fields behave like missing keys.
+    """
+
+    __slots__ = ()
+    FIELDS = ()
+    TIME_FIELDS = ()
+    INTERNED_FIELDS = ()
+
+    def __init__(self, **values):
+        for field in self.FIELDS:
+            self[field] = values.get(field)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from its JSON dict form"""
+        return cls(**{key: data.get(key) for key in cls.FIELDS})
+
+    def to_dict(self):
+        """Convert back to the JSON dict form, omitting unset fields"""
+        return {field: self[field] for field in self.FIELDS if field in self}
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        value = getattr(self, key)
+        if value is None:
+            raise KeyError(key)
+        if key in self.TIME_FIELDS:
+            return to_iso(value)
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        if key in self.TIME_FIELDS:
+            value = to_epoch(value)
+        elif key in self.INTERNED_FIELDS and isinstance(value, str):
+            value = sys.intern(value)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.FIELDS and getattr(self, key) is not None
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def keys(self):
+        return [field for field in self.FIELDS if field in self]
+
+    def __eq__(self, other):
+        if isinstance(other, CompactRecord):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+class ConversationTurn(CompactRecord):
+    """One entry of memory["conversation_history"]"""
+
+    __slots__ = ("timestamp", "user", "assistant", "type")
+    FIELDS = __slots__
+    TIME_FIELDS = ("timestamp",)
+    INTERNED_FIELDS = ("type",)
+
+    def __init__(self, timestamp=None, user=None, assistant=None, type=CONVERSATION):
+        self.timestamp = to_epoch(timestamp)
+        self.user = user
+        self.assistant = assistant
+        self.type = sys.intern(type or CONVERSATION)
+
+class KnowledgeRecord(CompactRecord):
+    """One entry of a language's errors_fixed or concepts_learned list"""
+
+    __slots__ = ("concept", "solution", "timestamp", "hash", "hits", "last_access")
+    FIELDS = __slots__
+    TIME_FIELDS = ("timestamp", "last_access")
+
+def compact_memory(memory):
+    """Convert the record lists of a loaded memory dict to compact records in place"""
+    memory["conversation_history"] = [
+        conv if isinstance(conv, ConversationTurn) else ConversationTurn.from_dict(conv)
+        for conv in memory.get("conversation_history", [])
+    ]
+    knowledge = {}
+    for language, lists in memory.get("programming_knowledge", {}).items():
+        for kind in ("errors_fixed", "concepts_learned"):
+            lists[kind] = [
+                item if isinstance(item, KnowledgeRecord) else KnowledgeRecord.from_dict(item)
+                for item in lists.get(kind, [])
+            ]
+        knowledge[sys.intern(language)] = lists
+    memory["programming_knowledge"] = knowledge
+    return memory
+
+def record_object_hook(obj):
+    """json.load object_hook that decodes history and knowledge entries straight
+    into compact records, so the intermediate dicts are never all alive at once"""
+    if "timestamp" in obj:
+        if "user" in obj and "assistant" in obj:
+            return ConversationTurn.from_dict(obj)
+        if "concept" in obj:
+            return KnowledgeRecord.from_dict(obj)
+    return obj
+
+def record_to_json(value):
+    """json.dump default hook for compact records"""
+    if isinstance(value, CompactRecord):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
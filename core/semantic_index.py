@@ -0,0 +1,270 @@
+import json
+import os
+import re
+import threading
+import zlib
+from config.api_keys import Config
+from core.knowledge_store import concept_hash
+from utils.logger import setup_logger
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = setup_logger('semantic_index')
+
+# Key prefix of conversation turns, so they can be removed together
+CONVERSATION_KEY_PREFIX = "c:"
+
+class HashingEmbedder:
+    """Offline embedder: signed feature hashing of word unigrams and bigrams"""
+
+    def __init__(self, dim=256):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text):
+        words = re.findall(r'\w+', text.lower())
+        features = list(words)
+        features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+        return features
+
+    def encode(self, texts):
+        """Embed a list of texts into L2-normalized float32 rows"""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode('utf-8'))
+                matrix[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+class SentenceTransformerEmbedder:
+    """Embedder backed by a sentence-transformers model (downloads on first use)"""
+
+    def __init__(self, model_name):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f"st-{model_name}"
+
+    def encode(self, texts):
+        """Embed a list of texts into L2-normalized float32 rows"""
+        return self.model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+class SemanticIndex:
+    """Cosine similarity index stored as a memory-mapped matrix
+
+    Vectors live in <path>.f32 (grown by doubling), payloads in <path>.jsonl
+    (one line per row) and shape/embedder info in <path>.meta.json. Rows
+    are appended; replacing or removing rows rewrites both files.
+    """
+
+    def __init__(self, path, embedder, initial_capacity=1024):
+        self.path = path
+        self.embedder = embedder
+        self.dim = embedder.dim
+        self.matrix_file = f"{path}.f32"
+        self.payload_file = f"{path}.jsonl"
+        self.meta_file = f"{path}.meta.json"
+        self.initial_capacity = initial_capacity
+        self.count = 0
+        self.capacity = 0
+        self.payloads = []
+        self.keys = set()
+        self.matrix = None
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Open the on-disk index, resetting it if the embedder changed"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        meta = {}
+        if os.path.exists(self.meta_file):
+            with open(self.meta_file, 'r') as f:
+                meta = json.load(f)
+
+        if meta.get("embedder") != self.embedder.name or meta.get("dim") != self.dim:
+            if meta:
+                logger.warning("Embedder changed, rebuilding semantic index")
+            for path in (self.matrix_file, self.payload_file):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._resize(self.initial_capacity)
+            return
+
+        if os.path.exists(self.payload_file):
+            with open(self.payload_file, 'r') as f:
+                for line in f:
+                    try:
+                        self.payloads.append(json.loads(line))
+                    except ValueError:
+                        break
+        # Rows past the last complete payload line (torn write) are ignored
+        self.count = min(len(self.payloads), meta.get("count", 0))
+        self.payloads = self.payloads[:self.count]
+        self.keys = set(p["key"] for p in self.payloads)
+        self.capacity = meta.get("capacity", self.initial_capacity)
+        self.matrix = np.memmap(self.matrix_file, dtype=np.float32, mode='r+', shape=(self.capacity, self.dim))
+
+    def _resize(self, capacity):
+        new_file = self.matrix_file + ".tmp"
+        matrix = np.memmap(new_file, dtype=np.float32, mode='w+', shape=(capacity, self.dim))
+        if self.matrix is not None and self.count:
+            matrix[:self.count] = self.matrix[:self.count]
+        matrix.flush()
+        del self.matrix
+        os.replace(new_file, self.matrix_file)
+        self.matrix = np.memmap(self.matrix_file, dtype=np.float32, mode='r+', shape=(capacity, self.dim))
+        self.capacity = capacity
+        self._write_meta()
+
+    def _write_meta(self):
+        with open(self.meta_file, 'w') as f:
+            json.dump({
+                "embedder": self.embedder.name,
+                "dim": self.dim,
+                "count": self.count,
+                "capacity": self.capacity
+            }, f)
+
+    def __len__(self):
+        return self.count
+
+    def add(self, items, replace=False):
+        """Insert (key, text, payload) items, skipping keys already indexed
+
+        With replace, an indexed key whose text changed is re-embedded.
+        """
+        with self.lock:
+            if replace:
+                texts = {p["key"]: p["text"] for p in self.payloads}
+                stale = set(key for key, text, _ in items if key in texts and texts[key] != text)
+                if stale:
+                    self._keep([i for i, p in enumerate(self.payloads) if p["key"] not in stale])
+            return self._add(items)
+
+    def remove(self, prefix=""):
+        """Remove every row whose key starts with prefix (all rows by default)"""
+        with self.lock:
+            keep = [i for i, p in enumerate(self.payloads) if not p["key"].startswith(prefix)]
+            removed = self.count - len(keep)
+            if removed:
+                self._keep(keep)
+            return removed
+
+    def clear(self):
+        """Remove every row"""
+        return self.remove()
+
+    def _keep(self, rows):
+        """Rewrite the index with only the given rows, in order"""
+        new_file = self.matrix_file + ".tmp"
+        matrix = np.memmap(new_file, dtype=np.float32, mode='w+', shape=(self.capacity, self.dim))
+        if rows:
+            matrix[:len(rows)] = self.matrix[rows]
+        matrix.flush()
+        del self.matrix
+        os.replace(new_file, self.matrix_file)
+        self.matrix = np.memmap(self.matrix_file, dtype=np.float32, mode='r+', shape=(self.capacity, self.dim))
+
+        self.payloads = [self.payloads[i] for i in rows]
+        new_file = self.payload_file + ".tmp"
+        with open(new_file, 'w') as f:
+            for record in self.payloads:
+                f.write(json.dumps(record, separators=(',', ':')) + "\n")
+        os.replace(new_file, self.payload_file)
+        self.keys = set(p["key"] for p in self.payloads)
+        self.count = len(rows)
+        self._write_meta()
+
+    def _add(self, items):
+        new_items = []
+        for key, text, payload in items:
+            if key in self.keys or not text.strip():
+                continue
+            self.keys.add(key)
+            new_items.append((key, text, payload))
+        if not new_items:
+            return 0
+
+        vectors = self.embedder.encode([text for _, text, _ in new_items])
+        needed = self.count + len(new_items)
+        if needed > self.capacity:
+            capacity = self.capacity
+            while capacity < needed:
+                capacity *= 2
+            self._resize(capacity)
+
+        self.matrix[self.count:needed] = vectors
+        self.matrix.flush()
+        with open(self.payload_file, 'a') as f:
+            for key, text, payload in new_items:
+                record = {"key": key, "text": text}
+                record.update(payload or {})
+                f.write(json.dumps(record, separators=(',', ':')) + "\n")
+                self.payloads.append(record)
+        self.count = needed
+        self._write_meta()
+        return len(new_items)
+
+    def search(self, query, k=3, min_score=0.1):
+        """Return the top-k (score, payload) matches for a query"""
+        return self.search_batch([query], k, min_score)[0]
+
+    def search_batch(self, queries, k=3, min_score=0.1):
+        """Return top-k (score, payload) matches for each query in one matrix product"""
+        # _keep and _resize swap in new matrices, so the rows and payloads
+        # taken here stay paired after the lock is released
+        with self.lock:
+            count = self.count
+            matrix = self.matrix
+            payloads = self.payloads[:count]
+        if not count or not queries:
+            return [[] for _ in queries]
+
+        scores = self.embedder.encode(queries) @ matrix[:count].T
+        k = min(k, count)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in enumerate(top):
+            ranked = candidates[np.argsort(-scores[row, candidates])]
+            results.append([
+                (float(scores[row, i]), payloads[i])
+                for i in ranked if scores[row, i] >= min_score
+            ])
+        return results
+
+def create_embedder():
+    """Create the configured embedder, falling back to feature hashing"""
+    if Config.SEMANTIC_EMBEDDER == 'sentence-transformers':
+        try:
+            return SentenceTransformerEmbedder(Config.SEMANTIC_MODEL)
+        except Exception as e:
+            logger.warning(f"sentence-transformers unavailable ({e}), using hashing embedder")
+    return HashingEmbedder(Config.SEMANTIC_DIM)
+
+def create_semantic_index(path=None):
+    """Create the semantic recall index if enabled and NumPy is installed"""
+    if not Config.SEMANTIC_RECALL:
+        return None
+    if np is None:
+        logger.warning("NumPy not installed, semantic recall disabled")
+        return None
+    try:
+        return SemanticIndex(path or Config.SEMANTIC_INDEX_PATH, create_embedder())
+    except Exception as e:
+        logger.error(f"Could not open semantic index: {e}")
+        return None
+
+def conversation_item(timestamp, user, assistant):
+    """Build an index item for a conversation turn"""
+    text = f"User: {user}\nAssistant: {assistant}"
+    return (f"{CONVERSATION_KEY_PREFIX}{timestamp}", text[:Config.SEMANTIC_MAX_TEXT], {"kind": "conversation"})
+
+def knowledge_item(language, concept, solution):
+    """Build an index item for a fixed error"""
+    text = f"Previously solved ({language}): {concept}\nSolution: {solution}"
+    return (f"k:{language}:{concept_hash(concept)}", text[:Config.SEMANTIC_MAX_TEXT], {"kind": "knowledge", "language": language})
@@ -0,0 +1,205 @@
+"""Binary memory snapshots with lazily decoded sections.
+
+Layout (little endian):
+
+    b"JVMS" | u16 version | u16 section count
+    per section: u8 name length | name | u8 kind | u64 offset | u64 length
+    section payloads
+
+Small sections (user_info, system_data, ...) are JSON and decoded at load.
+conversation_history is a run of length-prefixed turn records and, like
+programming_knowledge, is only decoded on first access through the mmap.
+
+Convert between formats with:
+
+    python -m core.snapshot to-snap data/memory.json data/memory.snap
+    python -m core.snapshot to-json data/memory.snap data/memory.json
+"""
+import json
+import mmap
+import struct
+import sys
+from core.records import ConversationTurn, record_object_hook, record_to_json, to_epoch
+from utils.helpers import write_bytes_atomic
+
+MAGIC = b"JVMS"
+VERSION = 1
+KIND_JSON = 0
+KIND_TURNS = 1
+LAZY_SECTIONS = ("conversation_history", "programming_knowledge")
+
+HEADER = struct.Struct("<4sHH")
+ENTRY = struct.Struct("<BQQ")
+TURN = struct.Struct("<dIIB")
+
+def encode_turns(history):
+    """Encode conversation turns as fixed header + UTF-8 fields"""
+    parts = []
+    for conv in history:
+        user = conv["user"].encode('utf-8')
+        assistant = conv["assistant"].encode('utf-8')
+        kind = conv.get("type", "conversation").encode('utf-8')
+        parts.append(TURN.pack(to_epoch(conv["timestamp"]), len(user), len(assistant), len(kind)))
+        parts.extend((user, assistant, kind))
+    return b"".join(parts)
+
+def iter_turns(buffer, offset, length):
+    """Yield ConversationTurn objects decoded one at a time from a buffer slice"""
+    end = offset + length
+    while offset < end:
+        timestamp, user_len, assistant_len, kind_len = TURN.unpack_from(buffer, offset)
+        offset += TURN.size
+        user = bytes(buffer[offset:offset + user_len]).decode('utf-8')
+        offset += user_len
+        assistant = bytes(buffer[offset:offset + assistant_len]).decode('utf-8')
+        offset += assistant_len
+        kind = bytes(buffer[offset:offset + kind_len]).decode('utf-8')
+        offset += kind_len
+        yield ConversationTurn(timestamp, user, assistant, kind)
+
+def decode_turns(buffer, offset, length):
+    """Decode turn records from a buffer slice into ConversationTurn objects"""
+    return list(iter_turns(buffer, offset, length))
+
+def encode_snapshot(memory):
+    """Encode a memory dict as snapshot bytes
+
+    Sections of a LazyMemory that were never decoded are copied through as
+    raw bytes, so saving doesn't force them to be materialized.
+    """
+    sections = []
+    if isinstance(memory, LazyMemory):
+        sections.extend(memory.raw_sections())
+    for name, value in memory.items():
+        if name == "conversation_history":
+            sections.append((name, KIND_TURNS, encode_turns(value)))
+        else:
+            payload = json.dumps(value, separators=(',', ':'), default=record_to_json)
+            sections.append((name, KIND_JSON, payload.encode('utf-8')))
+
+    header_size = HEADER.size + sum(1 + len(name.encode('utf-8')) + ENTRY.size for name, _, _ in sections)
+    header = [HEADER.pack(MAGIC, VERSION, len(sections))]
+    offset = header_size
+    for name, kind, payload in sections:
+        encoded_name = name.encode('utf-8')
+        header.append(struct.pack("<B", len(encoded_name)) + encoded_name)
+        header.append(ENTRY.pack(kind, offset, len(payload)))
+        offset += len(payload)
+    return b"".join(header + [payload for _, _, payload in sections])
+
+def write_snapshot(path, memory):
+    """Atomically write a memory dict as a binary snapshot"""
+    write_bytes_atomic(path, encode_snapshot(memory))
+
+class LazyMemory(dict):
+    """Memory dict whose large sections are decoded from the snapshot on first access"""
+
+    def __init__(self, buffer, lazy_sections, on_materialize=None):
+        super().__init__()
+        self._buffer = buffer
+        self._lazy = lazy_sections
+        self._on_materialize = on_materialize
+
+    def __missing__(self, key):
+        if key not in self._lazy:
+            raise KeyError(key)
+        kind, offset, length = self._lazy.pop(key)
+        if kind == KIND_TURNS:
+            value = decode_turns(self._buffer, offset, length)
+        else:
+            value = json.loads(bytes(self._buffer[offset:offset + length]).decode('utf-8'), object_hook=record_object_hook)
+        if self._on_materialize is not None:
+            self._on_materialize(key, value)
+        self[key] = value
+        if not self._lazy:
+            self.release()
+        return value
+
+    def __contains__(self, key):
+        return key in self._lazy or super().__contains__(key)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def peek(self, key):
+        """A section's value without keeping it decoded; turns come as an iterator"""
+        if key not in self._lazy:
+            return self[key]
+        kind, offset, length = self._lazy[key]
+        if kind == KIND_TURNS:
+            return iter_turns(self._buffer, offset, length)
+        return json.loads(bytes(self._buffer[offset:offset + length]).decode('utf-8'), object_hook=record_object_hook)
+
+    def raw_sections(self):
+        """(name, kind, bytes) for sections that are still undecoded"""
+        return [
+            (name, kind, bytes(self._buffer[offset:offset + length]))
+            for name, (kind, offset, length) in self._lazy.items()
+        ]
+
+    def materialize(self):
+        """Decode every remaining lazy section (required before serializing)"""
+        for key in list(self._lazy):
+            self[key]
+        return self
+
+    def release(self):
+        """Close the underlying mmap once nothing lazy remains"""
+        if self._buffer is not None and not self._lazy:
+            self._buffer.close()
+            self._buffer = None
+
+def read_snapshot(path, on_materialize=None):
+    """Open a snapshot, decoding small sections now and large ones on demand"""
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, count = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or version != VERSION:
+        buffer.close()
+        raise ValueError(f"{path} is not a version {VERSION} memory snapshot")
+
+    position = HEADER.size
+    lazy = {}
+    memory = LazyMemory(buffer, lazy, on_materialize)
+    for _ in range(count):
+        name_len = buffer[position]
+        position += 1
+        name = bytes(buffer[position:position + name_len]).decode('utf-8')
+        position += name_len
+        kind, offset, length = ENTRY.unpack_from(buffer, position)
+        position += ENTRY.size
+        if name in LAZY_SECTIONS:
+            lazy[name] = (kind, offset, length)
+        else:
+            memory[name] = json.loads(bytes(buffer[offset:offset + length]).decode('utf-8'))
+    memory.release()
+    return memory
+
+def json_to_snapshot(json_path, snapshot_path):
+    """Convert a memory.json file to a binary snapshot"""
+    with open(json_path, 'r') as f:
+        memory = json.load(f, object_hook=record_object_hook)
+    write_snapshot(snapshot_path, memory)
+
+def snapshot_to_json(snapshot_path, json_path):
+    """Convert a binary snapshot back to memory.json"""
+    memory = read_snapshot(snapshot_path).materialize()
+    with open(json_path, 'w') as f:
+        json.dump(memory, f, indent=2, default=record_to_json)
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ('to-snap', 'to-json'):
+        print("Usage: python -m core.snapshot to-snap <memory.json> <memory.snap>")
+        print("       python -m core.snapshot to-json <memory.snap> <memory.json>")
+        sys.exit(1)
+    if sys.argv[1] == 'to-snap':
+        json_to_snapshot(sys.argv[2], sys.argv[3])
+    else:
+        snapshot_to_json(sys.argv[2], sys.argv[3])
+    print(f"✅ Converted {sys.argv[2]} -> {sys.argv[3]}")
@@ -1,65 +1,358 @@
 import speech_recognition as sr
 import pyttsx3
+import json
+import os
+import queue
 import threading
 import time
+import wave
+from collections import deque
+from config.api_keys import Config
+from config.phrases import NOT_UNDERSTOOD_PROMPT, RECOGNITION_ERROR_PROMPT, STATIC_PHRASES
+from core.tts_cache import create_tts_cache
+from core.tts_worker import TTSWorker, URGENT, NORMAL
+from core.vad import create_vad, rms
+from utils.helpers import write_json_atomic
 from utils.logger import setup_logger
 
 logger = setup_logger('speech_engine')
 
+def configure_english_voice(tts_engine, voice_id=None):
+    """Select an English voice (or the first one) and set speaking rate and volume
+    
+    A voice_id remembered from an earlier run is used directly, skipping
+    the scan of installed voices. Returns the selected voice id.
+    """
+    if voice_id:
+        try:
+            tts_engine.setProperty('voice', voice_id)
+            tts_engine.setProperty('rate', 170)
+            tts_engine.setProperty('volume', 0.9)
+            logger.info(f"Using saved voice: {voice_id}")
+            return voice_id
+        except Exception as e:
+            logger.warning(f"Saved voice {voice_id} unavailable ({e}); selecting again")
+    
+    # Get all available voices
+    voices = tts_engine.getProperty('voices')
+    logger.info(f"Found {len(voices)} available voices")
+    
+    # Find and set an English voice
+    english_voice = None
+    for voice in voices:
+        logger.info(f"Voice: {voice.id} - {voice.name} - {voice.languages}")
+        # Look for English voices (common patterns)
+        if any(lang in str(voice.languages).lower() for lang in ['en', 'eng', 'english', 'en_us', 'en_gb']):
+            english_voice = voice
+            logger.info(f"Selected English voice: {voice.name}")
+            break
+        # Also check voice name for English indicators
+        elif any(indicator in voice.name.lower() for indicator in ['english', 'en_', 'us', 'gb', 'uk']):
+            english_voice = voice
+            logger.info(f"Selected English voice by name: {voice.name}")
+            break
+    
+    if english_voice:
+        tts_engine.setProperty('voice', english_voice.id)
+        logger.info(f"Set voice to: {english_voice.name}")
+    else:
+        # If no English voice found, use first available voice
+        if voices:
+            tts_engine.setProperty('voice', voices[0].id)
+            logger.warning(f"No English voice found. Using default: {voices[0].name}")
+        else:
+            logger.error("No voices available!")
+    
+    # Configure speech properties
+    tts_engine.setProperty('rate', 170)  # Slightly faster for natural English
+    tts_engine.setProperty('volume', 0.9)
+    return tts_engine.getProperty('voice')
+
+def load_audio_profile(path=None):
+    """Voice id and microphone energy threshold saved by an earlier run"""
+    try:
+        with open(path or Config.AUDIO_PROFILE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+class FileAudioSource(sr.AudioSource):
+    """Microphone stand-in that plays a mono WAV file into the recognizer
+    
+    Chunks are served at the file's real-time rate (unless realtime is
+    False), followed by trailing_silence seconds of silence; after that
+    reads return b"" like a closed stream.
+    """
+    
+    def __init__(self, path, chunk_size=1024, realtime=True, trailing_silence=1.0):
+        self.path = path
+        self.CHUNK = chunk_size
+        self.realtime = realtime
+        self.trailing_silence = trailing_silence
+        self.SAMPLE_RATE = None
+        self.SAMPLE_WIDTH = None
+        self.stream = None
+        self.wav = None
+    
+    def __enter__(self):
+        self.wav = wave.open(self.path, 'rb')
+        if self.wav.getnchannels() != 1:
+            self.wav.close()
+            raise ValueError(f"{self.path}: only mono WAV files can stand in for the microphone")
+        self.SAMPLE_RATE = self.wav.getframerate()
+        self.SAMPLE_WIDTH = self.wav.getsampwidth()
+        self.silence_frames = int(self.trailing_silence * self.SAMPLE_RATE)
+        self.started = time.monotonic()
+        self.frames_read = 0
+        self.stream = self
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.wav.close()
+        self.stream = None
+    
+    def read(self, size):
+        """Next size frames: the file, then trailing silence, then b'' for end of stream"""
+        data = self.wav.readframes(size)
+        if len(data) < size * self.SAMPLE_WIDTH:
+            padding = min(size - len(data) // self.SAMPLE_WIDTH, self.silence_frames)
+            self.silence_frames -= padding
+            data += b"\0" * (padding * self.SAMPLE_WIDTH)
+        self.frames_read += len(data) // self.SAMPLE_WIDTH
+        if self.realtime and data:
+            delay = self.started + self.frames_read / self.SAMPLE_RATE - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return data
+
+class AudioPipeline:
+    """Continuous capture thread that segments phrases and handles barge-in
+    
+    Reads the source chunk by chunk, detects speech with the VAD (or by
+    energy against the recognizer's threshold when it is unavailable) and
+    queues each phrase as AudioData for recognition. While the TTS worker
+    is talking the threshold is raised by BARGE_IN_THRESHOLD_RATIO (so our
+    own voice leaking into the mic is ignored); speech that still lasts
+    BARGE_IN_MIN_SECONDS interrupts it.
+    """
+    
+    def __init__(self, source, recognizer, tts=None, phrase_time_limit=None):
+        self.source = source
+        self.recognizer = recognizer
+        self.tts = tts
+        self.phrase_time_limit = phrase_time_limit or Config.PHRASE_TIME_LIMIT
+        self.phrases = queue.Queue(maxsize=Config.AUDIO_PHRASE_QUEUE_SIZE)
+        self.running = False
+        self.thread = None
+        self.stats = {"phrases": 0, "barge_ins": 0, "dropped": 0}
+    
+    def start(self):
+        """Open the source and start capturing"""
+        self.source.__enter__()
+        self.running = True
+        self.thread = threading.Thread(target=self._capture, name='audio-capture', daemon=True)
+        self.thread.start()
+        return self
+    
+    def next_phrase(self, timeout=None):
+        """The next captured phrase as AudioData, or None on timeout"""
+        try:
+            return self.phrases.get(timeout=timeout)
+        except queue.Empty:
+            return None
+    
+    def stop(self):
+        """Stop capturing and close the source (idempotent)"""
+        if not self.running:
+            return
+        self.running = False
+        if self.thread is not threading.current_thread():
+            self.thread.join()
+        self.source.__exit__(None, None, None)
+    
+    def _capture(self):
+        source = self.source
+        seconds_per_buffer = source.CHUNK / source.SAMPLE_RATE
+        vad = create_vad(source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+        # The VAD applies its own onset and hangover
+        pause_threshold = seconds_per_buffer if vad else self.recognizer.pause_threshold
+        # Keep a little audio from before the onset so first syllables survive
+        preroll = deque(maxlen=max(1, int(self.recognizer.non_speaking_duration / seconds_per_buffer)))
+        frames = []
+        voiced = 0.0
+        silence = 0.0
+        
+        while self.running:
+            buffer = source.stream.read(source.CHUNK)
+            if not buffer:
+                break
+            energy = rms(buffer, source.SAMPLE_WIDTH)
+            talking = self.tts is not None and self.tts.is_speaking
+            threshold = self.recognizer.energy_threshold
+            if talking:
+                threshold *= Config.BARGE_IN_THRESHOLD_RATIO
+            is_speech = energy > threshold
+            if vad is not None:
+                vad.update(buffer)
+                # Barge-in still needs the raised energy gate against our own voice
+                is_speech = vad.in_speech and (is_speech or not talking)
+            
+            if not frames:
+                preroll.append(buffer)
+                voiced = voiced + seconds_per_buffer if is_speech else 0.0
+                if talking:
+                    onset = Config.BARGE_IN_MIN_SECONDS
+                else:
+                    onset = seconds_per_buffer if vad else Config.ENERGY_MIN_SPEECH_SECONDS
+                if voiced >= onset:
+                    frames = list(preroll)
+                    silence = 0.0
+                    if talking:
+                        self.stats["barge_ins"] += 1
+                        logger.info("Barge-in: user started speaking, interrupting speech")
+                        self.tts.interrupt()
+                elif not is_speech and not talking and self.recognizer.dynamic_energy_threshold:
+                    # Track ambient noise the way Recognizer.listen does
+                    damping = self.recognizer.dynamic_energy_adjustment_damping ** seconds_per_buffer
+                    target = energy * self.recognizer.dynamic_energy_ratio
+                    self.recognizer.energy_threshold = self.recognizer.energy_threshold * damping + target * (1 - damping)
+                continue
+            
+            frames.append(buffer)
+            silence = 0.0 if is_speech else silence + seconds_per_buffer
+            if silence >= pause_threshold or len(frames) * seconds_per_buffer >= self.phrase_time_limit:
+                self._emit(b"".join(frames))
+                frames = []
+                preroll.clear()
+                voiced = 0.0
+        
+        if frames:
+            self._emit(b"".join(frames))
+    
+    def _emit(self, data):
+        audio = sr.AudioData(data, self.source.SAMPLE_RATE, self.source.SAMPLE_WIDTH)
+        self.stats["phrases"] += 1
+        try:
+            self.phrases.put_nowait(audio)
+        except queue.Full:
+            # Nobody is listening; the oldest phrase is the least relevant
+            self.stats["dropped"] += 1
+            self.phrases.get_nowait()
+            self.phrases.put_nowait(audio)
+
 class SpeechEngine:
-    def __init__(self):
+    def __init__(self, source=None, full_duplex=None, fast_start=None):
+        """source replaces the microphone (e.g. a FileAudioSource); full_duplex
+        and fast_start default to Config.FULL_DUPLEX_AUDIO and Config.FAST_START
+        
+        With fast start the TTS engine is created on its worker thread, so
+        construction returns immediately. A saved energy threshold is used
+        as is and kept current by the recognizer's dynamic threshold while
+        listening (and saved again on shutdown); without one the microphone
+        is calibrated in the background and the first listen() waits for it.
+        """
         self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
-        self.tts_engine = pyttsx3.init()
-        self.is_speaking = False
-        self.setup_english_audio()
+        self.microphone = source or sr.Microphone()
+        self.full_duplex = full_duplex if full_duplex is not None else Config.FULL_DUPLEX_AUDIO
+        self.fast_start = fast_start if fast_start is not None else Config.FAST_START
+        self.profile = load_audio_profile()
+        self.profile_lock = threading.Lock()
+        self.pipeline = None
+        self.calibration = None
+        self.closed = False
+        # Called once when the first listen() starts capturing
+        self.on_listening = None
+        
+        if self.fast_start:
+            self.tts = TTSWorker(factory=self.create_tts)
+            saved_threshold = self.profile.get('energy_threshold')
+            if saved_threshold:
+                self.recognizer.energy_threshold = saved_threshold
+            self.calibration = threading.Thread(
+                target=self.prepare_microphone, args=(not saved_threshold,), name='calibration', daemon=True
+            )
+            self.calibration.start()
+        else:
+            # Only the worker thread speaks with the engine
+            self.tts = TTSWorker(pyttsx3.init(), cache=create_tts_cache(STATIC_PHRASES))
+            self.setup_english_audio()
+            if self.full_duplex:
+                self.start_pipeline()
         logger.info("Speech engine initialized")
     
+    @property
+    def tts_engine(self):
+        """The pyttsx3 engine (waits for it under fast start)"""
+        return self.tts.get_engine()
+    
+    @property
+    def is_speaking(self):
+        """Whether speech is playing or queued"""
+        return self.tts.is_speaking
+    
+    @property
+    def tts_cache(self):
+        """The rendered speech cache, or None"""
+        return self.tts.cache
+    
+    @property
+    def interruptions(self):
+        """How many times speech was interrupted (by barge-in or a new command)"""
+        return self.tts.interruptions
+    
+    def create_tts(self):
+        """Create the TTS engine with the saved voice, and the speech cache (on the TTS worker)"""
+        engine = pyttsx3.init()
+        self.save_profile(voice_id=configure_english_voice(engine, self.profile.get('voice_id')))
+        return engine, create_tts_cache(STATIC_PHRASES)
+    
+    def save_profile(self, **values):
+        """Merge values into the saved audio profile"""
+        with self.profile_lock:
+            self.profile.update(values)
+            try:
+                os.makedirs(os.path.dirname(Config.AUDIO_PROFILE_FILE) or '.', exist_ok=True)
+                write_json_atomic(Config.AUDIO_PROFILE_FILE, self.profile, indent=2)
+            except OSError as e:
+                logger.warning(f"Could not save audio profile: {e}")
+    
+    def calibrate_microphone(self):
+        """Measure ambient noise and remember the resulting energy threshold"""
+        logger.info("Adjusting microphone for ambient noise...")
+        with self.microphone as source:
+            self.recognizer.adjust_for_ambient_noise(source, duration=1)
+        self.save_profile(energy_threshold=self.recognizer.energy_threshold)
+        logger.info(f"Microphone setup complete (energy threshold {self.recognizer.energy_threshold:.0f})")
+    
+    def prepare_microphone(self, calibrate=True):
+        """Background calibration (if needed), then the capture pipeline when full duplex"""
+        if calibrate:
+            try:
+                self.calibrate_microphone()
+            except Exception as e:
+                logger.error(f"Microphone calibration error: {e}")
+        if self.full_duplex and not self.closed:
+            self.start_pipeline()
+    
+    def start_pipeline(self):
+        self.pipeline = AudioPipeline(self.microphone, self.recognizer, self.tts).start()
+    
+    def wait_for_microphone(self):
+        """Block until background calibration (and pipeline start) has finished"""
+        if self.calibration is not None:
+            self.calibration.join()
+            self.calibration = None
+    
     def setup_english_audio(self):
         """Setup audio systems with English voice"""
         try:
-            # Get all available voices
-            voices = self.tts_engine.getProperty('voices')
-            logger.info(f"Found {len(voices)} available voices")
-            
-            # Find and set an English voice
-            english_voice = None
-            for voice in voices:
-                logger.info(f"Voice: {voice.id} - {voice.name} - {voice.languages}")
-                # Look for English voices (common patterns)
-                if any(lang in str(voice.languages).lower() for lang in ['en', 'eng', 'english', 'en_us', 'en_gb']):
-                    english_voice = voice
-                    logger.info(f"Selected English voice: {voice.name}")
-                    break
-                # Also check voice name for English indicators
-                elif any(indicator in voice.name.lower() for indicator in ['english', 'en_', 'us', 'gb', 'uk']):
-                    english_voice = voice
-                    logger.info(f"Selected English voice by name: {voice.name}")
-                    break
-            
-            if english_voice:
-                self.tts_engine.setProperty('voice', english_voice.id)
-                logger.info(f"Set voice to: {english_voice.name}")
-            else:
-                # If no English voice found, use first available voice
-                if voices:
-                    self.tts_engine.setProperty('voice', voices[0].id)
-                    logger.warning(f"No English voice found. Using default: {voices[0].name}")
-                else:
-                    logger.error("No voices available!")
-            
-            # Configure speech properties
-            self.tts_engine.setProperty('rate', 170)  # Slightly faster for natural English
-            self.tts_engine.setProperty('volume', 0.9)
+            self.save_profile(voice_id=configure_english_voice(self.tts_engine))
             
             # Test the voice
             logger.info("Testing English voice...")
             
             # Setup microphone for ambient noise
-            logger.info("Adjusting microphone for ambient noise...")
-            with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
-            logger.info("Microphone setup complete")
+            self.calibrate_microphone()
             
         except Exception as e:
             logger.error(f"Audio setup error: {e}")
@@ -71,35 +364,38 @@ class SpeechEngine:
             except:
                 pass
     
-    def speak(self, text, wait=True):
-        """Convert text to speech with English pronunciation"""
-        def _speak():
-            self.is_speaking = True
-            try:
-                logger.info(f"JARVIS: {text}")
-                
-                # Pre-process text for better English pronunciation
-                processed_text = self.preprocess_text(text)
-                
-                self.tts_engine.say(processed_text)
-                if wait:
-                    self.tts_engine.runAndWait()
-            except Exception as e:
-                logger.error(f"Speech error: {e}")
-                # Fallback: print to console
-                print(f"JARVIS (Text): {text}")
-            finally:
-                self.is_speaking = False
+    def speak(self, text, wait=True, priority=NORMAL):
+        """Convert text to speech with English pronunciation
         
+        The text is queued on the TTS worker; with wait the call returns
+        once everything queued so far has been spoken.
+        """
         print(f"🤖 JARVIS: {text}")
+        logger.info(f"JARVIS: {text}")
         
-        if wait:
-            _speak()
-        else:
-            # Non-blocking speech
-            thread = threading.Thread(target=_speak)
-            thread.daemon = True
-            thread.start()
+        # Pre-process text for better English pronunciation
+        if not self.tts.say(self.preprocess_text(text), priority):
+            print(f"JARVIS (Text): {text}")
+        elif wait:
+            self.tts.wait()
+    
+    def interrupt(self):
+        """Stop speaking and drop anything still queued"""
+        self.tts.interrupt()
+    
+    def wait_until_done(self, timeout=None):
+        """Block until queued speech has finished playing"""
+        return self.tts.wait(timeout)
+    
+    def shutdown(self):
+        """Stop capturing, finish queued speech and stop the TTS worker (idempotent)"""
+        self.closed = True
+        self.wait_for_microphone()
+        if self.pipeline is not None:
+            self.pipeline.stop()
+        # Start the next session from the threshold we adapted to
+        self.save_profile(energy_threshold=self.recognizer.energy_threshold)
+        self.tts.shutdown()
     
     def preprocess_text(self, text):
         """Preprocess text for better English pronunciation"""
@@ -120,17 +416,37 @@ class SpeechEngine:
         
         return processed
     
+    def notify_listening(self):
+        if self.on_listening is not None:
+            callback, self.on_listening = self.on_listening, None
+            callback()
+    
     def listen(self, timeout=5, phrase_time_limit=10):
         """Listen for voice command with timeout"""
+        self.wait_for_microphone()
         try:
-            with self.microphone as source:
+            if self.pipeline is not None:
+                # Capture never stops; take the next phrase it segmented
                 logger.info("Listening...")
                 print("🎤 Listening...")
-                audio = self.recognizer.listen(
-                    source, 
-                    timeout=timeout,
-                    phrase_time_limit=phrase_time_limit
-                )
+                self.notify_listening()
+                audio = self.pipeline.next_phrase(timeout)
+                if audio is None:
+                    raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+            else:
+                with self.microphone as source:
+                    logger.info("Listening...")
+                    print("🎤 Listening...")
+                    self.notify_listening()
+                    vad = create_vad(source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+                    if vad is not None:
+                        audio = self.capture_phrase(source, vad, timeout, phrase_time_limit)
+                    else:
+                        audio = self.recognizer.listen(
+                            source, 
+                            timeout=timeout,
+                            phrase_time_limit=phrase_time_limit
+                        )
             
             # Use English language for recognition
             command = self.recognizer.recognize_google(audio, language='en-US').lower()
@@ -143,16 +459,50 @@ class SpeechEngine:
             return ""
         except sr.UnknownValueError:
             logger.warning("Speech recognition could not understand audio")
-            self.speak("Sorry, I didn't catch that. Could you repeat?")
+            self.speak(NOT_UNDERSTOOD_PROMPT, priority=URGENT)
             return ""
         except sr.RequestError as e:
             logger.error(f"Speech recognition error: {e}")
-            self.speak("There seems to be a problem with speech recognition.")
+            self.speak(RECOGNITION_ERROR_PROMPT, priority=URGENT)
             return ""
         except Exception as e:
             logger.error(f"Unexpected error in listen: {e}")
             return ""
     
+    def capture_phrase(self, source, vad, timeout=None, phrase_time_limit=None):
+        """Record one phrase from an open source, segmented by the VAD
+        
+        Works like Recognizer.listen, but the phrase ends after the VAD's
+        hangover instead of pause_threshold, and audio in which the VAD
+        hears no speech is never returned for recognition.
+        """
+        seconds_per_buffer = source.CHUNK / source.SAMPLE_RATE
+        preroll = deque(maxlen=max(1, int(self.recognizer.non_speaking_duration / seconds_per_buffer)))
+        frames = []
+        waited = 0.0
+        
+        while True:
+            buffer = source.stream.read(source.CHUNK)
+            if not buffer:
+                break
+            vad.update(buffer)
+            if frames:
+                frames.append(buffer)
+                if not vad.in_speech or (phrase_time_limit and len(frames) * seconds_per_buffer >= phrase_time_limit):
+                    break
+                continue
+            
+            preroll.append(buffer)
+            waited += seconds_per_buffer
+            if vad.in_speech:
+                frames = list(preroll)
+            elif timeout and waited > timeout:
+                break
+        
+        if not frames:
+            raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+        return sr.AudioData(b"".join(frames), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+    
     def test_voice(self):
         """Test the current voice configuration"""
         test_phrases = [
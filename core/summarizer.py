@@ -0,0 +1,112 @@
+import hashlib
+import re
+from collections import Counter
+from config.api_keys import Config
+
+STOPWORDS = set("""
+a an and are as at be but by can could did do does for from had has have how i if in into is it its
+just me my no not of on or our so than that the their them then there these they this to was we were
+what when where which who why will with would you your yes ok okay please thanks thank user assistant
+""".split())
+
+class ExtractiveSummarizer:
+    """Offline summarizer that keeps the highest-scoring sentences"""
+
+    def summarize(self, text, max_sentences=3, max_chars=600):
+        """Pick the most representative sentences, kept in original order"""
+        sentences = []
+        seen = set()
+        for sentence in re.split(r'(?<=[.!?])\s+|\n+', text):
+            sentence = sentence.strip()
+            if sentence and sentence.lower() not in seen:
+                seen.add(sentence.lower())
+                sentences.append(sentence)
+        if len(sentences) <= max_sentences:
+            return self._clip(" ".join(sentences), max_chars)
+
+        tokenized = [
+            [w for w in re.findall(r'\w+', sentence.lower()) if w not in STOPWORDS]
+            for sentence in sentences
+        ]
+        frequencies = Counter(word for words in tokenized for word in words)
+
+        def score(index):
+            words = tokenized[index]
+            if not words:
+                return 0.0
+            return sum(frequencies[w] for w in set(words)) / (len(words) ** 0.5)
+
+        best = sorted(range(len(sentences)), key=score, reverse=True)[:max_sentences]
+        return self._clip(" ".join(sentences[i] for i in sorted(best)), max_chars)
+
+    def _clip(self, text, max_chars):
+        if len(text) <= max_chars:
+            return text
+        return text[:max_chars].rsplit(' ', 1)[0] + "..."
+
+def source_hash(text):
+    """Hash segment source text so summaries are only recomputed when it changes"""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+class RollingSummary:
+    """Fold old conversation turns into a bounded list of summarized segments
+
+    Segments are plain dicts stored in memory["conversation_summaries"]:
+    start/end timestamps, turn count, source text and hash, the summary and
+    which method produced it ("extractive" offline or "ai" once refreshed).
+    """
+
+    def __init__(self, segments, summarizer=None):
+        self.segments = segments
+        self.summarizer = summarizer or ExtractiveSummarizer()
+
+    def fold(self, turns):
+        """Summarize (timestamp, user, assistant) turns into a new segment"""
+        if not turns:
+            return None
+        source = "\n".join(f"User: {user}\nAssistant: {assistant}" for _, user, assistant in turns)
+        segment = self._make_segment(turns[0][0], turns[-1][0], len(turns), source)
+        self.segments.append(segment)
+
+        while len(self.segments) > Config.SUMMARY_MAX_SEGMENTS:
+            self._merge_oldest()
+        return segment
+
+    def _make_segment(self, start, end, turns, source):
+        return {
+            "start": start,
+            "end": end,
+            "turns": turns,
+            "source": source,
+            "source_hash": source_hash(source),
+            "summary": self.summarizer.summarize(source, Config.SUMMARY_SENTENCES),
+            "method": "extractive"
+        }
+
+    def _merge_oldest(self):
+        """Collapse the two oldest segments into one summary of their summaries"""
+        first, second = self.segments[0], self.segments[1]
+        source = f"{first['summary']}\n{second['summary']}"
+        self.segments[0:2] = [self._make_segment(
+            first["start"], second["end"], first["turns"] + second["turns"], source
+        )]
+
+    def pending_refresh(self):
+        """Segments whose summary was not produced by the AI for their current source"""
+        return [s for s in self.segments if s["method"] != "ai"]
+
+    def apply_summary(self, hash_value, summary, method="ai"):
+        """Store an externally produced summary for the segment with this source"""
+        for segment in self.segments:
+            if segment["source_hash"] == hash_value:
+                segment["summary"] = summary
+                segment["method"] = method
+                return True
+        return False
+
+    def render(self):
+        """Summaries oldest first, one line per segment"""
+        return [
+            f"Earlier ({segment['start'][:10]}, {segment['turns']} turns): {segment['summary']}"
+            for segment in self.segments
+        ]
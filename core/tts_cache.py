@@ -0,0 +1,235 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import wave
+from collections import OrderedDict
+from config.api_keys import Config
+from utils.logger import setup_logger
+
+try:
+    import pyaudio
+except ImportError:
+    pyaudio = None
+
+logger = setup_logger('tts_cache')
+
+PLAYBACK_CHUNK = 1024
+
+def voice_settings(engine):
+    """(voice id, rate, volume) of a pyttsx3 engine, part of every cache key"""
+    return (engine.getProperty('voice'), engine.getProperty('rate'), engine.getProperty('volume'))
+
+def normalize_phrase(text):
+    """Collapse whitespace so a phrase keys the same however it was formatted"""
+    return ' '.join(text.split())
+
+class TTSCache:
+    """Content-addressed cache of rendered speech
+
+    Each phrase is rendered once with pyttsx3's save_to_file into
+    <directory>/<sha256 of text, voice, rate, volume>.wav and afterwards
+    played straight from disk. Static phrases are rendered the first time
+    they are spoken, other short phrases the second time. Files are
+    evicted least recently played first once the directory grows past
+    max_bytes. Used from the TTS worker thread only.
+    """
+
+    def __init__(self, directory=None, max_bytes=None, static_phrases=()):
+        self.directory = directory or Config.TTS_CACHE_DIR
+        self.max_bytes = max_bytes or Config.TTS_CACHE_MAX_BYTES
+        self.static = {normalize_phrase(phrase) for phrase in static_phrases}
+        self.seen = OrderedDict()
+        # Phrases whose rendering couldn't be played; they are always spoken live
+        self.unplayable = set()
+        self.stats = {"hits": 0, "misses": 0, "rendered": 0, "evicted": 0}
+        os.makedirs(self.directory, exist_ok=True)
+
+        # key -> size, least recently played first (file mtime is the recency)
+        self.index = OrderedDict()
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith('.tmp.wav'):
+                os.unlink(path)
+            elif name.endswith('.wav'):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self.index[key] = size
+        self.total_bytes = sum(self.index.values())
+
+        self.player = pyaudio.PyAudio()
+
+    def key(self, text, settings):
+        parts = [normalize_phrase(text)] + [str(value) for value in settings]
+        return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.wav")
+
+    def get(self, text, settings):
+        """Path of the rendered phrase, or None"""
+        key = self.key(text, settings)
+        if key not in self.index:
+            self.stats["misses"] += 1
+            return None
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            # Deleted behind our back
+            self.total_bytes -= self.index.pop(key)
+            self.stats["misses"] += 1
+            return None
+        self.index.move_to_end(key)
+        self.stats["hits"] += 1
+        return path
+
+    def should_render(self, text, settings):
+        """Whether a phrase just spoken is worth rendering for next time"""
+        phrase = normalize_phrase(text)
+        key = self.key(phrase, settings)
+        if key in self.unplayable:
+            return False
+        if phrase in self.static:
+            return True
+        if len(phrase) > Config.TTS_CACHE_MAX_CHARS:
+            return False
+        if key in self.seen:
+            del self.seen[key]
+            return True
+        self.seen[key] = True
+        if len(self.seen) > 1024:
+            self.seen.popitem(last=False)
+        return False
+
+    def render(self, engine, text, settings):
+        """Render text to the cache with the engine; returns the path or None"""
+        key = self.key(text, settings)
+        path = self.path(key)
+        temp_path = f"{path[:-4]}.tmp.wav"
+        try:
+            engine.save_to_file(text, temp_path)
+            engine.runAndWait()
+            size = os.path.getsize(temp_path)
+            if not size:
+                raise OSError("engine wrote an empty file")
+            # Some drivers (macOS) write AIFF whatever the extension says
+            with wave.open(temp_path, 'rb'):
+                pass
+            os.replace(temp_path, path)
+        except Exception as e:
+            logger.error(f"Could not render speech to cache: {e}")
+            self.unplayable.add(key)
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            return None
+
+        self.total_bytes += size - self.index.pop(key, 0)
+        self.index[key] = size
+        self.stats["rendered"] += 1
+        self.evict()
+        return path
+
+    def discard(self, text, settings):
+        """Drop a phrase whose file can't be played, and stop caching it"""
+        key = self.key(text, settings)
+        self.unplayable.add(key)
+        size = self.index.pop(key, None)
+        if size is None:
+            return
+        self.total_bytes -= size
+        self.stats["evicted"] += 1
+        try:
+            os.unlink(self.path(key))
+        except OSError:
+            pass
+
+    def evict(self):
+        """Delete least recently played files until under max_bytes"""
+        while self.total_bytes > self.max_bytes and len(self.index) > 1:
+            key, size = self.index.popitem(last=False)
+            self.total_bytes -= size
+            self.stats["evicted"] += 1
+            try:
+                os.unlink(self.path(key))
+            except OSError:
+                pass
+
+    def play(self, path, stop_event):
+        """Play a rendered phrase, stopping early when stop_event is set"""
+        with wave.open(path, 'rb') as wav:
+            stream = self.player.open(
+                format=self.player.get_format_from_width(wav.getsampwidth()),
+                channels=wav.getnchannels(),
+                rate=wav.getframerate(),
+                output=True
+            )
+            try:
+                data = wav.readframes(PLAYBACK_CHUNK)
+                while data and not stop_event.is_set():
+                    stream.write(data)
+                    data = wav.readframes(PLAYBACK_CHUNK)
+            finally:
+                stream.stop_stream()
+                stream.close()
+
+    def warm_up(self, engine, phrases):
+        """Render any of phrases not cached yet for the engine's current voice"""
+        settings = voice_settings(engine)
+        rendered = 0
+        for phrase in phrases:
+            phrase = normalize_phrase(phrase)
+            if self.key(phrase, settings) not in self.index and self.render(engine, phrase, settings):
+                rendered += 1
+        return rendered
+
+    def format_stats(self):
+        """One-line summary for the status command"""
+        return (
+            f"{len(self.index)} phrases ({self.total_bytes / 1024 / 1024:.1f} MB), "
+            f"{self.stats['hits']} hits, {self.stats['misses']} misses, {self.stats['rendered']} rendered"
+        )
+
+    def close(self):
+        self.player.terminate()
+
+def create_tts_cache(static_phrases=()):
+    """Create the TTS cache if enabled and audio playback is available"""
+    if not Config.TTS_CACHE:
+        return None
+    if pyaudio is None:
+        logger.warning("PyAudio not installed; speech will not be cached")
+        return None
+    try:
+        return TTSCache(static_phrases=static_phrases)
+    except Exception as e:
+        logger.error(f"Could not open TTS cache: {e}")
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the rendered speech cache")
+    parser.add_argument('--warm-up', action='store_true', help='pre-render every static phrase')
+    args = parser.parse_args()
+
+    import pyttsx3
+    from config.phrases import STATIC_PHRASES
+    from core.speech_engine import configure_english_voice
+
+    cache = create_tts_cache(STATIC_PHRASES)
+    if cache is None:
+        print("TTS cache is disabled or unavailable")
+        return 1
+    if args.warm_up:
+        engine = pyttsx3.init()
+        configure_english_voice(engine)
+        print(f"Rendered {cache.warm_up(engine, STATIC_PHRASES)} phrases")
+    print(f"TTS cache: {cache.format_stats()}")
+    cache.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
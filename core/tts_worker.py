@@ -0,0 +1,153 @@
+import heapq
+import itertools
+import threading
+from config.api_keys import Config
+from core.tts_cache import voice_settings
+from utils.logger import setup_logger
+
+logger = setup_logger('tts_worker')
+
+URGENT = 0
+NORMAL = 1
+
+class TTSWorker:
+    """Long-lived thread that owns a pyttsx3 engine and speaks queued utterances
+
+    Utterances are spoken in priority order (URGENT before NORMAL, FIFO
+    within a priority) from a queue holding at most max_queue items;
+    enqueueing into a full queue blocks until there is room. interrupt()
+    drops everything queued and cuts off the current utterance. With a
+    TTSCache, phrases already rendered are played from disk. Without an
+    engine, factory() is called on the worker thread to create the
+    (engine, cache) pair, so startup doesn't wait for it.
+    """
+
+    def __init__(self, engine=None, max_queue=None, cache=None, factory=None):
+        self.engine = engine
+        self.cache = cache
+        self.factory = factory
+        self.ready = threading.Event()
+        if engine is not None:
+            self.ready.set()
+        self.stop_playback = threading.Event()
+        self.max_queue = max_queue or Config.TTS_QUEUE_SIZE
+        self.queue = []
+        self.sequence = itertools.count()
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.speaking = False
+        self.closed = False
+        # Bumped by every interrupt(), so producers can tell they were cut off
+        self.interruptions = 0
+        self.thread = threading.Thread(target=self._run, name='tts', daemon=True)
+        self.thread.start()
+
+    @property
+    def is_speaking(self):
+        """Whether an utterance is playing or waiting to play"""
+        with self.lock:
+            return self.speaking or bool(self.queue)
+
+    def get_engine(self, timeout=None):
+        """The engine, once the worker has created it (None if that failed)"""
+        self.ready.wait(timeout)
+        return self.engine
+
+    def say(self, text, priority=NORMAL):
+        """Queue text to be spoken; returns False once the worker is shut down"""
+        with self.changed:
+            while len(self.queue) >= self.max_queue and not self.closed:
+                self.changed.wait()
+            if self.closed:
+                return False
+            heapq.heappush(self.queue, (priority, next(self.sequence), text))
+            self.changed.notify_all()
+        return True
+
+    def interrupt(self):
+        """Drop queued utterances and stop the one playing"""
+        with self.changed:
+            dropped = len(self.queue)
+            self.queue.clear()
+            self.interruptions += 1
+            speaking = self.speaking
+            self.stop_playback.set()
+            self.changed.notify_all()
+        if speaking and self.engine is not None:
+            try:
+                self.engine.stop()
+            except Exception as e:
+                logger.error(f"TTS stop error: {e}")
+        if dropped or speaking:
+            logger.info(f"Speech interrupted ({dropped} queued utterances dropped)")
+
+    def wait(self, timeout=None):
+        """Block until everything queued has been spoken; False on timeout"""
+        with self.changed:
+            return self.changed.wait_for(lambda: not self.queue and not self.speaking, timeout)
+
+    def shutdown(self, drain=True, timeout=None):
+        """Stop the worker, first finishing queued speech if drain; safe to call twice"""
+        if drain:
+            self.wait(timeout)
+        else:
+            self.interrupt()
+        with self.changed:
+            self.closed = True
+            self.changed.notify_all()
+        if self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+        if self.cache is not None and not self.thread.is_alive():
+            self.cache.close()
+            self.cache = None
+
+    def _start_engine(self):
+        try:
+            self.engine, self.cache = self.factory()
+        except Exception as e:
+            logger.error(f"TTS engine error: {e}")
+        finally:
+            self.ready.set()
+
+    def _run(self):
+        if self.engine is None:
+            self._start_engine()
+        while True:
+            with self.changed:
+                while not self.queue and not self.closed:
+                    self.changed.wait()
+                if not self.queue:
+                    return
+                _, _, text = heapq.heappop(self.queue)
+                self.speaking = True
+                self.stop_playback.clear()
+                # A blocked say() may have room now
+                self.changed.notify_all()
+            render = False
+            try:
+                settings = voice_settings(self.engine) if self.cache is not None else None
+                path = self.cache.get(text, settings) if settings else None
+                if path:
+                    try:
+                        self.cache.play(path, self.stop_playback)
+                    except Exception as e:
+                        # Not a playable WAV (or truncated): speak it live instead
+                        logger.warning(f"Cached speech unplayable, evicting it: {e}")
+                        self.cache.discard(text, settings)
+                        path = None
+                        if self.stop_playback.is_set():
+                            continue
+                if not path:
+                    self.engine.say(text)
+                    self.engine.runAndWait()
+                    render = settings is not None and self.cache.should_render(text, settings)
+            except Exception as e:
+                logger.error(f"Speech error: {e}")
+                print(f"JARVIS (Text): {text}")
+            finally:
+                with self.changed:
+                    self.speaking = False
+                    self.changed.notify_all()
+            if render:
+                # Silent, so it doesn't count as speaking for barge-in
+                self.cache.render(self.engine, text, settings)
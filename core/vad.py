@@ -0,0 +1,158 @@
+import math
+from array import array
+from config.api_keys import Config
+from utils.logger import setup_logger
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = setup_logger('vad')
+
+# Per aggressiveness level: dB over the noise floor a frame needs, the
+# zero-crossing rate above which a quiet frame counts as noise, how many
+# speech frames start a segment and how long silence must last to end it
+AGGRESSIVENESS_PROFILES = {
+    0: {"margin_db": 6.0, "zcr_max": 0.40, "onset_frames": 2, "hangover_seconds": 0.50},
+    1: {"margin_db": 8.0, "zcr_max": 0.33, "onset_frames": 3, "hangover_seconds": 0.40},
+    2: {"margin_db": 10.0, "zcr_max": 0.27, "onset_frames": 4, "hangover_seconds": 0.30},
+    3: {"margin_db": 13.0, "zcr_max": 0.22, "onset_frames": 6, "hangover_seconds": 0.24},
+}
+
+SAMPLE_TYPES = {1: 'b', 2: 'h', 4: 'i'}
+
+def rms(pcm, sample_width=2):
+    """Root-mean-square amplitude of signed PCM, in sample units"""
+    if sample_width not in SAMPLE_TYPES:
+        raise ValueError(f"Unsupported sample width: {sample_width}")
+    usable = len(pcm) - len(pcm) % sample_width
+    if not usable:
+        return 0
+    if np is not None:
+        samples = np.frombuffer(pcm[:usable], dtype=f'i{sample_width}').astype(np.float64)
+        return int(math.sqrt(np.dot(samples, samples) / len(samples)))
+    samples = array(SAMPLE_TYPES[sample_width], pcm[:usable])
+    return int(math.sqrt(sum(sample * sample for sample in samples) / len(samples)))
+
+def frame_features(samples, frame_length):
+    """Per-frame energy (dBFS) and zero-crossing rate of int16 samples"""
+    count = len(samples) // frame_length
+    frames = samples[:count * frame_length].reshape(count, frame_length).astype(np.float32) / 32768.0
+    energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / float(frame_length - 1)
+    return energy_db, zcr
+
+class VoiceActivityDetector:
+    """Streaming voice activity detector over 16-bit mono PCM
+
+    Audio is cut into frame_ms frames. A frame is speech when its energy
+    is margin_db over the tracked noise floor and its zero-crossing rate
+    is speech-like (or it is twice as loud, which covers fricatives).
+    onset_frames speech frames in a row start a segment; hangover_seconds
+    of non-speech end it. update() feeds chunks of any size and reports
+    the segment boundaries it crossed.
+    """
+
+    def __init__(self, sample_rate, sample_width=2, aggressiveness=None, frame_ms=None):
+        if sample_width != 2:
+            raise ValueError("VAD needs 16-bit audio")
+        if aggressiveness is None:
+            aggressiveness = Config.VAD_AGGRESSIVENESS
+        profile = AGGRESSIVENESS_PROFILES[max(0, min(3, aggressiveness))]
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * (frame_ms or Config.VAD_FRAME_MS) / 1000)
+        self.frame_seconds = self.frame_length / sample_rate
+        self.margin_db = profile["margin_db"]
+        self.zcr_max = profile["zcr_max"]
+        self.onset_frames = profile["onset_frames"]
+        self.hangover_frames = max(1, int(round(profile["hangover_seconds"] / self.frame_seconds)))
+        self.hangover_seconds = self.hangover_frames * self.frame_seconds
+        self.reset()
+
+    def reset(self):
+        """Forget all state (noise floor included)"""
+        self.remainder = np.zeros(0, dtype=np.int16)
+        self.noise_db = None
+        self.frames_seen = 0
+        self.in_speech = False
+        self.run = 0
+        self.quiet = 0
+        self.segment_start = None
+
+    def classify(self, energy_db, zcr):
+        """Raw speech decision for one frame, updating the noise floor"""
+        if self.noise_db is None:
+            self.noise_db = energy_db
+        noise_db = max(self.noise_db, Config.VAD_NOISE_FLOOR_DB)
+        loud = energy_db > noise_db + self.margin_db
+        speech = loud and (zcr < self.zcr_max or energy_db > noise_db + 2 * self.margin_db)
+        if energy_db < self.noise_db:
+            # Drop quickly to quieter backgrounds
+            self.noise_db = 0.7 * self.noise_db + 0.3 * energy_db
+        elif not speech:
+            self.noise_db = 0.97 * self.noise_db + 0.03 * energy_db
+        return speech
+
+    def update(self, pcm):
+        """Feed PCM bytes; returns [('start'|'end', seconds into the stream)]"""
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        if len(self.remainder):
+            samples = np.concatenate((self.remainder, samples))
+        usable = len(samples) - len(samples) % self.frame_length
+        self.remainder = samples[usable:].copy()
+        if not usable:
+            return []
+
+        events = []
+        energy_db, zcr = frame_features(samples[:usable], self.frame_length)
+        for frame_energy, frame_zcr in zip(energy_db.tolist(), zcr.tolist()):
+            index = self.frames_seen
+            self.frames_seen += 1
+            speech = self.classify(frame_energy, frame_zcr)
+            if not self.in_speech:
+                self.run = self.run + 1 if speech else 0
+                if self.run >= self.onset_frames:
+                    self.in_speech = True
+                    self.quiet = 0
+                    self.segment_start = index - self.run + 1
+                    events.append(('start', self.segment_start * self.frame_seconds))
+            else:
+                self.quiet = 0 if speech else self.quiet + 1
+                if self.quiet >= self.hangover_frames:
+                    self.in_speech = False
+                    self.run = 0
+                    events.append(('end', self.frames_seen * self.frame_seconds))
+        return events
+
+    def segments(self, pcm):
+        """Speech (start, end) times in a complete recording, from a fresh state"""
+        self.reset()
+        segments = []
+        start = None
+        for kind, at in self.update(pcm):
+            if kind == 'start':
+                start = at
+            else:
+                segments.append((start, at))
+        if self.in_speech:
+            segments.append((start, self.frames_seen * self.frame_seconds))
+        return segments
+
+    def contains_speech(self, pcm):
+        """Whether a recording has any speech segment"""
+        return bool(self.segments(pcm))
+
+def create_vad(sample_rate, sample_width=2):
+    """Create a detector for the audio format if VAD is enabled and NumPy is installed"""
+    if not Config.VAD:
+        return None
+    if np is None:
+        logger.warning("NumPy not installed, using the recognizer's energy threshold")
+        return None
+    try:
+        return VoiceActivityDetector(sample_rate, sample_width)
+    except ValueError as e:
+        logger.warning(f"VAD unavailable: {e}")
+        return None
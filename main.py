@@ -2,6 +2,10 @@
 import os
 import sys
 import signal
+import threading
+import time
+import contextvars
+import concurrent.futures
 
 # Add current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -18,33 +22,71 @@ except ImportError:
         print("❌ No speech engine found. Creating basic fallback...")
         # Create a basic fallback speech engine
         class BasicSpeechEngine:
+            interruptions = 0
+            tts_cache = None
             def speak(self, text, wait=True):
                 print(f"🤖 JARVIS: {text}")
             def listen(self, timeout=5):
                 return input("👤 You (type your command): ").lower()
+            def interrupt(self):
+                pass
+            def wait_until_done(self, timeout=None):
+                return True
+            def shutdown(self):
+                pass
         SpeechEngine = BasicSpeechEngine
 
-from core.memory import MemorySystem
-from ai.deepseek_client import DeepSeekClient
+from core.memory import create_memory_system
+from core.memory_shards import MemoryShardManager, ShardedMemory, current_user
+from core.keyword_matcher import KeywordMatcher
+from core.intent_classifier import create_intent_classifier
+from ai.deepseek_client import DeepSeekClient, TIMEOUT_RESPONSE
+from ai.prompt_builder import PromptSection, turns_section, knowledge_section
+from utils.text_stream import SentenceSegmenter, on_complete
 from modules.programming_helper import ProgrammingHelper
 from modules.web_surf import WebSurfer
 from modules.friend_mode import FriendMode
 from modules.offline_coder import OfflineCoder
 from config.api_keys import Config
+from config.phrases import (
+    VOICE_TEST_PHRASES, WELCOME_GREETING, PROGRAMMING_ACKNOWLEDGEMENT, THANKS_RESPONSES,
+    EXIT_GOODBYE, SIGNAL_GOODBYE, INTERRUPT_GOODBYE
+)
+
+class ProgressiveAnswer:
+    """An answer to speak now and a pending AI answer to follow it"""
+    
+    def __init__(self, text, future, on_result=None):
+        self.text = text
+        self.future = future
+        self.on_result = on_result
 
 class JARVIS:
-    def __init__(self):
+    def __init__(self, speech=None, memory=None, ai=None, voice_test=None, handle_signals=True):
+        """Create the assistant; speech, memory and ai may be injected (e.g. for load tests)
+        
+        voice_test defaults to Config.VOICE_SELF_TEST.
+        """
+        self.started_at = time.perf_counter()
         print("🚀 Initializing JARVIS AI Assistant...")
         
         # Initialize core systems
-        self.speech = SpeechEngine()
-        self.memory = MemorySystem()
+        self.speech = speech or SpeechEngine()
+        self.speech_lock = threading.RLock()
+        if memory is not None:
+            self.memory = memory
+        elif Config.MEMORY_SHARDING:
+            # One memory shard per user; process_command picks the shard
+            self.memory = ShardedMemory(MemoryShardManager())
+        else:
+            self.memory = create_memory_system()
         
         # Test English voice on startup
-        self.test_english_voice()
+        if voice_test if voice_test is not None else Config.VOICE_SELF_TEST:
+            self.test_english_voice()
         
         # Initialize AI clients
-        self.ai = DeepSeekClient()
+        self.ai = ai or DeepSeekClient()
         self.offline_coder = OfflineCoder(self.memory)
         
         # Initialize modules
@@ -56,32 +98,48 @@ class JARVIS:
         self.online_mode = not Config.OFFLINE_MODE
         self.current_language = 'python'
         
+        # Command turns per user, so a new command supersedes pending follow-ups
+        self.turns = {}
+        self.pending_followups = {}
+        self.turns_lock = threading.Lock()
+        self.summary_thread = None
+        
         # Command keywords for intent classification
         self.setup_command_keywords()
-        
-        # User info
-        self.user_name = self.memory.memory["user_info"]["name"]
+        self.intent_classifier = create_intent_classifier()
         
         print("✅ JARVIS initialized successfully!")
         print(f"🌐 Online mode: {self.online_mode}")
         print(f"👤 User: {self.user_name if self.user_name else 'Not set'}")
         
         # Setup signal handlers for graceful shutdown
-        signal.signal(signal.SIGINT, self.signal_handler)
-        signal.signal(signal.SIGTERM, self.signal_handler)
+        if handle_signals:
+            signal.signal(signal.SIGINT, self.signal_handler)
+            signal.signal(signal.SIGTERM, self.signal_handler)
+    
+    @property
+    def user_name(self):
+        """Name of the user whose memory is active"""
+        return self.memory.get_user_name()
+    
+    def say(self, text):
+        """Queue text for speech without waiting for it to play
+        
+        Serialized so a follow-up answer's utterances stay together.
+        """
+        with self.speech_lock:
+            self.speech.speak(text, wait=False)
+    
+    def use_ai(self):
+        """Whether to answer with DeepSeek: online mode and the circuit isn't open"""
+        return self.online_mode and self.ai.available()
     
     def test_english_voice(self):
         """Test that the voice is working in English"""
         print("🔊 Testing English voice...")
-        test_phrases = [
-            "Hello! I am JARVIS, your AI assistant.",
-            "I am now speaking in clear English.",
-            "Ready to help with programming and more!"
-        ]
-        
-        for phrase in test_phrases:
+        for phrase in VOICE_TEST_PHRASES:
             print(f"Testing: {phrase}")
-            self.speech.speak(phrase)
+            self.say(phrase)
     
     def setup_command_keywords(self):
         """Setup command keywords for intent classification"""
@@ -107,52 +165,111 @@ class JARVIS:
             'offline', 'online', 'mode', 'switch', 'language', 'help', 'what can you do',
             'status', 'reset', 'clear', 'memory', 'settings'
         ]
+        
+        self.exit_keywords = ['exit', 'quit', 'goodbye', 'bye', 'stop', 'shutdown']
+        self.language_keywords = ['python', 'javascript', 'java', 'c++', 'cpp', 'c#']
+        
+        # Everything routing looks at is matched in a single pass
+        self.keyword_matcher = KeywordMatcher({
+            'exit': self.exit_keywords,
+            'fun_fact': ['fun fact'],
+            'motivation': ['motivation', 'quote', 'inspire'],
+            'thanks': ['thank'],
+            'programming': self.programming_keywords,
+            'web': self.web_keywords,
+            'friend': self.friend_keywords,
+            'system': self.system_keywords,
+            'languages': self.language_keywords
+        }, whole_word=('exit', 'languages'))
     
     def signal_handler(self, signum, frame):
         """Handle shutdown signals gracefully"""
         print(f"\n🛑 Received signal {signum}, shutting down...")
-        self.speech.speak("Goodbye! Shutting down now.")
-        # Save memory before exiting
-        self.memory.save_memory()
+        self.speech.interrupt()
+        self.say(SIGNAL_GOODBYE)
+        self.speech.shutdown()
+        # Flush any pending memory writes before exiting
+        self.memory.close()
+        self.ai.close()
         sys.exit(0)
     
-    def classify_intent(self, command):
-        """Classify user intent from command"""
-        command_lower = command.lower()
-        
-        if any(keyword in command_lower for keyword in self.programming_keywords):
-            return 'programming'
-        elif any(keyword in command_lower for keyword in self.web_keywords):
-            return 'web'
-        elif any(keyword in command_lower for keyword in self.friend_keywords):
-            return 'friend'
-        elif any(keyword in command_lower for keyword in self.system_keywords):
-            return 'system'
-        else:
-            return 'general'
+    def classify_intent(self, command, matches=None):
+        """Classify user intent from command
+        
+        Uses the statistical classifier when it is confident, otherwise
+        the keyword rules.
+        """
+        if self.intent_classifier is not None:
+            intent, _ = self.intent_classifier.classify(
+                command, fallback=lambda text: self.classify_intent_by_keywords(text, matches)
+            )
+            return intent
+        return self.classify_intent_by_keywords(command, matches)
     
-    def handle_programming(self, command):
+    def classify_intent_by_keywords(self, command, matches=None):
+        """Keyword-priority intent rules"""
+        if matches is None:
+            matches = self.keyword_matcher.match(command)
+        
+        for intent in ('programming', 'web', 'friend', 'system'):
+            if intent in matches:
+                return intent
+        return 'general'
+    
+    def handle_programming(self, command, matches=None):
         """Handle programming-related requests"""
-        self.speech.speak("I'll help with your programming question!")
+        self.say(PROGRAMMING_ACKNOWLEDGEMENT)
+        
+        if matches is None:
+            matches = self.keyword_matcher.match(command)
         
         # Extract language if specified
         language = self.current_language
-        for lang in ['python', 'javascript', 'java', 'c++', 'cpp', 'c#']:
-            if lang in command.lower():
-                language = lang
-                break
+        if 'languages' in matches:
+            language = matches['languages'][0]
         
-        if self.online_mode:
+        if self.use_ai():
             # Use AI for detailed programming help
-            context = self.memory.get_recent_context()
-            programming_context = self.memory.get_programming_context(language)
-            full_context = f"{context}\nProgramming knowledge: {programming_context}"
-            
-            response = self.ai.programming_help(command, language, full_context)
+            programming_context = self.memory.get_programming_context(
+                language, limit=Config.PROGRAMMING_CONTEXT_LIMIT
+            )
+            sections = [
+                turns_section(self.memory.get_recent_turns()),
+                PromptSection("relevant", self.memory.get_relevant_context(command), contiguous=False),
+                knowledge_section(programming_context),
+                self.summary_section()
+            ]
             
-            # Store the solution in memory for future reference
+            store = None
             if "error" in command.lower() or "fix" in command.lower():
-                self.memory.add_programming_knowledge(language, command, response)
+                # Store the solution in memory for future reference
+                store = lambda text: self.memory.add_programming_knowledge(language, command, text)
+            
+            # The offline answer takes microseconds, so check it before choosing how to ask
+            quick = self.programming.quick_answer(command, language) if Config.PROGRAMMING_RACE else None
+            if quick is not None:
+                future = self.ai.submit(**self.ai.programming_request(command, language, sections))
+                try:
+                    response = future.result(timeout=Config.PROGRAMMING_RACE_DEADLINE)
+                except concurrent.futures.TimeoutError:
+                    # Answer offline now; the AI answer follows when it arrives
+                    self.programming.remember_quick_answer(command, language)
+                    return ProgressiveAnswer(quick, future, store)
+                if response.startswith(('❌', '⚠️')):
+                    self.programming.remember_quick_answer(command, language)
+                    return quick
+            else:
+                response = self.offline_if_late(
+                    self.ai.programming_help(command, language, sections, stream=Config.STREAM_RESPONSES),
+                    lambda: self.programming.handle_programming_request(command, language)
+                )
+            
+            if store is not None:
+                if isinstance(response, str):
+                    store(response)
+                else:
+                    # Streamed: store once the whole answer has arrived
+                    response = on_complete(response, store)
         else:
             # Use offline programming helper
             response = self.programming.handle_programming_request(command, language)
@@ -191,17 +308,19 @@ class JARVIS:
         # Update user info if name is mentioned
         if 'my name is' in command.lower():
             name = command.lower().split('my name is')[-1].strip().title()
-            self.user_name = name
             self.memory.set_user_info(name)
             return f"Nice to meet you, {name}! I'll remember that. What would you like to talk about?"
         
-        if self.online_mode:
+        if self.use_ai():
             # Use AI for deeper conversation with memory context
-            context = self.memory.get_recent_context()
-            user_info = f"User name: {self.user_name}" if self.user_name else ""
-            full_context = f"{context}\n{user_info}"
+            sections = [turns_section(self.memory.get_recent_turns()), self.summary_section()]
+            if self.user_name:
+                sections.insert(0, PromptSection("user", [f"User name: {self.user_name}"]))
             
-            return self.ai.friend_chat(command, full_context)
+            return self.offline_if_late(
+                self.ai.friend_chat(command, sections, stream=Config.STREAM_RESPONSES),
+                lambda: self.friend.offline_chat(command)
+            )
         else:
             return self.friend.offline_chat(command)
     
@@ -239,8 +358,19 @@ Current Status:
 - Online Mode: {'Enabled 🌐' if self.online_mode else 'Disabled 🔌'}
 - Programming Language: {self.current_language}
 - User: {self.user_name if self.user_name else 'Not set'}
-- Total Interactions: {self.memory.memory['system_data']['total_interactions']}
+- Total Interactions: {self.memory.get_total_interactions()}
+- Last Prompt: {self.ai.prompt_builder.format_report()}
 """
+            status_info += f"- AI Requests: {self.ai.pool.format_stats()}\n"
+            status_info += f"- AI Circuit: {self.ai.breaker.format_status()}\n"
+            response_cache = self.ai.cache_for(current_user.get())
+            if response_cache is not None:
+                status_info += f"- Response Cache: {response_cache.format_stats()}\n"
+            if self.speech.tts_cache is not None:
+                status_info += f"- Speech Cache: {self.speech.tts_cache.format_stats()}\n"
+            persistence = self.memory.get_persistence_stats()
+            if 'writes_coalesced' in persistence:
+                status_info += f"- Memory Writes: {persistence['writes_performed']} ({persistence['writes_coalesced']} coalesced)\n"
             return status_info
         
         elif 'help' in command_lower or 'what can you do' in command_lower:
@@ -248,8 +378,7 @@ Current Status:
         
         elif 'clear memory' in command_lower or 'reset' in command_lower:
             # Reset conversation history but keep user info
-            self.memory.memory["conversation_history"] = []
-            self.memory.save_memory()
+            self.memory.clear_conversation_history()
             return "Conversation history cleared. Your user information is still saved."
         
         else:
@@ -296,67 +425,207 @@ Say 'exit', 'quit', or 'goodbye' to stop.
 """
         return help_text
     
+    def speak_streamed(self, chunks):
+        """Speak a streamed answer sentence by sentence and return the text spoken
+        
+        Each complete sentence is queued for speech while the rest of the
+        answer is still arriving, so audio starts after the first one. If
+        the user barges in, the stream is abandoned and only the part
+        already received is returned.
+        """
+        interruptions = self.speech.interruptions
+        parts = []
+        segmenter = SentenceSegmenter()
+        for chunk in chunks:
+            if self.speech.interruptions != interruptions:
+                # Closing the generator also closes the HTTP stream
+                chunks.close()
+                return "".join(parts)
+            parts.append(chunk)
+            for sentence in segmenter.feed(chunk):
+                self.say(sentence)
+        for sentence in segmenter.flush():
+            self.say(sentence)
+        return "".join(parts)
+    
+    def begin_turn(self):
+        """Start a command turn for the active user, superseding pending follow-ups"""
+        user = current_user.get()
+        with self.turns_lock:
+            self.turns[user] = self.turns.get(user, 0) + 1
+            pending = self.pending_followups.pop(user, None)
+        # A new command cuts off whatever is still being said
+        self.speech.interrupt()
+        if pending is not None:
+            # Only cancels a request still queued and not shared with another
+            # caller; otherwise the result is ignored when it lands
+            self.ai.abandon(pending)
+    
+    def start_followup(self, command, answer):
+        """Deliver the AI half of a ProgressiveAnswer in the background"""
+        user = current_user.get()
+        with self.turns_lock:
+            turn = self.turns.get(user, 0)
+            self.pending_followups[user] = answer.future
+        # Copy the context so the follow-up lands in the same user's memory
+        context = contextvars.copy_context()
+        thread = threading.Thread(
+            target=context.run, args=(self.deliver_followup, command, answer, user, turn), daemon=True
+        )
+        thread.start()
+        return thread
+    
+    def deliver_followup(self, command, answer, user, turn):
+        """Wait for the AI answer and speak it unless a newer command came in"""
+        try:
+            response = answer.future.result()
+        except Exception:
+            # Cancelled because a newer command superseded it, or failed
+            return
+        if response.startswith(('❌', '⚠️')):
+            return
+        
+        with self.speech_lock:
+            with self.turns_lock:
+                if self.turns.get(user, 0) != turn:
+                    return
+                self.pending_followups.pop(user, None)
+            self.speech.speak("Here's a more detailed answer.", wait=False)
+            self.speech.speak(response, wait=False)
+        
+        if answer.on_result is not None:
+            answer.on_result(response)
+        self.memory.add_conversation(command, response)
+    
+    def summary_section(self):
+        """Prompt section with summaries of older conversation, newest first"""
+        return PromptSection("summary", self.memory.get_conversation_summaries()[::-1])
+    
+    def summarize_with_ai(self, text):
+        """Summarize an old conversation segment with DeepSeek"""
+        prompt = f"Summarize this earlier conversation in 2-3 sentences, keeping names, decisions and facts:\n\n{text}"
+        summary = self.ai.chat(prompt, personality="concise note-taker", temperature=0.2, call_type='summary')
+        if summary.startswith(('❌', '⚠️')):
+            return None
+        return summary
+    
+    def refresh_summaries_in_background(self):
+        """Upgrade offline summaries with DeepSeek without blocking listening"""
+        if self.summary_thread is not None and self.summary_thread.is_alive():
+            return
+        # Copy the context so the summaries land in the same user's memory
+        context = contextvars.copy_context()
+        self.summary_thread = threading.Thread(
+            target=context.run, args=(self.refresh_summaries,), name='summaries', daemon=True
+        )
+        self.summary_thread.start()
+    
+    def refresh_summaries(self):
+        """Replace one offline summary (refresh_summaries applies it under the memory lock)"""
+        try:
+            self.memory.refresh_summaries(self.summarize_with_ai)
+        except Exception as e:
+            print(f"Summary refresh error: {e}")
+    
     def handle_general(self, command):
         """Handle general questions"""
-        if self.online_mode:
-            context = self.memory.get_recent_context()
-            return self.ai.chat(command, context)
-        else:
-            # Provide more helpful offline responses
-            if 'what' in command.lower() and 'you' in command.lower():
-                return "I'm JARVIS, your AI assistant! I can help with programming, answer questions when online, or just chat with you."
-            elif 'who are you' in command.lower():
-                return "I'm JARVIS, your personal AI assistant. I can help with programming, web searches, and general conversation when in online mode."
+        if self.use_ai():
+            sections = [
+                turns_section(self.memory.get_recent_turns()),
+                self.summary_section(),
+                PromptSection("relevant", self.memory.get_relevant_context(command), contiguous=False)
+            ]
+            if Config.STREAM_RESPONSES:
+                response = self.ai.chat_stream(command, sections)
             else:
-                return "That's an interesting question! For detailed answers, please enable online mode. I can still help with programming questions in offline mode."
+                response = self.ai.chat(command, sections)
+            return self.offline_if_late(response, lambda: self.offline_general(command))
+        else:
+            return self.offline_general(command)
+    
+    def offline_general(self, command):
+        """Provide more helpful offline responses"""
+        if 'what' in command.lower() and 'you' in command.lower():
+            return "I'm JARVIS, your AI assistant! I can help with programming, answer questions when online, or just chat with you."
+        elif 'who are you' in command.lower():
+            return "I'm JARVIS, your personal AI assistant. I can help with programming, web searches, and general conversation when in online mode."
+        else:
+            return "That's an interesting question! For detailed answers, please enable online mode. I can still help with programming questions in offline mode."
+    
+    def offline_if_late(self, response, offline):
+        """Answer with offline() when the AI call ran past its deadline"""
+        if isinstance(response, str):
+            return offline() if response == TIMEOUT_RESPONSE else response
+        # Streamed: the first chunk tells whether the API answered in time
+        first = next(response, None)
+        if first == TIMEOUT_RESPONSE:
+            return offline()
+        return self.resume_stream(first, response)
+    
+    def resume_stream(self, first, response):
+        """Yield the peeked first chunk, then the rest of the stream
+        
+        A generator rather than a chain, so close() from speak_streamed
+        reaches the underlying chat_stream and its HTTP response.
+        """
+        if first is not None:
+            yield first
+        yield from response
+    
+    def process_command(self, command, user_id=None):
+        """Process and route commands
+        
+        With sharded memory, user_id selects whose memory the command reads
+        and updates; without it the default user's shard is used.
+        """
+        if user_id is not None and isinstance(self.memory, ShardedMemory):
+            with self.memory.session(user_id):
+                return self._process_command(command)
+        return self._process_command(command)
     
-    def process_command(self, command):
-        """Process and route commands"""
+    def _process_command(self, command):
+        """Route a command for the active memory"""
         if not command:
             return None
         
         # Clean the command
         command = command.strip()
+        self.begin_turn()
+        matches = self.keyword_matcher.match(command)
         
         # Check for exit commands
-        if any(word in command.lower() for word in ['exit', 'quit', 'goodbye', 'bye', 'stop', 'shutdown']):
-            self.speech.speak("Goodbye! It was great talking with you!")
+        if 'exit' in matches:
+            self.say(EXIT_GOODBYE)
             # Save memory before exiting
             self.memory.save_memory()
             return 'exit'
         
         # Check for special commands
-        if 'fun fact' in command.lower():
+        if 'fun_fact' in matches:
             response = self.friend.share_fun_fact()
-            self.speech.speak(response)
+            self.say(response)
             self.memory.add_conversation(command, response)
             return None
         
-        if 'motivation' in command.lower() or 'quote' in command.lower() or 'inspire' in command.lower():
+        if 'motivation' in matches:
             response = self.friend.get_motivational_quote()
-            self.speech.speak(response)
+            self.say(response)
             self.memory.add_conversation(command, response)
             return None
         
-        if 'thank' in command.lower():
-            responses = [
-                "You're welcome!",
-                "Happy to help!",
-                "Anytime!",
-                "Glad I could assist!"
-            ]
+        if 'thanks' in matches:
             import random
-            response = random.choice(responses)
-            self.speech.speak(response)
+            response = random.choice(THANKS_RESPONSES)
+            self.say(response)
             self.memory.add_conversation(command, response)
             return None
         
         # Classify and handle intent
-        intent = self.classify_intent(command)
+        intent = self.classify_intent(command, matches)
         
         try:
             if intent == 'programming':
-                response = self.handle_programming(command)
+                response = self.handle_programming(command, matches)
             elif intent == 'web':
                 response = self.handle_web_request(command)
             elif intent == 'friend':
@@ -366,18 +635,32 @@ Say 'exit', 'quit', or 'goodbye' to stop.
             else:
                 response = self.handle_general(command)
             
+            followup = None
+            if isinstance(response, ProgressiveAnswer):
+                followup, response = response, response.text
+            
             # Speak response and store in memory
-            self.speech.speak(response)
+            if isinstance(response, str):
+                self.say(response)
+            else:
+                response = self.speak_streamed(response)
             self.memory.add_conversation(command, response)
             
+            if followup is not None:
+                self.start_followup(command, followup)
+            
         except Exception as e:
             error_msg = f"Sorry, I encountered an error processing your request: {str(e)}"
             print(f"Error: {e}")
-            self.speech.speak("Sorry, I encountered an error. Please try again.")
+            self.say("Sorry, I encountered an error. Please try again.")
             self.memory.add_conversation(command, "Error occurred")
         
         return None
     
+    def report_time_to_first_prompt(self):
+        ready_in = time.perf_counter() - self.started_at
+        print(f"⏱️  Time to first prompt: {ready_in:.2f}s")
+    
     def run(self):
         """Main application loop"""
         welcome_message = """
@@ -397,14 +680,20 @@ Say 'exit', 'quit', or 'goodbye' to stop.
         if self.user_name:
             greeting = f"Hello {self.user_name}! I'm JARVIS, ready to help you with programming, web searches, or just chat!"
         else:
-            greeting = "Hello! I'm JARVIS, your AI assistant. You can tell me your name by saying 'my name is [your name]'. I can help with programming, web searches, or just be a friend to chat with!"
+            greeting = WELCOME_GREETING
         
-        self.speech.speak(greeting)
+        self.say(greeting)
+        # Reported once the microphone is actually capturing
+        self.speech.on_listening = self.report_time_to_first_prompt
         
         # Main interaction loop
         interaction_count = 0
         while True:
             try:
+                if not (Config.LISTEN_WHILE_SPEAKING or Config.FULL_DUPLEX_AUDIO):
+                    # Don't let the microphone pick up our own answer
+                    self.speech.wait_until_done()
+                
                 # Listen for command with increasing timeout for first few interactions
                 timeout = 8 if interaction_count < 3 else 5
                 command = self.speech.listen(timeout=timeout)
@@ -418,10 +707,13 @@ Say 'exit', 'quit', or 'goodbye' to stop.
                     # No command heard for a while
                     if interaction_count > 2:  # After initial setup
                         print("💤 I'm listening... Say 'help' for options or 'exit' to quit.")
+                    # Use idle time to upgrade offline summaries
+                    if self.use_ai():
+                        self.refresh_summaries_in_background()
                 
             except KeyboardInterrupt:
                 print("\n🛑 Keyboard interrupt received.")
-                self.speech.speak("Shutting down. Goodbye!")
+                self.say(INTERRUPT_GOODBYE)
                 break
             except Exception as e:
                 error_msg = f"Unexpected error in main loop: {e}"
@@ -430,6 +722,11 @@ Say 'exit', 'quit', or 'goodbye' to stop.
                 continue
         
         # Final cleanup
+        self.speech.shutdown()
+        if self.summary_thread is not None:
+            self.summary_thread.join(timeout=5)
+        self.memory.close()
+        self.ai.close()
         print("\n👋 JARVIS session ended.")
         print(f"📊 Total interactions this session: {interaction_count}")
 
@@ -494,7 +791,7 @@ MAX_CONVERSATION_HISTORY=20
         input("Press Enter to continue...")
     
     try:
-        jarvis = JARVIS()
+        jarvis = JARVIS(voice_test=True if '--voice-test' in sys.argv else None)
         jarvis.run()
     except Exception as e:
         print(f"❌ Failed to start JARVIS: {e}")
@@ -91,8 +91,8 @@ class OfflineCoder:
             return self.code_templates[language][pattern]
         return "Code template not available for this pattern/language"
     
-    def explain_concept(self, concept, language='python'):
-        """Explain programming concepts offline"""
+    def explain_concept(self, concept, language='python', remember=True):
+        """Explain programming concepts offline (stored in memory if remember)"""
         concepts = {
             'python': {
                 'list comprehension': "A concise way to create lists: [expression for item in list if condition]",
@@ -111,8 +111,9 @@ class OfflineCoder:
         
         if language in concepts and concept.lower() in concepts[language]:
             explanation = concepts[language][concept.lower()]
-            # Store in memory for future reference
-            self.memory.add_programming_knowledge(language, concept, explanation)
+            if remember:
+                # Store in memory for future reference
+                self.memory.add_programming_knowledge(language, concept, explanation)
             return f"📚 {concept}: {explanation}"
         else:
             return f"🤔 I don't have an offline explanation for '{concept}' in {language}. Try asking when online."
\ No newline at end of file
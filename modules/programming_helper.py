@@ -1,3 +1,4 @@
+import re
 import subprocess
 import os
 import tempfile
@@ -31,6 +32,40 @@ class ProgrammingHelper:
         else:
             return self.handle_general_request(request, language)
     
+    def quick_answer(self, request, language='python'):
+        """Offline answer worth speaking before the AI one arrives, or None
+        
+        Only concrete answers count (a syntax check that found a problem,
+        a template, a concept explanation); requests that would get the
+        generic "enable online mode" reply return None. Nothing is stored
+        in memory; call remember_quick_answer() if the answer is delivered.
+        """
+        request_lower = request.lower()
+        
+        if any(word in request_lower for word in ['error', 'bug', 'fix', 'debug']):
+            code_match = re.search(r'code[:\s]*(.*?)(?=error|$)', request, re.IGNORECASE | re.DOTALL)
+            return self.offline_analysis(code_match.group(1).strip(), language) if code_match else None
+        elif any(word in request_lower for word in ['how to', 'create', 'make', 'build']):
+            if language not in self.offline_coder.code_templates:
+                return None
+            return self.template_answer(request, language)
+        elif any(word in request_lower for word in ['explain', 'what is', 'concept']):
+            answer = self.concept_answer(request, language, remember=False)
+            # explain_concept answers "🤔 I don't have an offline explanation..." for unknown pairs
+            return answer if answer and not answer.startswith('🤔') else None
+        return None
+    
+    def remember_quick_answer(self, request, language='python'):
+        """Store a delivered quick_answer() the way handle_programming_request would"""
+        # Store programming interest in memory
+        self.memory.add_programming_knowledge(language, request)
+        
+        request_lower = request.lower()
+        if any(word in request_lower for word in ['error', 'bug', 'fix', 'debug', 'how to', 'create', 'make', 'build']):
+            return
+        if any(word in request_lower for word in ['explain', 'what is', 'concept']):
+            self.concept_answer(request, language)
+    
     def handle_debug_request(self, request, language):
         """Handle debugging requests"""
         # Extract code and error from request (basic pattern matching)
@@ -38,50 +73,53 @@ class ProgrammingHelper:
         error_match = re.search(r'error[:\s]*(.*?)(?=code|$)', request, re.IGNORECASE | re.DOTALL)
         
         if code_match and error_match:
-            code = code_match.group(1).strip()
-            error = error_match.group(1).strip()
-            
             # First try offline analysis
-            analysis = self.offline_coder.analyze_code(code, language)
-            if analysis['status'] == 'invalid':
-                offline_fix = self.offline_coder.suggest_python_fix(analysis['message'])
-                response = f"🔧 Offline Analysis:\n{analysis['message']}\n💡 Suggestion: {offline_fix}"
-            else:
+            response = self.offline_analysis(code_match.group(1).strip(), language)
+            if response is None:
                 response = "🔍 I analyzed your code offline. For detailed debugging with AI, please enable online mode."
             
             return response
         else:
             return "🤔 I can help debug your code. Please share both the code and the error message for better assistance."
     
+    def offline_analysis(self, code, language):
+        """Syntax check with a suggested fix, or None if nothing was found"""
+        analysis = self.offline_coder.analyze_code(code, language)
+        if analysis['status'] == 'invalid':
+            offline_fix = self.offline_coder.suggest_python_fix(analysis['message'])
+            return f"🔧 Offline Analysis:\n{analysis['message']}\n💡 Suggestion: {offline_fix}"
+        return None
+    
     def handle_howto_request(self, request, language):
         """Handle how-to programming questions"""
         # Try offline templates first
-        if 'function' in request.lower():
-            template = self.offline_coder.generate_code_template('function', language)
-            return f"📝 Here's a basic function template in {language}:\n\n```{language}\n{template}\n```"
-        elif 'class' in request.lower():
-            template = self.offline_coder.generate_code_template('class', language)
-            return f"📝 Here's a basic class template in {language}:\n\n```{language}\n{template}\n```"
-        elif 'loop' in request.lower():
-            template = self.offline_coder.generate_code_template('loop', language)
-            return f"📝 Here's a basic loop template in {language}:\n\n```{language}\n{template}\n```"
-        else:
-            return f"💡 I can help with {language} programming. For specific how-to guidance, please enable online mode for AI assistance."
+        response = self.template_answer(request, language)
+        if response is None:
+            response = f"💡 I can help with {language} programming. For specific how-to guidance, please enable online mode for AI assistance."
+        return response
+    
+    def template_answer(self, request, language):
+        """Code template for a function, class or loop question, or None"""
+        for pattern in ['function', 'class', 'loop']:
+            if pattern in request.lower():
+                template = self.offline_coder.generate_code_template(pattern, language)
+                return f"📝 Here's a basic {pattern} template in {language}:\n\n```{language}\n{template}\n```"
+        return None
     
     def handle_explanation_request(self, request, language):
         """Handle concept explanation requests"""
-        # Extract concept from request
+        response = self.concept_answer(request, language)
+        if response is None:
+            response = "📚 I can explain programming concepts offline. Try asking about: functions, classes, loops, or specific language features."
+        return response
+    
+    def concept_answer(self, request, language, remember=True):
+        """Offline explanation of a known concept named in the request, or None"""
         concepts = ['list comprehension', 'dictionary', 'function', 'class', 'inheritance', 'decorator']
-        found_concept = None
         for concept in concepts:
             if concept in request.lower():
-                found_concept = concept
-                break
-        
-        if found_concept:
-            return self.offline_coder.explain_concept(found_concept, language)
-        else:
-            return "📚 I can explain programming concepts offline. Try asking about: functions, classes, loops, or specific language features."
+                return self.offline_coder.explain_concept(concept, language, remember)
+        return None
     
     def handle_example_request(self, request, language):
         """Handle code example requests"""
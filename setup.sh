@@ -42,6 +42,10 @@ import speech_recognition, pyttsx3, requests
 print('✅ All core packages installed successfully!')
 "
 
+# Pre-render fixed phrases so they play without synthesis
+echo "🔊 Pre-rendering common phrases..."
+python -m core.tts_cache --warm-up || echo "⚠️  Could not pre-render phrases; they will be cached on first use"
+
 echo ""
 echo "🎉 Setup completed successfully!"
 echo ""
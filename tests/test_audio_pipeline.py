@@ -0,0 +1,131 @@
+import math
+import struct
+import threading
+import wave
+
+import pytest
+
+sr = pytest.importorskip("speech_recognition")
+pytest.importorskip("pyttsx3")
+
+from config.api_keys import Config
+import core.speech_engine as speech_engine
+from core.speech_engine import AudioPipeline, FileAudioSource, SpeechEngine
+
+RATE = 16000
+
+def write_wav(path, segments):
+    """Mono 16-bit WAV of (amplitude, seconds) segments of a 220 Hz tone (0 is silence)"""
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        for amplitude, seconds in segments:
+            count = int(seconds * RATE)
+            wav.writeframes(b"".join(
+                struct.pack('<h', int(amplitude * math.sin(2 * math.pi * 220 * i / RATE))) for i in range(count)
+            ))
+    return str(path)
+
+def recognizer(threshold=300):
+    recognizer = sr.Recognizer()
+    recognizer.energy_threshold = threshold
+    recognizer.dynamic_energy_threshold = False
+    return recognizer
+
+def phrase_seconds(audio):
+    return len(audio.frame_data) / audio.sample_width / audio.sample_rate
+
+class FakeTTS:
+    def __init__(self, speaking):
+        self.is_speaking = speaking
+        self.interrupted = threading.Event()
+
+    def interrupt(self):
+        self.is_speaking = False
+        self.interrupted.set()
+
+class FakeEngine:
+    def getProperty(self, name):
+        return {'voices': [], 'voice': None, 'rate': 170, 'volume': 0.9}[name]
+
+    def setProperty(self, name, value):
+        pass
+
+@pytest.fixture(params=[True, False], ids=['vad', 'energy'])
+def vad(request, monkeypatch):
+    monkeypatch.setattr(Config, 'VAD', request.param)
+    return request.param
+
+def test_pipeline_segments_phrases(tmp_path, vad):
+    path = write_wav(tmp_path / "two_phrases.wav", [(0, 1.0), (6000, 1.0), (0, 1.5), (6000, 0.6), (0, 1.0)])
+    pipeline = AudioPipeline(FileAudioSource(path, realtime=False), recognizer()).start()
+    try:
+        first = pipeline.next_phrase(timeout=5)
+        second = pipeline.next_phrase(timeout=5)
+        assert pipeline.next_phrase(timeout=0.5) is None
+    finally:
+        pipeline.stop()
+
+    assert first is not None and second is not None
+    assert phrase_seconds(first) > phrase_seconds(second) >= 0.6
+    assert phrase_seconds(first) < 1.0 + 0.5 + 1.0 + 0.1
+    assert pipeline.stats["phrases"] == 2
+    assert pipeline.stats["barge_ins"] == 0
+
+def test_barge_in_interrupts_speech(tmp_path, vad):
+    path = write_wav(tmp_path / "barge_in.wav", [(0, 1.0), (6000, 1.0), (0, 1.0)])
+    tts = FakeTTS(speaking=True)
+    pipeline = AudioPipeline(FileAudioSource(path, realtime=False), recognizer(), tts).start()
+    try:
+        assert pipeline.next_phrase(timeout=5) is not None
+    finally:
+        pipeline.stop()
+
+    assert tts.interrupted.is_set()
+    assert pipeline.stats["barge_ins"] == 1
+
+def test_quiet_speech_does_not_barge_in(tmp_path, vad):
+    # Loud enough to be a phrase, but under the raised barge-in threshold
+    path = write_wav(tmp_path / "echo.wav", [(0, 1.0), (600, 1.0), (0, 1.0)])
+    tts = FakeTTS(speaking=True)
+    pipeline = AudioPipeline(FileAudioSource(path, realtime=False), recognizer(), tts).start()
+    try:
+        assert pipeline.next_phrase(timeout=1) is None
+    finally:
+        pipeline.stop()
+
+    assert not tts.interrupted.is_set()
+    assert pipeline.stats["barge_ins"] == 0
+
+@pytest.fixture
+def engine_factory(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'AUDIO_PROFILE_FILE', str(tmp_path / "audio_profile.json"))
+    monkeypatch.setattr(Config, 'TTS_CACHE', False)
+    monkeypatch.setattr(speech_engine.pyttsx3, 'init', FakeEngine)
+    engines = []
+
+    def create(path, full_duplex):
+        engine = SpeechEngine(source=FileAudioSource(path, realtime=False), full_duplex=full_duplex, fast_start=True)
+        engine.recognizer.dynamic_energy_threshold = False
+        engine.recognizer.recognize_google = lambda audio, language=None: pytest.fail("recognizer called on silence")
+        engines.append(engine)
+        return engine
+
+    yield create
+    for engine in engines:
+        engine.shutdown()
+
+def test_capture_phrase_times_out_on_silence(tmp_path, engine_factory):
+    engine = engine_factory(write_wav(tmp_path / "silence.wav", [(0, 3.0)]), full_duplex=False)
+    vad = speech_engine.create_vad(RATE)
+    if vad is None:
+        pytest.skip("VAD unavailable")
+    with engine.microphone as source:
+        with pytest.raises(sr.WaitTimeoutError):
+            engine.capture_phrase(source, vad, timeout=0.5)
+
+@pytest.mark.parametrize("full_duplex", [False, True], ids=['half-duplex', 'full-duplex'])
+def test_listen_on_silence_returns_nothing(tmp_path, engine_factory, vad, full_duplex):
+    engine = engine_factory(write_wav(tmp_path / "silence.wav", [(0, 3.0)]), full_duplex)
+    assert engine.listen(timeout=0.5) == ""
@@ -0,0 +1,35 @@
+import os
+
+import pytest
+
+from config.api_keys import Config
+from core.memory import MemorySystem
+
+@pytest.fixture
+def journal_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'MEMORY_STORAGE', 'journal')
+    monkeypatch.setattr(Config, 'MEMORY_FILE', str(tmp_path / "memory.json"))
+    monkeypatch.setattr(Config, 'MEMORY_JOURNAL_FILE', str(tmp_path / "memory.journal"))
+    monkeypatch.setattr(Config, 'SEMANTIC_RECALL', False)
+    return tmp_path
+
+def crash(memory):
+    """Drop the memory system without compacting, as a killed process would"""
+    memory.journal.close()
+
+def test_replay_after_missing_journal(journal_config):
+    memory = MemorySystem()
+    memory.add_conversation("first", "one")
+    memory.add_conversation("second", "two")
+    memory.close()
+
+    # The snapshot now records journal_seq 2; lose the (empty) journal
+    os.remove(Config.MEMORY_JOURNAL_FILE)
+
+    memory = MemorySystem()
+    memory.add_conversation("third", "three")
+    crash(memory)
+
+    memory = MemorySystem()
+    assert memory.get_recent_turns() == [("first", "one"), ("second", "two"), ("third", "three")]
+    crash(memory)
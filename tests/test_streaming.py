@@ -0,0 +1,77 @@
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("wikipedia")
+
+from config.api_keys import Config
+from core.memory import create_memory_system
+from main import JARVIS
+
+class InterruptingSpeech:
+    """Speech stand-in where the user barges in after the first sentence"""
+
+    interruptions = 0
+    tts_cache = None
+
+    def __init__(self):
+        self.spoken = []
+
+    def speak(self, text, wait=True):
+        self.spoken.append(text)
+        self.interruptions += 1
+
+    def listen(self, timeout=5, phrase_time_limit=10):
+        return ""
+
+    def interrupt(self):
+        pass
+
+    def wait_until_done(self, timeout=None):
+        return True
+
+    def shutdown(self):
+        pass
+
+class StreamingAI:
+    """DeepSeek stand-in that streams an answer and records when it is closed"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+
+    def available(self):
+        return True
+
+    def chat_stream(self, message, sections=None):
+        try:
+            yield from self.chunks
+        finally:
+            self.closed = True
+
+    def abandon(self, future):
+        pass
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def memory(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'MEMORY_STORAGE', 'json')
+    monkeypatch.setattr(Config, 'MEMORY_FILE', str(tmp_path / "memory.json"))
+    monkeypatch.setattr(Config, 'SEMANTIC_RECALL', False)
+    monkeypatch.setattr(Config, 'STREAM_RESPONSES', True)
+    memory = create_memory_system()
+    yield memory
+    memory.close()
+
+def test_interrupted_stream_is_closed(memory):
+    speech = InterruptingSpeech()
+    ai = StreamingAI(["The sky is blue. ", "Light scatters ", "off air. ", "More follows."])
+    jarvis = JARVIS(speech=speech, memory=memory, ai=ai, voice_test=False, handle_signals=False)
+    jarvis.online_mode = True
+
+    jarvis.process_command("why is the sky blue")
+
+    assert ai.closed
+    assert speech.spoken == ["The sky is blue. Light scatters off air."]
+    assert memory.get_recent_turns()[-1] == ("why is the sky blue", "The sky is blue. Light scatters off air. ")
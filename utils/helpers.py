@@ -1,5 +1,7 @@
 import re
 import os
+import json
+import tempfile
 
 def clean_filename(filename):
     """Clean filename to be filesystem-safe"""
@@ -19,4 +21,27 @@ def get_file_extension(language):
 
 def format_code_block(code, language='python'):
     """Format code for display"""
-    return f"```{language}\n{code}\n```"
\ No newline at end of file
+    return f"```{language}\n{code}\n```"
+
+def write_json_atomic(path, data, indent=None, default=None):
+    """Write JSON to a temp file and atomically swap it into place"""
+    write_text_atomic(path, json.dumps(data, indent=indent, default=default))
+
+def write_text_atomic(path, text):
+    """Write text to a temp file and atomically swap it into place"""
+    write_bytes_atomic(path, text.encode('utf-8'))
+
+def write_bytes_atomic(path, data):
+    """Write bytes to a temp file and atomically swap it into place"""
+    directory = os.path.dirname(path) or '.'
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
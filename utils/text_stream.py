@@ -0,0 +1,87 @@
+import re
+
+ABBREVIATIONS = {'e.g', 'i.e', 'etc', 'vs', 'mr', 'mrs', 'ms', 'dr', 'st', 'eg', 'ie', 'no'}
+
+class SentenceSegmenter:
+    """Incrementally split streamed text into complete, speakable sentences
+
+    A sentence ends at ., ! or ? followed by whitespace, or at a blank line.
+    Numbered list markers ("1."), common abbreviations and fragments shorter
+    than min_chars don't end a sentence. Fenced code blocks are held back
+    until closed and emitted as one piece.
+    """
+
+    BOUNDARY = re.compile(r'([.!?]+["\')\]]*)\s+|\n\s*\n')
+
+    def __init__(self, min_chars=20):
+        self.min_chars = min_chars
+        self.buffer = ""
+
+    def feed(self, text):
+        """Add a chunk of text and return any sentences it completed"""
+        self.buffer += text
+        return self._drain(final=False)
+
+    def flush(self):
+        """Return whatever is left at the end of the stream"""
+        return self._drain(final=True)
+
+    def _drain(self, final):
+        sentences = []
+        while self.buffer:
+            piece = self._next_piece(final)
+            if piece is None:
+                break
+            if piece.strip():
+                sentences.append(piece.strip())
+        return sentences
+
+    def _take(self, end, skip=None):
+        piece = self.buffer[:end]
+        self.buffer = self.buffer[end if skip is None else skip:]
+        return piece
+
+    def _next_piece(self, final):
+        fence = self.buffer.find('```')
+        if fence == 0:
+            close = self.buffer.find('```', 3)
+            if close != -1:
+                return self._take(close + 3)
+            return self._take(len(self.buffer)) if final else None
+
+        limit = fence if fence != -1 else len(self.buffer)
+        for match in self.BOUNDARY.finditer(self.buffer, 0, limit):
+            end = match.end(1) if match.group(1) else match.start()
+            if self._is_sentence(self.buffer[:end]):
+                return self._take(end, match.end())
+
+        if fence != -1:
+            # Text before a code block is spoken on its own
+            return self._take(fence)
+        if final:
+            return self._take(len(self.buffer))
+        return None
+
+    def _is_sentence(self, text):
+        text = text.strip()
+        if len(text) < self.min_chars:
+            return False
+        last_word = text.split()[-1].rstrip('.!?"\')]').lower()
+        if text.endswith('.') and (last_word.isdigit() or last_word in ABBREVIATIONS):
+            return False
+        return True
+
+def iter_sentences(chunks, min_chars=20):
+    """Yield complete sentences from an iterable of text chunks"""
+    segmenter = SentenceSegmenter(min_chars)
+    for chunk in chunks:
+        yield from segmenter.feed(chunk)
+    yield from segmenter.flush()
+
+def on_complete(chunks, callback):
+    """Pass chunks through, then call callback with the full text"""
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    callback("".join(parts))